@@ -1,6 +1,7 @@
+python -m fetchkjv.packed kjv.json kjv.kjvz
 pyinstaller --onefile ^
   --icon=FetchKJV.ico ^
-  --add-data "kjv.json;." ^
+  --add-data "kjv.kjvz;." ^
   --add-data "settings.json;." ^
   --add-data "FetchKJV.ico;." ^
   --add-data "FetchKJV.png;." ^
@@ -1,62 +1,98 @@
 __version__ = "1.0.0"
 
-from pynput import keyboard as pynput_keyboard
-from pynput.keyboard import Key, KeyCode, Controller
+import time
+
+STARTED = time.perf_counter()  # time to ready is measured from here
+
 import shutil
-import pyperclip
-import pythonbible as bible
-import tkinter as tk
-from tkinter import colorchooser, scrolledtext
-import tkinter.ttk as ttk
 import json
-import time
 import threading
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
 import os
 import traceback
 import sys
-import re
-
-# System tray support
-import pystray
-from PIL import Image
-
-# Windows clipboard RTF support
-import win32clipboard
-import win32con
 
 import win32event
 import win32api
 import winerror
 
+from fetchkjv import ipc, startup
+
 # -----------------------------
-# HOTKEY FORMATTER
+# STARTUP TIMING
 # -----------------------------
 
-def format_hotkey(hk):
-    parts = []
-    if hk["ctrl"]:
-        parts.append("Ctrl")
-    if hk["alt"]:
-        parts.append("Alt")
-    if hk["shift"]:
-        parts.append("Shift")
-    parts.append(hk["key"].upper())
-    return " + ".join(parts)
+# Each phase up to "ready" (the hotkey listener running) is timed and the
+# total is compared with STARTUP_BUDGET_MS. Launching with --startup-report
+# also times every import and writes the lot to STARTUP_REPORT_PATH.
+
+STARTUP_BUDGET_MS = startup.DEFAULT_BUDGET_MS
+write_startup_report = startup.REPORT_FLAG in sys.argv[1:]
+startup_timer = startup.StartupReport(STARTED, trace_imports=write_startup_report)
+launch_args = [arg for arg in sys.argv[1:] if arg != startup.REPORT_FLAG]
 
 # -----------------------------
 # SINGLE INSTANCE CHECK
 # -----------------------------
 
+# Done before the GUI libraries load, so a second launch is gone in
+# milliseconds. Its command line ("John 3:16", --search words, --settings)
+# is handed to the running instance, which shows the popup.
+
 mutex_name = "FetchKJV_SingleInstanceMutex"
 
 # Try to create a named mutex
 mutex = win32event.CreateMutex(None, False, mutex_name)
 
-# If the mutex already exists, exit immediately
+launch_request = ipc.launch_message(launch_args)
+
+# If the mutex already exists, forward the request and exit immediately
 if win32api.GetLastError() == winerror.ERROR_ALREADY_EXISTS:
-    print("Another instance of FetchKJV is already running.")
+    if launch_request is None:
+        print("Another instance of FetchKJV is already running.")
+    elif ipc.forward(launch_request):
+        print("Passed the request to the running instance of FetchKJV.")
+    else:
+        print("Another instance of FetchKJV is running but did not answer.")
     sys.exit(0)
 
+# Requests from later launches; handled once the app is up
+instance_channel = ipc.InstanceChannel()
+if not instance_channel.listen():
+    print("Could not open the instance channel; later launches will not be forwarded.")
+    instance_channel = None
+
+startup_timer.mark("single_instance")
+
+# Only what the hotkey listener needs is imported here. The tray icon
+# (pystray, PIL), pythonbible and the query server (asyncio) are imported
+# once the listener is running.
+from pynput import keyboard as pynput_keyboard
+from pynput.keyboard import Key, Controller
+import tkinter as tk
+import tkinter.ttk as ttk
+
+from fetchkjv import cache, clipboard, corpus, hotkeys, metrics, passages, popup, refparser, search, translations
+from fetchkjv.render import encode_payload
+
+startup_timer.mark("imports")
+
+# -----------------------------
+# HOTKEY FORMATTER
+# -----------------------------
+
+def format_hotkey(hk):
+    parts = []
+    if hk["ctrl"]:
+        parts.append("Ctrl")
+    if hk["alt"]:
+        parts.append("Alt")
+    if hk["shift"]:
+        parts.append("Shift")
+    parts.append(hk["key"].upper())
+    return " + ".join(parts)
+
 # -----------------------------
 # MAIN WINDOW
 # -----------------------------
@@ -67,36 +103,94 @@ def resource_path(relative_path):
     return os.path.join(os.path.dirname(os.path.abspath(__file__)), relative_path)
 
 hidden_root = tk.Tk()
-hidden_root.iconbitmap(resource_path("FetchKJV.ico"))
 hidden_root.withdraw()
-hidden_root.iconbitmap(resource_path("FetchKJV.ico"))
+# The root is never shown, so its icon can wait until the main loop is idle
+hidden_root.after_idle(hidden_root.iconbitmap, resource_path("FetchKJV.ico"))
 
-style = ttk.Style()
-style.theme_use("default")  # or "clam" if you prefer
+# -----------------------------
+# UI QUEUE
+# -----------------------------
 
-style.configure("Vertical.TScrollbar",
-    gripcount=0,
-    background="#beb09c",
-    troughcolor="#f7f5ea",
-    bordercolor="#beb09c",
-    arrowcolor="#2a3347"
-)
+# Tkinter is only used from the thread that runs hidden_root.mainloop().
+# The hotkey worker, the loader and the tray icon post their UI work with
+# run_on_ui; the Tk thread drains the queue every UI_POLL_MS.
 
-style.configure("Custom.TSpinbox",
-    arrowsize=12,
-    background="#f7f5ea",
-    foreground="#333333",
-    bordercolor="#beb09c",
-    lightcolor="#beb09c",
-    darkcolor="#beb09c",
-    arrowcolor="#333333",
-    relief="flat"
-)
+UI_POLL_MS = 10
+UI_THREAD = threading.current_thread()
+ui_queue = queue.SimpleQueue()
 
-style.map("Custom.TSpinbox",
-    fieldbackground=[("readonly", "#f7f5ea"), ("!disabled", "#f7f5ea")],
-    background=[("active", "#f7f5ea"), ("!disabled", "#f7f5ea")]
-)
+
+def run_on_ui(func, *args):
+    """Runs func(*args) on the Tk thread. Returns a Future of its result."""
+    future = Future()
+    if threading.current_thread() is UI_THREAD:
+        _run_ui_command(future, func, args)
+    else:
+        ui_queue.put((future, func, args))
+    return future
+
+
+def _run_ui_command(future, func, args):
+    try:
+        future.set_result(func(*args))
+    except Exception as e:
+        print("Error in UI command:")
+        print(traceback.format_exc())
+        future.set_exception(e)
+
+
+def drain_ui_queue():
+    """Runs every queued UI command, then checks again in UI_POLL_MS."""
+    try:
+        while True:
+            try:
+                future, func, args = ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            _run_ui_command(future, func, args)
+    finally:
+        hidden_root.after(UI_POLL_MS, drain_ui_queue)
+
+
+hidden_root.after(UI_POLL_MS, drain_ui_queue)
+
+startup_timer.mark("tk_root")
+
+# ttk styles are set up by the first window that uses them
+style = None
+
+
+def ensure_styles():
+    """Configures the ttk styles once, on the Tk thread."""
+    global style
+    if style is not None:
+        return
+    style = ttk.Style()
+    style.theme_use("default")  # or "clam" if you prefer
+
+    style.configure("Vertical.TScrollbar",
+        gripcount=0,
+        background="#beb09c",
+        troughcolor="#f7f5ea",
+        bordercolor="#beb09c",
+        arrowcolor="#2a3347"
+    )
+
+    style.configure("Custom.TSpinbox",
+        arrowsize=12,
+        background="#f7f5ea",
+        foreground="#333333",
+        bordercolor="#beb09c",
+        lightcolor="#beb09c",
+        darkcolor="#beb09c",
+        arrowcolor="#333333",
+        relief="flat"
+    )
+
+    style.map("Custom.TSpinbox",
+        fieldbackground=[("readonly", "#f7f5ea"), ("!disabled", "#f7f5ea")],
+        background=[("active", "#f7f5ea"), ("!disabled", "#f7f5ea")]
+    )
 
 # -----------------------------
 # SETTINGS LOADER
@@ -135,7 +229,27 @@ def load_settings():
             "height_large": 25
         },
         "show_welcome": True,
-        "copy_references": False
+        "copy_references": False,
+        "reference_cache_size": 256,
+        "search_hotkey": {
+            "key": "s",
+            "ctrl": False,
+            "alt": True,
+            "shift": True
+        },
+        "search_result_limit": 50,
+        "popup_verse_limit": 500,  # popup.DEFAULT_VERSE_LIMIT
+        "book_aliases": {},  # house abbreviations, e.g. {"Jno": "John"}
+        "translation": translations.DEFAULT_TRANSLATION,
+        "translation_hotkey": {
+            "key": "t",
+            "ctrl": False,
+            "alt": True,
+            "shift": True
+        },
+        "latency_metrics": False,
+        "query_server": False,
+        "query_server_port": 47017  # server.DEFAULT_PORT
     }
 
     try:
@@ -145,18 +259,19 @@ def load_settings():
             # -----------------------------
             # MIGRATE OLD HOTKEY FORMAT
             # -----------------------------
-            hk = user_settings.get("hotkey")
+            for name in ("hotkey", "search_hotkey", "translation_hotkey"):
+                hk = user_settings.get(name)
 
-            # If the hotkey is a string (old format), replace with default structured dict
-            if isinstance(hk, str):
-                user_settings["hotkey"] = defaults["hotkey"]
+                # If the hotkey is a string (old format), replace with default structured dict
+                if isinstance(hk, str):
+                    user_settings[name] = defaults[name]
 
-            # If the hotkey is missing keys, also repair it
-            if isinstance(hk, dict):
-                for key in ("key", "ctrl", "alt", "shift"):
-                    if key not in hk:
-                        user_settings["hotkey"] = defaults["hotkey"]
-                        break
+                # If the hotkey is missing keys, also repair it
+                if isinstance(hk, dict):
+                    for key in ("key", "ctrl", "alt", "shift"):
+                        if key not in hk:
+                            user_settings[name] = defaults[name]
+                            break
 
             return merge_settings(defaults, user_settings)
 
@@ -165,6 +280,21 @@ def load_settings():
         return defaults
 
 
+def save_setting(key, value):
+    """Stores one top-level setting in settings.json, keeping the others as they are."""
+    try:
+        with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
+            user_settings = json.load(f)
+    except (OSError, ValueError):
+        user_settings = {}
+    user_settings[key] = value
+    try:
+        with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
+            json.dump(user_settings, f, indent=4)
+    except OSError as e:
+        print("Could not save settings.json:", e)
+
+
 def merge_settings(defaults, user):
     """Recursively merge user settings over defaults."""
     for key, value in defaults.items():
@@ -286,6 +416,7 @@ def show_welcome_popup():
 
 
 settings = load_settings()
+startup_timer.mark("settings")
 
 # Show welcome popup on first launch
 if settings.get("show_welcome", True):
@@ -306,8 +437,21 @@ def reload_settings():
 
     settings = load_settings()
 
+    # Rebuild the pooled passage popup with the new fonts and colours
+    if current_root is passage_window:
+        current_root = None
+    discard_passage_window()
+    get_passage_window()
+
     # Reapply key settings
     AUTO_CLOSE_SECONDS = settings["auto_close_seconds"]
+    reference_cache.resize(settings["reference_cache_size"])
+    if reference_parser is not None:
+        apply_book_aliases()
+    latency.enabled = settings["latency_metrics"]
+    apply_hotkeys()
+    if bible_ready.is_set():
+        apply_query_server()
     print("Settings reloaded successfully.")
 
 # -----------------------------
@@ -315,19 +459,30 @@ def reload_settings():
 # -----------------------------
 
 def create_tray_icon():
-    """Creates a Windows system tray icon with an Exit option."""
+    """Creates a Windows system tray icon with an Exit option and runs it (blocks)."""
+    start = time.perf_counter()
     try:
+        # Imported here: the tray thread starts after the hotkey listener
+        import pystray
+        from PIL import Image
         icon_image = Image.open(resource_path("FetchKJV.ico"))
     except Exception as e:
         print("Could not load tray icon:", e)
         return
 
     def on_exit(icon, item):
+        if latency.enabled:
+            save_latency_report()
         icon.stop()
         os._exit(0)
 
+    def on_save_latency_report(icon, item):
+        if save_latency_report():
+            show_popup(f"Latency report saved to\n{METRICS_PATH}", title="FetchKJV", small=True)
+
     menu = pystray.Menu(
-        pystray.MenuItem("Settings", lambda icon, item: open_settings_window()),
+        pystray.MenuItem("Settings", lambda icon, item: run_on_ui(open_settings_window)),
+        pystray.MenuItem("Save latency report", on_save_latency_report, visible=lambda item: latency.enabled),
         pystray.MenuItem("Exit", on_exit)
     )
 
@@ -339,7 +494,8 @@ def create_tray_icon():
         menu
     )
 
-    threading.Thread(target=icon.run, daemon=True).start()
+    startup_timer.record("tray_icon", time.perf_counter() - start)
+    icon.run()
 
 # -----------------------------
 # CONFIG
@@ -348,118 +504,298 @@ def create_tray_icon():
 AUTO_CLOSE_SECONDS = settings["auto_close_seconds"]
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 KJV_JSON_PATH = resource_path("kjv.json")
+KJV_CORPUS_PATH = corpus.find_corpus(KJV_JSON_PATH)  # kjv.kjvc, or the compressed kjv.kjvz
+CORPUS_CACHE_BYTES = 1024 * 1024  # decompressed text a kjv.kjvz keeps in memory
+
+# Other translations (asv.json or asv.kjvc, web.json, ylt.json) are picked
+# up from next to FetchKJV.exe or the settings folder once the KJV has loaded.
+# Each is opened by the first lookup in it; at most MAX_OPEN_TRANSLATIONS
+# stay open, and one unused for TRANSLATION_IDLE_SECONDS is closed again.
+MAX_OPEN_TRANSLATIONS = 2
+TRANSLATION_IDLE_SECONDS = 600
+translation_registry = translations.TranslationRegistry(
+    max_open=MAX_OPEN_TRANSLATIONS,
+    idle_seconds=TRANSLATION_IDLE_SECONDS,
+    cache_bytes=CORPUS_CACHE_BYTES
+)
+translation_registry.register(translations.DEFAULT_TRANSLATION, KJV_JSON_PATH, KJV_CORPUS_PATH)
 
-last_verses_clean = None
 last_reference_string = None
 current_root = None
 leave_timer = None
 awaiting_second_press = False
-clean_parts_with_refs = None
-clean_parts_without_refs = None
-clean_parts = None
 countdown_active = False
+countdown_job = None  # after() id of the next countdown tick
 
 kb_controller = Controller()
 
+# Parsed references and formatted titles of recent selections. The parser
+# itself is created once the Bible has loaded (it needs the chapter tables).
+reference_parser = None
+reference_cache = cache.ReferenceCache(
+    lambda text: reference_parser.get_references(text),
+    lambda ref: reference_parser.format_reference(ref),
+    settings["reference_cache_size"]
+)
+
+# Per-stage lookup timings, kept in memory while "latency_metrics" is on
+# in settings.json and written to METRICS_PATH from the tray menu or on exit
+METRICS_PATH = os.path.join(os.path.dirname(SETTINGS_PATH), "latency_metrics.json")
+latency = metrics.Metrics(enabled=settings["latency_metrics"])
+
+
+def save_latency_report():
+    """Writes p50/p95/p99 per lookup stage to METRICS_PATH. Returns True on success."""
+    try:
+        latency.dump(
+            METRICS_PATH,
+            version=__version__,
+            bible_load_ms=bible_load_seconds and round(bible_load_seconds * 1000, 1),
+            translations=translation_registry.stats()
+        )
+    except OSError as e:
+        print("Could not write latency report:", e)
+        return False
+    print(f"Latency report written to {METRICS_PATH}")
+    return True
+
 print("Starting FetchKJV...")
-create_tray_icon()
 
 # -----------------------------
 # LOAD KJV BIBLE
 # -----------------------------
 
-try:
-    if not os.path.exists(KJV_JSON_PATH):
-        raise FileNotFoundError(f"kjv.json not found at: {KJV_JSON_PATH}")
-    
-    with open(KJV_JSON_PATH, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    if 'verses' not in data:
-        raise ValueError("kjv.json is missing the 'verses' key")
-    
-    verses = data['verses']
-    # Build fast lookup index: (book, chapter, verse) → text
-    verse_index = {
-        (entry['book_name'], entry['chapter'], entry['verse']): entry['text']
-        for entry in verses
-    }
-    print("KJV Bible loaded successfully (offline mode).")
-except Exception as e:
-    print("FATAL ERROR - Could not load Bible data:")
-    print(str(e))
-    print("\nPress Enter to exit...")
-    input()
-    sys.exit(1)
+# The Bible loads on a background thread so the tray icon and hotkey
+# listener come up immediately. process_text waits on bible_ready.
+
+BIBLE_LOAD_TIMEOUT = 3  # seconds a hotkey press waits for the Bible to finish loading
+LOAD_LOG_PATH = os.path.join(os.path.dirname(SETTINGS_PATH), "load_times.log")
+SEARCH_INDEX_PATH = os.path.join(os.path.dirname(SETTINGS_PATH), "search.kjvi")
+
+verse_store = None
+bible_ready = threading.Event()
+bible_load_error = None
+bible_load_seconds = None
+
+# Full-text index, loaded (or built on first run) after the Bible
+search_index = None
+search_ready = threading.Event()
+
+
+def load_bible():
+    """Load verse_store, record how long it took and report failures in a popup."""
+    global verse_store, reference_parser, bible_load_error, bible_load_seconds
+    start = time.perf_counter()
+    try:
+        # Verse text by integer verse ID, read from kjv.kjvc when it is bundled
+        verse_store = translation_registry.store(translations.DEFAULT_TRANSLATION)
+        # Fast parser for common references; falls back to pythonbible
+        reference_parser = refparser.ReferenceParser(verse_store)
+        apply_book_aliases()
+    except Exception as e:
+        bible_load_error = e
+        print("FATAL ERROR - Could not load Bible data:")
+        print(traceback.format_exc())
+        show_popup(f"Error:\nCould not load Bible data:\n{str(e)}", title="Error", small=True)
+        return
+    finally:
+        bible_load_seconds = time.perf_counter() - start
+        startup_timer.record("bible", bible_load_seconds)
+        bible_ready.set()
+
+    source = f"kjv.{verse_store.source}"
+    print(f"KJV Bible loaded from {source} in {bible_load_seconds * 1000:.1f} ms (offline mode).")
+
+    # Keep a history of load times so cold-start regressions are visible
+    try:
+        with open(LOAD_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')}\t{__version__}\t{source}\t{bible_load_seconds * 1000:.1f} ms\n")
+    except OSError as e:
+        print("Could not write load time log:", e)
+
+    found = translation_registry.discover([
+        os.path.dirname(os.path.abspath(sys.argv[0])),  # next to FetchKJV.exe
+        os.path.dirname(KJV_JSON_PATH),
+        os.path.dirname(SETTINGS_PATH)
+    ])
+    if len(found) > 1:
+        print("Translations available:", ", ".join(found))
+    translation_registry.on_open = log_translation_open
+
+    load_search_index()
+    apply_query_server()
+
+    # Unusual references fall back to pythonbible; import it before one does
+    start = time.perf_counter()
+    if refparser.preload_fallback():
+        startup_timer.record("pythonbible", time.perf_counter() - start)
+
+
+def apply_book_aliases():
+    """Loads settings["book_aliases"] into the reference parser.
+
+    Only the aliases that changed are added to or removed from its book
+    name trie. Cached parses may have read an old alias, so they are dropped.
+    """
+    for alias in reference_parser.set_aliases(settings["book_aliases"]):
+        print(f"Ignoring book alias {alias!r}: an alias is words, and its book a known book name.")
+    reference_cache.invalidate()
+
+
+def log_translation_open(translation):
+    """Reports how long opening another translation took (on its first lookup)."""
+    stats = translation.stats()
+    print(f"{translation.code} opened from {stats['source']} in {stats['open_ms']} ms ({stats['bytes'] / 1e6:.1f} MB).")
+    try:
+        with open(LOAD_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')}\t{__version__}\t{translation.code} {stats['source']}\t{stats['open_ms']} ms\n")
+    except OSError as e:
+        print("Could not write load time log:", e)
+
+
+def load_search_index():
+    """Open the saved search index, rebuilding it if the Bible text has changed."""
+    global search_index
+    start = time.perf_counter()
+    try:
+        search_index = search.load_search_index(verse_store, SEARCH_INDEX_PATH)
+    except Exception:
+        print("Could not load search index:")
+        print(traceback.format_exc())
+    else:
+        print(f"Search index ready in {(time.perf_counter() - start) * 1000:.1f} ms.")
+    finally:
+        startup_timer.record("search_index", time.perf_counter() - start)
+        search_ready.set()
+
+
+def wait_for_bible():
+    """Block until the Bible is loaded. Returns False (after telling the user) if it isn't usable."""
+    if not bible_ready.wait(BIBLE_LOAD_TIMEOUT):
+        show_popup("Still loading the Bible…\nPlease try again in a moment.", title="FetchKJV", small=True)
+        return False
+    if bible_load_error is not None:
+        show_popup(f"Error:\nCould not load Bible data:\n{str(bible_load_error)}", title="Error", small=True)
+        return False
+    return True
+
+# -----------------------------
+# QUERY SERVER
+# -----------------------------
+
+# With "query_server" on in settings.json, other programs on this machine
+# can look verses up in the Bible FetchKJV already has loaded (protocol in
+# fetchkjv/server.py).
+
+query_server = None  # server.ServerThread while running
+query_server_lock = threading.Lock()
+
+
+def apply_query_server():
+    """Starts, stops or moves the query server to match the settings."""
+    global query_server
+    with query_server_lock:
+        wanted = settings["query_server"] and verse_store is not None
+        port = settings["query_server_port"]
+
+        if query_server is not None and (not wanted or query_server.server.port != port):
+            query_server.stop()
+            query_server = None
+        if not wanted or query_server is not None:
+            return
+
+        # Imported only when the server is on: it pulls in asyncio
+        from fetchkjv import server
+
+        handler = server.QueryHandler(
+            verse_store,
+            reference_parser,
+            reference_cache,
+            search_index=lambda: search_index,
+            search_limit=settings["search_result_limit"],
+        )
+        thread = server.ServerThread(server.QueryServer(handler, port=port))
+        try:
+            host, port = thread.start()
+        except OSError as e:
+            print(f"Could not start the query server on port {port}:", e)
+            return
+        query_server = thread
+        print(f"Query server listening on {host}:{port}")
 
 # -----------------------------
 # RTF CLIPBOARD FUNCTIONS
 # -----------------------------
 
+# Windows clipboard (pywin32) with RTF support; pyperclip elsewhere
+clipboard_backend = clipboard.default_backend()
+
+
 def copy_rtf_to_clipboard(rtf_text, plain_text):
-    """Places RTF + clean plain text onto the Windows clipboard."""
-    win32clipboard.OpenClipboard()
-    try:
-        win32clipboard.EmptyClipboard()
+    """Places RTF + clean plain text onto the clipboard."""
+    clipboard_backend.set_rich_text(rtf_text, plain_text)
+
 
-        CF_RTF = win32clipboard.RegisterClipboardFormat("Rich Text Format")
 
-        # RTF for Word and other rich editors
-        win32clipboard.SetClipboardData(CF_RTF, rtf_text.encode('utf-8'))
+# -----------------------------
+# CLIPBOARD PAYLOADS
+# -----------------------------
 
-        # Clean plain text for Notepad and simple editors
-        win32clipboard.SetClipboardData(win32con.CF_UNICODETEXT, plain_text)
+# The first press builds the clipboard text for both copy modes in the
+# background, so the second press (or a copy button) only hands over bytes.
+# Payloads are cached by reference set, so re-copying a recent passage is free.
 
-    finally:
-        win32clipboard.CloseClipboard()
+payload_cache = cache.LRUCache(32)
+payload_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="payload")
+current_payload = None  # Future → ClipboardPayload for the passage on screen
+
+
+def request_payload(references, passage_blocks, translation=translations.DEFAULT_TRANSLATION):
+    """Future of the ClipboardPayload for a lookup, from the cache when possible.
 
+    passage_blocks() returns the lookup's [(ref_str, StyledText)]; it is
+    called on the payload thread, and only on a cache miss.
+    """
+    key = (translation,) + tuple(cache.reference_key(ref) for ref in references)
 
+    payload = payload_cache.get(key)
+    if payload is not None:
+        future = Future()
+        future.set_result(payload)
+        return future
 
-def convert_brackets_to_rtf(text):
-    r"""Converts [bracketed text] → {\i italic text} and \n\n → \par\par."""
-    def repl(match):
-        inner = match.group(1)
-        return r"{\i " + inner + "}"
-    
-    text = re.sub(r"\[(.*?)\]", repl, text)
-    text = text.replace("\n\n", r"\par\par ")
-    text = text.replace("\n", r"\par ")
-    return text
+    def build():
+        started = latency.clock()
+        payload = encode_payload(passage_blocks())
+        payload_cache.put(key, payload)
+        latency.record_since("payload_build", started)
+        return payload
 
+    return payload_executor.submit(build)
 
-def build_rtf_document(rtf_body):
-    """Wraps RTF body into a valid RTF document."""
-    return r"{\rtf1\ansi " + rtf_body + "}"
 
-def strip_brackets(text):
-    """Removes [bracketed] text markers for plain-text clipboard output."""
-    return re.sub(r"\[(.*?)\]", r"\1", text)
+def copy_payload(include_refs):
+    """Copies the prepared passage to the clipboard."""
+    rtf_bytes, plain_text = current_payload.result().select(include_refs)
+    copy_rtf_to_clipboard(rtf_bytes, plain_text)
 
 # -----------------------------
 # CORE FUNCTIONS
 # -----------------------------
 
-def get_selected_text():
-    original_clipboard = pyperclip.paste()
-
+def send_copy_keys():
+    """Presses Ctrl+C in the focused application."""
     # ---------------------------------------------------
     # Release Alt before copying (fixes Alt hotkey issue)
     # ---------------------------------------------------
-    try:
-        kb_controller.release(Key.alt)
-    except: pass
-    try:
-        kb_controller.release(Key.alt_l)
-    except: pass
-    try:
-        kb_controller.release(Key.alt_r)
-    except: pass
-    try:
-        kb_controller.release(Key.alt_gr)
-    except: pass
+    if hotkey_matcher.held() & hotkeys.ALT:
+        for key in (Key.alt, Key.alt_l, Key.alt_r, Key.alt_gr):
+            try:
+                kb_controller.release(key)
+            except: pass
 
-    # Give Windows time to exit menu mode
-    time.sleep(0.05)
+        # Give Windows time to exit menu mode
+        time.sleep(0.05)
 
     # ---------------------------------------------------
     # Perform Ctrl+C to capture selected text
@@ -468,40 +804,58 @@ def get_selected_text():
         kb_controller.press('c')
         kb_controller.release('c')
 
-    time.sleep(0.1)
 
-    selected = pyperclip.paste()
+def get_selected_text():
+    """The selected text, read through the clipboard as soon as the copy lands."""
+    return clipboard.capture_selection(clipboard_backend, send_copy_keys).strip()
 
-    # Restore original clipboard
-    pyperclip.copy(original_clipboard)
 
-    return selected.strip()
 
+def current_translation():
+    """Code of the translation lookups show: the one in settings, if it is available."""
+    code = str(settings["translation"]).upper()
+    return code if code in translation_registry else translations.DEFAULT_TRANSLATION
 
 
-def get_verse_text(book_name, chapter, verse_start, verse_end=None):
-    texts = []
-    end = verse_end if verse_end else verse_start
+def acquire_translation(translation=None):
+    """(VerseStore, code) of a translation, opened if needed; the KJV if it can't be opened.
 
-    for v in range(verse_start, end + 1):
-        key = (book_name, chapter, v)
-        verse_text = verse_index.get(key)
+    The store stays open until translation_registry.release(store), even if
+    a lookup for another translation evicts it meanwhile.
+    """
+    code = translation or current_translation()
+    try:
+        return translation_registry.acquire(code), code
+    except (OSError, ValueError, translations.TranslationError) as e:
+        print(f"Could not open translation {code}, showing the KJV:", e)
+        return translation_registry.acquire(translations.DEFAULT_TRANSLATION), translations.DEFAULT_TRANSLATION
 
-        if verse_text:
-            texts.append(f"{v} {verse_text}")
-        else:
-            texts.append(f"{v} [Verse not found]")
 
-    return " ".join(texts).strip()
+def read_verses(translation, ref):
+    """passages.label_verses of a reference, with the translation held open while they are read."""
+    with translation_registry.reading(translation) as store:
+        yield from passages.label_verses(passages.iter_reference(store, ref, styled=True))
+
 
 
+def cancel_countdown(root):
+    """Stops the "Closing in…" countdown of a popup."""
+    global countdown_job, countdown_active
+    countdown_active = False
+    if countdown_job:
+        try:
+            root.after_cancel(countdown_job)
+        except:
+            pass
+        countdown_job = None
+
 
 def on_mouse_enter(root):
-    global leave_timer, countdown_active
+    global leave_timer
     if leave_timer:
         root.after_cancel(leave_timer)
         leave_timer = None
-    countdown_active = False
+    cancel_countdown(root)
     if hasattr(root, "countdown_label"):
         root.countdown_label.config(text="")
 
@@ -509,12 +863,14 @@ def on_mouse_leave(root):
     global leave_timer, countdown_active
 
     def update_countdown(seconds_left):
+        global countdown_job
+        countdown_job = None
         if not root.winfo_exists() or not countdown_active:
             return
         if hasattr(root, "countdown_label"):
             root.countdown_label.config(text=f"Closing in {seconds_left}…")
         if seconds_left > 1:
-            root.after(1000, lambda: update_countdown(seconds_left - 1))
+            countdown_job = root.after(1000, lambda: update_countdown(seconds_left - 1))
 
     if leave_timer:
         try:
@@ -522,6 +878,8 @@ def on_mouse_leave(root):
         except:
             pass
 
+    # The passage window is reused, so an earlier countdown may still be ticking
+    cancel_countdown(root)
     countdown_active = True
     if hasattr(root, "countdown_label"):
         root.countdown_label.config(text=f"Closing in {AUTO_CLOSE_SECONDS}…")
@@ -540,9 +898,14 @@ def safe_close(root):
             pass
         leave_timer = None
 
-    # Now safely destroy the window
+    # The pooled passage window is only hidden; anything else is destroyed
     try:
-        if root.winfo_exists():
+        if root is passage_window:
+            cancel_countdown(root)
+            stop_passage_fill(root)
+            root.countdown_label.config(text="")
+            root.withdraw()
+        elif root.winfo_exists():
             root.destroy()
     except:
         pass
@@ -551,115 +914,428 @@ def safe_close(root):
     awaiting_second_press = False
 
 
-def process_text():
-    global last_verses_clean, last_reference_string, clean_parts, clean_parts_with_refs, clean_parts_without_refs, current_root, awaiting_second_press
-    try:
-        
-        # SECOND PRESS — only valid if popup is still open
-        if awaiting_second_press and current_root and current_root.winfo_exists():
-            combined = "".join(clean_parts).strip()
-            plain_text = strip_brackets(combined)
-            rtf_body = convert_brackets_to_rtf(combined)
-            rtf_full = build_rtf_document(rtf_body)
-            copy_rtf_to_clipboard(rtf_full, plain_text)
+def popup_is_open():
+    """True if the passage popup is on screen. Call on the Tk thread."""
+    return bool(current_root and current_root.winfo_exists())
 
-            current_root.after(0, lambda: safe_close(current_root))
-            show_popup("Bible verses copied to clipboard!", title="Copied!", small=True)
 
-            awaiting_second_press = False
+def copy_on_second_press(trace=metrics.NULL_TRACE):
+    """Copies the open popup's passage if this press is a second press. Returns True if it was."""
+    global awaiting_second_press
+
+    # SECOND PRESS — only valid if popup is still open
+    if not (awaiting_second_press and run_on_ui(popup_is_open).result()):
+        return False
+
+    copy_payload(settings.get("copy_references", False))
+    trace.lap("copy")
+
+    root = current_root
+    run_on_ui(safe_close, root)
+    show_popup("Bible verses copied to clipboard!", title="Copied!", small=True)
+
+    awaiting_second_press = False
+    return True
+
+
+def process_text(trace=metrics.NULL_TRACE):
+    try:
+        trace.lap("dispatch")
+        
+        if copy_on_second_press(trace):
             return
 
         # FIRST PRESS — read selection and show popup
         selected = get_selected_text()
+        trace.lap("capture")
         if not selected:
             return
 
-        references = bible.get_references(selected)
-        if not references:
-            return
+        lookup_text(selected, trace=trace)
 
-        formatted_refs = ", ".join(bible.format_single_reference(ref) for ref in references)
-        structured_lines = [("title", formatted_refs)]
-        
-        clean_parts_with_refs = []
-        clean_parts_without_refs = []
-
-        for ref in references:
-            ref_str = bible.format_single_reference(ref)
-            book_title = ref.book.title
-
-            verse_text = get_verse_text(
-                book_title,
-                ref.start_chapter,
-                ref.start_verse,
-                ref.end_verse
-            )
+    except Exception as e:
+        error_msg = traceback.format_exc()
+        print("Error in hotkey processing:")
+        print(error_msg)
+        show_popup(f"Error:\n{str(e)}", title="Error", small=True)
 
-            if ref.end_chapter and ref.end_chapter > ref.start_chapter:
-                extra = get_verse_text(
-                    book_title,
-                    ref.end_chapter,
-                    1,
-                    ref.end_verse
-                )
-                if "[not found]" not in extra.lower():
-                    verse_text += " " + extra
 
-            structured_lines.append(("ref", ref_str))
-            structured_lines.append(("verse", verse_text))
+def lookup_text(text, report_missing=False, trace=metrics.NULL_TRACE):
+    """Shows the passages of the references in text (with a note if there are none and report_missing)."""
+    if not wait_for_bible():
+        return
+    trace.lap("wait_bible")
+
+    references = reference_cache.get_references(text)
+    trace.lap("parse")
+    if not references:
+        if report_missing:
+            show_popup(f"No Bible reference found in\n{text}", title="FetchKJV", small=True)
+        return
 
-            clean_parts_with_refs.append(f"{ref_str}\n{verse_text}\n\n")
-            clean_parts_without_refs.append(f"{verse_text}\n\n")
+    show_references(references, trace=trace)
 
-        clean_parts = clean_parts_with_refs if settings.get("copy_references", False) else clean_parts_without_refs
-        
-        last_verses_clean = "\n\n".join(clean_parts).strip()
-        last_reference_string = formatted_refs
-
-        def mark_ready_for_second_press():
-            global awaiting_second_press
-            awaiting_second_press = True
-            
-        # Schedule this after the popup is created
-        hidden_root.after(200, mark_ready_for_second_press)
-        print("Second press now enabled.")
-        show_popup(structured_lines, title="Bible Verses (KJV)", small=False)
+
+def process_search(trace=metrics.NULL_TRACE):
+    """Search hotkey: show the verses containing the selected words."""
+    try:
+        trace.lap("dispatch")
+
+        if copy_on_second_press(trace):
+            return
+
+        # FIRST PRESS — search for the selection
+        selected = get_selected_text()
+        trace.lap("capture")
+        if not selected:
+            return
+
+        search_text(selected, trace=trace)
 
     except Exception as e:
         error_msg = traceback.format_exc()
-        print("Error in hotkey processing:")
+        print("Error in search:")
         print(error_msg)
         show_popup(f"Error:\n{str(e)}", title="Error", small=True)
 
 
+def search_text(text, trace=metrics.NULL_TRACE):
+    """Shows the verses containing the words of text."""
+    if not wait_for_bible():
+        return
+    if not search_ready.wait(BIBLE_LOAD_TIMEOUT):
+        show_popup("Still building the search index…\nPlease try again in a moment.", title="FetchKJV", small=True)
+        return
+    if search_index is None:
+        show_popup("Error:\nSearch is not available.", title="Error", small=True)
+        return
+    trace.lap("wait_bible")
+
+    query = " ".join(text.split())
+    try:
+        matches = search_index.search(query)
+    except search.SearchError as e:
+        show_popup(f"Search:\n{e}", title="FetchKJV", small=True)
+        return
+    trace.lap("search")
+
+    if not matches:
+        show_popup(f"No verses found for\n{query}", title="Search", small=True)
+        return
+
+    limit = settings["search_result_limit"]
+    shown = f"{limit} of {len(matches)}" if len(matches) > limit else f"{len(matches)}"
+    references = [reference_parser.verse_reference(vid) for vid in matches[:limit]]
+    # The index is of the KJV text, so the matches are shown in the KJV
+    show_references(
+        references,
+        title=f"{query} — {shown} verse{'s' if len(matches) != 1 else ''}",
+        translation=translations.DEFAULT_TRANSLATION,
+        trace=trace
+    )
+
+
+def switch_translation(trace=metrics.NULL_TRACE):
+    """Translation hotkey: later lookups show the next available translation."""
+    try:
+        codes = translation_registry.codes
+        if len(codes) < 2:
+            show_popup("No other translations installed.", title="FetchKJV", small=True)
+            return
+
+        current = current_translation()
+        code = codes[(codes.index(current) + 1) % len(codes)]
+        settings["translation"] = code
+        save_setting("translation", code)
+        print(f"Translation switched to {code}.")
+        show_popup(f"{translation_registry.name(code)} ({code})", title="FetchKJV", small=True)
+
+    except Exception as e:
+        print("Error switching translation:")
+        print(traceback.format_exc())
+        show_popup(f"Error:\n{str(e)}", title="Error", small=True)
+
+
+def show_references(references, title=None, translation=None, trace=metrics.NULL_TRACE):
+    """Shows the passages of references in the large popup and prepares their copy."""
+    global last_reference_string, current_payload
+
+    formatted_refs = title or ", ".join(reference_cache.format_reference(ref) for ref in references)
+    structured_lines = [("title", formatted_refs)]
+
+    ref_strs = [reference_cache.format_reference(ref) for ref in references]
+    store, translation = acquire_translation(translation)
+
+    # Nothing is read here: the popup reads the verses as it streams them in
+    # (see fill_passage_window) and the copy is formatted by the payload job,
+    # so a whole book opens as fast as a verse. Both hold the translation
+    # open while they read, as it may be evicted by then
+    try:
+        for ref, ref_str in zip(references, ref_strs):
+            structured_lines.append(("ref", ref_str))
+            structured_lines.append(("verses", (passages.count_reference(store, ref), read_verses(translation, ref))))
+    finally:
+        translation_registry.release(store)
+    trace.lap("passages")
+
+    def passage_blocks():
+        with translation_registry.reading(translation) as store:
+            return [
+                (ref_str, passages.format_passage(passages.iter_reference(store, ref, styled=True)))
+                for ref, ref_str in zip(references, ref_strs)
+            ]
+
+    current_payload = request_payload(references, passage_blocks, translation)
+    last_reference_string = formatted_refs
+
+    def mark_ready_for_second_press():
+        global awaiting_second_press
+        awaiting_second_press = True
+        
+    # Schedule this after the popup is created
+    run_on_ui(hidden_root.after, 200, mark_ready_for_second_press)
+    print("Second press now enabled.")
+    show_popup(structured_lines, title=f"Bible Verses ({translation})", small=False, trace=trace)
+
+
 # -----------------------------
 # BIBLE POP-UP
 # -----------------------------
 
-def show_popup(lines, title="Bible Verses (KJV)", small=False):
-    global current_root, leave_timer
+# The passage popup is built once (hidden, at startup) and reused: a lookup
+# refills its Text widget and shows it again, and closing only withdraws it.
+
+passage_window = None
+
+
+def build_passage_window():
+    """Creates the (hidden) passage popup and its widgets."""
+    ensure_styles()
+    root = tk.Toplevel(hidden_root)
+    root.withdraw()
+    root.iconbitmap(resource_path("FetchKJV.ico"))
+    root.attributes('-topmost', True)
+    root.resizable(True, True)
+    root.configure(bg=settings["popup"]["bg_large"])
+
+    border_frame = tk.Frame(root, bg=settings["popup"]["bg_large"])
+    border_frame.pack(expand=True, fill="both", padx=4, pady=4)
+    root.border_frame = border_frame  # So hover and countdown logic can access it
+
+    # Create a sub-frame to hold the Text and Scrollbar
+    text_scroll_frame = tk.Frame(border_frame, bg=settings["popup"]["bg_large"])
+    text_scroll_frame.pack(expand=True, fill="both", padx=12, pady=12)
+
+    # Create the Text widget
+    text_widget = tk.Text(
+        text_scroll_frame,
+        width=settings["popup"]["width_large"],
+        height=settings["popup"]["height_large"],
+        font=tuple(settings["popup"]["font_large"]),
+        wrap=tk.WORD,
+        bg='#fafafa',
+        padx=10,
+        pady=8
+    )
+    text_widget.pack(side="left", fill="both", expand=True)
+    root.text_widget = text_widget
+
+    # Define tag styles
+    text_widget.tag_configure("title", font=("Segoe UI", 14, "bold"))
+    text_widget.tag_configure("ref", font=("Segoe UI", 11, "bold"), foreground="#333333")
+    text_widget.tag_configure("divider", foreground="#beb09c", font=("Segoe UI", 9))
+    text_widget.tag_configure("italic", font=tuple(settings["popup"]["font_large"][:2]) + ("italic",))
+    text_widget.tag_configure("load_more", font=("Segoe UI", 10, "underline"), foreground="#7a6a52")
+    text_widget.tag_bind("load_more", "<Button-1>", lambda e: load_more_verses(root))
+    text_widget.tag_bind("load_more", "<Enter>", lambda e: text_widget.config(cursor="hand2"))
+    text_widget.tag_bind("load_more", "<Leave>", lambda e: text_widget.config(cursor="xterm"))
+
+    # Create the Scrollbar
+    scrollbar = ttk.Scrollbar(text_scroll_frame, orient="vertical", command=text_widget.yview)
+    scrollbar.pack(side="right", fill="y")
+    text_widget.config(yscrollcommand=scrollbar.set)
+
+    text_widget.config(state='disabled')
+
+    def copy_to_clipboard(include_refs):
+        copy_payload(include_refs)
+        show_popup("Bible verses copied to clipboard!", title="Copied!", small=True)
+        safe_close(root)
+
+    btn_frame = tk.Frame(border_frame, bg=settings["popup"]["bg_large"])
+    btn_frame.pack(fill="x", pady=(0, 12), padx=10)
+
+    # Left-aligned buttons in a sub-frame
+    left_btns = tk.Frame(btn_frame, bg=settings["popup"]["bg_large"])
+    left_btns.grid(row=0, column=0, sticky="w")
 
-    def run():
-        global current_root, leave_timer
+    tk.Button(
+        left_btns,
+        text="Copy with references",
+        font=("Segoe UI", 10),
+        bg="#beb09c",
+        command=lambda: copy_to_clipboard(True)
+    ).pack(side="left", padx=5)
 
-        # Normalize input
-        if small and isinstance(lines, str):
-            message_text = lines
-        elif small:
-            message_text = ""
-        else:
-            message_text = None  # not used in large popup
-        
-        if current_root and not small:
-            current_root.after(0, lambda: safe_close(current_root))
+    tk.Button(
+        left_btns,
+        text="Copy without references",
+        font=("Segoe UI", 10),
+        bg="#beb09c",
+        command=lambda: copy_to_clipboard(False)
+    ).pack(side="left", padx=5)
+
+    tk.Button(
+        left_btns,
+        text="Close",
+        font=("Segoe UI", 10),
+        bg="#beb09c",
+        command=lambda: safe_close(root)
+    ).pack(side="left", padx=5)
+
+    # Right-aligned countdown label
+    countdown_label = tk.Label(
+        btn_frame,
+        text="",
+        font=("Segoe UI", 9, "italic"),
+        fg="gray",
+        bg=settings["popup"]["bg_large"],
+        anchor="e",
+        justify="right"
+    )
+    countdown_label.grid(row=0, column=1, sticky="e")
+
+    # Make column 1 expand to push label right
+    btn_frame.grid_columnconfigure(1, weight=1)
+
+    root.countdown_label = countdown_label
+
+
+    def bind_hover_events(widget):
+        try:
+            widget.bind('<Enter>', lambda e: on_mouse_enter(root))
+            widget.bind('<Leave>', lambda e: on_mouse_leave(root))
+            if widget.winfo_exists():
+                for child in widget.winfo_children():
+                    bind_hover_events(child)
+        except Exception as ex:
+            print(f"Hover binding failed on {widget}: {ex}")
+
+    bind_hover_events(root)
+
+    root.bind('<Escape>', lambda e: safe_close(root))
+    root.protocol("WM_DELETE_WINDOW", lambda: safe_close(root))
+
+    return root
+
+
+def get_passage_window():
+    """The pooled passage popup, built on first use (or after a settings change)."""
+    global passage_window
+    if passage_window is None or not passage_window.winfo_exists():
+        passage_window = build_passage_window()
+    return passage_window
+
+
+def discard_passage_window():
+    """Destroys the pooled popup so the next lookup rebuilds it (e.g. with new fonts)."""
+    global passage_window
+    if passage_window is not None:
+        try:
+            stop_passage_fill(passage_window)
+            passage_window.destroy()
+        except tk.TclError:
+            pass
+        passage_window = None
+
+
+# Long passages are inserted in batches: the first screenful at once, the
+# rest from after() callbacks every POPUP_BATCH_MS, so a whole book doesn't
+# freeze the UI. After settings["popup_verse_limit"] verses the popup stops
+# and offers to load more.
+POPUP_BATCH_MS = 1
+
+
+def fill_passage_window(root, lines, title):
+    """Replaces the popup's title and text with lines, inserting the first screenful."""
+    stop_passage_fill(root)
+    root.title(title)
+
+    text_widget = root.text_widget
+    text_widget.config(state='normal')
+    text_widget.delete("1.0", tk.END)
+    text_widget.config(state='disabled')
+
+    root.popup_text = popup.PopupText(lines, settings["popup_verse_limit"])
+    screenful = settings["popup"]["width_large"] * settings["popup"]["height_large"]
+    insert_passage_batch(root, screenful)
+    text_widget.yview_moveto(0.0)
+
+
+def insert_passage_batch(root, max_chars=popup.BATCH_CHARS):
+    """Inserts the next batch of the popup's text and schedules the one after it."""
+    root.fill_job = None
+    stream = root.popup_text
+    batch = stream.next_batch(max_chars)
+
+    text_widget = root.text_widget
+    text_widget.config(state='normal')
+    if batch:
+        text_widget.insert(tk.END, *popup.insert_args(batch))
+    if stream.paused:
+        shown = min(stream.verse_limit, stream.remaining_verses)
+        text_widget.insert(
+            tk.END,
+            f"\n\nShow {shown} more verses ({stream.remaining_verses} left)",
+            ("load_more",)
+        )
+    text_widget.config(state='disabled')
+
+    if not stream.done and not stream.paused:
+        root.fill_job = root.after(POPUP_BATCH_MS, lambda: insert_passage_batch(root))
+
+
+def load_more_verses(root):
+    """The popup's "Show more verses" link: streams the next popup_verse_limit verses."""
+    stream = getattr(root, "popup_text", None)
+    if stream is None or not stream.paused:
+        return
+    text_widget = root.text_widget
+    text_widget.config(state='normal')
+    text_widget.delete("load_more.first", "load_more.last")
+    text_widget.config(state='disabled')
+    stream.more()
+    insert_passage_batch(root)
+
+
+def stop_passage_fill(root):
+    """Cancels the batches still to be inserted into the popup."""
+    job = getattr(root, "fill_job", None)
+    if job is not None:
+        root.after_cancel(job)
+        root.fill_job = None
+    # Lets go of the translation the unread verses hold open
+    stream = getattr(root, "popup_text", None)
+    if stream is not None:
+        stream.close()
+        root.popup_text = None
+
+
+def show_popup(lines, title="Bible Verses (KJV)", small=False, trace=metrics.NULL_TRACE):
+    """Opens a popup; safe to call from any thread (the window is built on the Tk thread)."""
 
-        root = tk.Toplevel(hidden_root)
-        root.iconbitmap(resource_path("FetchKJV.ico"))
-        current_root = root
-        root.title(title)
-        root.attributes('-topmost', True)
+    def run():
+        global current_root, leave_timer, awaiting_second_press
+        trace.lap("ui_queue")
 
         if small:
+            message_text = lines if isinstance(lines, str) else ""
+
+            root = tk.Toplevel(hidden_root)
+            root.iconbitmap(resource_path("FetchKJV.ico"))
+            current_root = root
+            root.title(title)
+            root.attributes('-topmost', True)
             root.resizable(False, False)
             root.configure(bg=settings["popup"]["bg_small"])
 
@@ -682,162 +1358,35 @@ def show_popup(lines, title="Bible Verses (KJV)", small=False):
             # ⏱️ Auto-close the small popup after 1.5 seconds
             root.after(1000, lambda: safe_close(root))
 
-        else:
-            root.resizable(True, True)
-            root.configure(bg=settings["popup"]["bg_large"])
-
-            border_frame = tk.Frame(root, bg=settings["popup"]["bg_large"])
-            border_frame.pack(expand=True, fill="both", padx=4, pady=4)
-            root.border_frame = border_frame  # So hover and countdown logic can access it
-
-            # Create a sub-frame to hold the Text and Scrollbar
-            text_scroll_frame = tk.Frame(border_frame, bg=settings["popup"]["bg_large"])
-            text_scroll_frame.pack(expand=True, fill="both", padx=12, pady=12)
-
-            # Create the Text widget
-            text_widget = tk.Text(
-                text_scroll_frame,
-                width=settings["popup"]["width_large"],
-                height=settings["popup"]["height_large"],
-                font=tuple(settings["popup"]["font_large"]),
-                wrap=tk.WORD,
-                bg='#fafafa',
-                padx=10,
-                pady=8
-            )
-            text_widget.pack(side="left", fill="both", expand=True)
-
-            # Define tag styles
-            text_widget.tag_configure("title", font=("Segoe UI", 14, "bold"))
-            text_widget.tag_configure("ref", font=("Segoe UI", 11, "bold"), foreground="#333333")
-            text_widget.tag_configure("divider", foreground="#beb09c", font=("Segoe UI", 9))
-
-            # Create the Scrollbar
-            scrollbar = ttk.Scrollbar(text_scroll_frame, orient="vertical", command=text_widget.yview)
-            scrollbar.pack(side="right", fill="y")
-
-            # Insert content BEFORE binding scrollbar
-            for i, (tag, content) in enumerate(lines):
-                if tag == "title":
-                    text_widget.insert(tk.END, content + "\n", tag)
-                    text_widget.insert(tk.END, "―" * 60 + "\n\n", "divider")  # divider after title
-                elif tag == "ref":
-                    # Skip if this ref is identical to the title
-                    if content.strip() == lines[0][1].strip():
-                        continue
-                    text_widget.insert(tk.END, content + "\n", tag)
-                elif tag == "verse":
-                    text_widget.insert(tk.END, content + "\n\n")
-                else:
-                    text_widget.insert(tk.END, content + "\n\n", tag)
-
-
-            # Force layout update and anchor scroll
-            text_widget.update_idletasks()
-            text_widget.yview_moveto(0.0)
-
-            # THEN bind scrollbar
-            text_widget.config(yscrollcommand=scrollbar.set)
-
-            # Define tag for title styling
-            text_widget.tag_configure(
-                "title",
-                font=("Segoe UI", 14, "bold"),
-            )
-
-            # Define tag for Reference styling
-            text_widget.tag_configure(
-                "ref",
-                font=("Segoe UI", 11, "bold"),
-                foreground="#333333"
-            )
-            
-            text_widget.config(state='disabled')
-
-            def copy_to_clipboard(include_refs):
-                parts = clean_parts_with_refs if include_refs else clean_parts_without_refs
-                combined = "".join(parts).strip()
-                if not include_refs:
-                    combined = "\n\n".join([
-                        strip_brackets(re.sub(r"^.*?\n", "", block.strip()))
-                        for block in clean_parts
-                    ]).strip()
-                plain_text = strip_brackets(combined)
-                rtf_body = convert_brackets_to_rtf(combined)
-                rtf_full = build_rtf_document(rtf_body)
-                copy_rtf_to_clipboard(rtf_full, plain_text)
-                show_popup("Bible verses copied to clipboard!", title="Copied!", small=True)
-                safe_close(root)
-
-            btn_frame = tk.Frame(border_frame, bg=settings["popup"]["bg_large"])
-            btn_frame.pack(fill="x", pady=(0, 12), padx=10)
-
-            # Left-aligned buttons in a sub-frame
-            left_btns = tk.Frame(btn_frame, bg=settings["popup"]["bg_large"])
-            left_btns.grid(row=0, column=0, sticky="w")
-
-            tk.Button(
-                left_btns,
-                text="Copy with references",
-                font=("Segoe UI", 10),
-                bg="#beb09c",
-                command=lambda: copy_to_clipboard(True)
-            ).pack(side="left", padx=5)
-
-            tk.Button(
-                left_btns,
-                text="Copy without references",
-                font=("Segoe UI", 10),
-                bg="#beb09c",
-                command=lambda: copy_to_clipboard(False)
-            ).pack(side="left", padx=5)
-
-            tk.Button(
-                left_btns,
-                text="Close",
-                font=("Segoe UI", 10),
-                bg="#beb09c",
-                command=lambda: safe_close(root)
-            ).pack(side="left", padx=5)
-
-            # Right-aligned countdown label
-            countdown_label = tk.Label(
-                btn_frame,
-                text="",
-                font=("Segoe UI", 9, "italic"),
-                fg="gray",
-                bg=settings["popup"]["bg_large"],
-                anchor="e",
-                justify="right"
-            )
-            countdown_label.grid(row=0, column=1, sticky="e")
-
-            # Make column 1 expand to push label right
-            btn_frame.grid_columnconfigure(1, weight=1)
+            root.bind('<Escape>', lambda e: safe_close(root))
+            root.protocol("WM_DELETE_WINDOW", lambda: safe_close(root))
+            root.bind('<Enter>', lambda e: on_mouse_enter(root))
+            root.bind('<Leave>', lambda e: on_mouse_leave(root))
 
-            root.countdown_label = countdown_label
-
-
-            def bind_hover_events(widget):
-                try:
-                    widget.bind('<Enter>', lambda e: on_mouse_enter(root))
-                    widget.bind('<Leave>', lambda e: on_mouse_leave(root))
-                    if widget.winfo_exists():
-                        for child in widget.winfo_children():
-                            bind_hover_events(child)
-                except Exception as ex:
-                    print(f"Hover binding failed on {widget}: {ex}")
+        else:
+            if passage_window is None or not passage_window.winfo_exists():
+                get_passage_window()
+                trace.lap("popup_build")
+            root = passage_window
+
+            # A small popup on screen is closed; the passage window itself
+            # is refilled in place
+            if current_root is not None and current_root is not root:
+                safe_close(current_root)
+            current_root = root
+            # Re-armed by show_references once the new passage is up
+            awaiting_second_press = False
 
-            bind_hover_events(root)
+            fill_passage_window(root, lines, title)
+            trace.lap("popup_fill")
+            root.deiconify()
+            root.lift()
+            root.update_idletasks()
+            trace.lap("popup_show")
+            trace.finish("total")
 
         root.focus_force()
 
-        root.bind('<Escape>', lambda e: safe_close(root))
-        root.protocol("WM_DELETE_WINDOW", lambda: safe_close(root))
-
-        root.bind('<Enter>', lambda e: on_mouse_enter(root))
-        root.bind('<Leave>', lambda e: on_mouse_leave(root))
-
         on_mouse_leave(root)
 
         # If the mouse is already over the popup when it opens, simulate <Enter>
@@ -846,15 +1395,20 @@ def show_popup(lines, title="Bible Verses (KJV)", small=False):
         if widget_under_mouse and str(widget_under_mouse).startswith(str(root)):
             on_mouse_enter(root)
 
-        root.wait_window()
+    run_on_ui(run)
+
 
-    threading.Thread(target=run, daemon=True).start()
+# Build the passage popup as soon as the main loop is idle, so the first
+# lookup only has to fill it
+hidden_root.after_idle(get_passage_window)
 
 
 print(f"FetchKJV READY! Select text → press {format_hotkey(settings['hotkey'])}.")
 print("- Stays open while mouse is over the window")
 print(f"- Closes {AUTO_CLOSE_SECONDS}s after mouse leaves")
 print("- Second press copies clean verses as RTF (with italics) and shows confirmation")
+print(f"- {format_hotkey(settings['search_hotkey'])} searches for the selected words (\"phrase\", NEAR/n)")
+print(f"- {format_hotkey(settings['translation_hotkey'])} switches to the next installed translation")
 
 # -----------------------------
 # SETTINGS MENU
@@ -910,13 +1464,14 @@ def open_settings_window():
     if any(isinstance(w, tk.Toplevel) and w.title() == "Settings" for w in hidden_root.winfo_children()):
         return
 
+    ensure_styles()
     win = tk.Toplevel(hidden_root)
     win.attributes("-topmost", True)
     win.lift()
     win.iconbitmap(resource_path("FetchKJV.ico"))
     win.configure(bg="#f7f5ea")
     win.title("FetchKJV Settings")
-    win.geometry("270x230")
+    win.geometry("270x325")
     win.resizable(False, False)
 
     # --- HOTKEY ---
@@ -944,6 +1499,28 @@ def open_settings_window():
         background="#beb09c"
     ).pack(side="right", padx=5)
 
+    # --- SEARCH HOTKEY ---
+    tk.Label(win, text="Search Hotkey:", bg="#f7f5ea").pack(anchor="w", padx=10, pady=(10, 0))
+
+    search_hotkey_frame = tk.Frame(win, bg="#f7f5ea")
+    search_hotkey_frame.pack(fill="x", padx=10)
+
+    search_hotkey_value = settings["search_hotkey"]
+
+    def update_search_hotkey(new_hotkey):
+        nonlocal search_hotkey_value
+        search_hotkey_value = new_hotkey
+
+    search_hotkey_display = tk.Label(search_hotkey_frame, text=format_hotkey(settings["search_hotkey"]), bg="#f7f5ea")
+    search_hotkey_display.pack(side="left", fill="x", expand=True)
+
+    tk.Button(
+        search_hotkey_frame,
+        text="Set Hotkey",
+        command=lambda: capture_hotkey(lambda new: update_search_hotkey(new), search_hotkey_display),
+        background="#beb09c"
+    ).pack(side="right", padx=5)
+
    # --- AUTO CLOSE ---
     tk.Label(win, text="Pop-ups close after how many seconds?", bg="#f7f5ea").pack(anchor="w", padx=10, pady=(10, 0))
 
@@ -1014,12 +1591,32 @@ def open_settings_window():
     )
     chk_copy_refs.pack(anchor="w", padx=10, pady=(10, 0))
 
+    # --- TRANSLATION ---
+    translation_frame = tk.Frame(win, bg="#f7f5ea")
+    translation_frame.pack(fill="x", padx=10, pady=(10, 0))
+
+    tk.Label(translation_frame, text="Translation:", bg="#f7f5ea").pack(side="left")
+    translation_var = tk.StringVar(value=current_translation())
+    translation_menu = tk.OptionMenu(translation_frame, translation_var, *translation_registry.codes)
+    translation_menu.configure(bg="#beb09c", activebackground="#beb09c", highlightthickness=0)
+    translation_menu.pack(side="right", padx=5)
+
     # --- SAVE BUTTON ---
     def save_settings():
         new_settings = {
             "hotkey": hotkey_value,
             "auto_close_seconds": int(auto_var.get()),
             "copy_references": copy_ref_var.get(),
+            "reference_cache_size": settings["reference_cache_size"],
+            "search_hotkey": search_hotkey_value,
+            "search_result_limit": settings["search_result_limit"],
+            "popup_verse_limit": settings["popup_verse_limit"],
+            "book_aliases": settings["book_aliases"],
+            "translation": translation_var.get(),
+            "translation_hotkey": settings["translation_hotkey"],
+            "latency_metrics": settings["latency_metrics"],
+            "query_server": settings["query_server"],
+            "query_server_port": settings["query_server_port"],
             "popup": {
                 "bg_small": settings["popup"]["bg_small"],
                 "bg_large": settings["popup"]["bg_large"],
@@ -1067,117 +1664,140 @@ def open_settings_window():
     # Close behaviour
     win.protocol("WM_DELETE_WINDOW", win.destroy)
 
-# Track modifier state
-pressed_modifiers = {
-    "ctrl": False,
-    "alt": False,
-    "shift": False
-}
-
 # -----------------------------
 # NORMALIZED HOTKEY LISTENER
 # -----------------------------
 
-def on_press(key):
-    print("KEY EVENT:", key, type(key))
-    try:
-        hk = settings["hotkey"]
+# The pynput callbacks run for every key on the system: they only name the
+# key and feed it to the matcher. Hotkey actions run on one worker thread
+# so the callback returns straight away.
 
-        # ---------------------------------------------------
-        # 1. Ignore synthetic Ctrl+C events from your own code
-        # ---------------------------------------------------
-        if isinstance(key, KeyCode) and key.char == 'c' and pressed_modifiers["ctrl"]:
-            return
+hotkey_matcher = hotkeys.HotkeyMatcher()
+hotkey_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hotkey")
 
-        # ---------------------------------------------------
-        # 2. Update modifier state (robust Alt/AltGr handling)
-        # ---------------------------------------------------
-        # CTRL
-        if key in (Key.ctrl_l, Key.ctrl_r, Key.ctrl):
-            pressed_modifiers["ctrl"] = True
-
-        # ALT (Left, Right, AltGr)
-        if key in (Key.alt_l, Key.alt_r, Key.alt_gr):
-            pressed_modifiers["alt"] = True
-
-        # ALT via KeyCode virtual keycodes
-        if isinstance(key, KeyCode) and key.vk in (164, 165):
-            pressed_modifiers["alt"] = True
-
-        # SHIFT
-        if key in (Key.shift_l, Key.shift_r, Key.shift):
-            pressed_modifiers["shift"] = True
-
-        # ---------------------------------------------------
-        # 3. Normalize repeated AltGr spam
-        # ---------------------------------------------------
-        if key == Key.alt_gr and pressed_modifiers["alt"]:
-            return
+# Some keyboards report F-keys and Alt as bare virtual keycodes
+_VK_NAMES = {vk: f"f{vk - 111}" for vk in range(112, 124)}  # 112→F1, 119→F8, etc.
+_VK_NAMES.update({164: "alt_l", 165: "alt_r"})
 
-        # ---------------------------------------------------
-        # 4. Determine main key pressed
-        # ---------------------------------------------------
-        pressed = None
 
-        # Case A: Special keys (F-keys, arrows, etc.)
-        if isinstance(key, Key):
-            pressed = key.name.lower()
+def apply_hotkeys():
+    """Load the hotkeys from settings into the matcher."""
+    hotkey_matcher.set_hotkeys([
+        (process_text, settings["hotkey"]),
+        (process_search, settings["search_hotkey"]),
+        (switch_translation, settings["translation_hotkey"]),
+    ])
 
-        # Case B: KeyCode (needed for some F-keys and OEM keys)
-        elif isinstance(key, KeyCode):
-            # Some keyboards report F-keys as virtual keycodes
-            if key.vk and 112 <= key.vk <= 123:
-                pressed = f"f{key.vk - 111}"   # 112→F1, 119→F8, etc.
-            elif key.char:
-                pressed = key.char.lower()
 
-        if not pressed:
-            return
+def key_name(key):
+    """Normalized name of a pynput key ("alt_l", "f21", "c"), or None."""
+    if isinstance(key, Key):
+        return key.name
+    name = _VK_NAMES.get(key.vk)
+    if name is None and key.char:
+        name = key.char.lower()
+    return name
 
-        # ---------------------------------------------------
-        # 5. Check modifiers
-        # ---------------------------------------------------
-        if hk["ctrl"] and not pressed_modifiers["ctrl"]:
-            return
-        if hk["alt"] and not pressed_modifiers["alt"]:
-            return
-        if hk["shift"] and not pressed_modifiers["shift"]:
+
+def on_press(key):
+    try:
+        name = key_name(key)
+        if name is None:
             return
+        action = hotkey_matcher.press(name)
+        if action is not None:
+            hotkey_executor.submit(action, latency.trace())
+    except Exception as e:
+        print("Hotkey error:", e)
 
-        # ---------------------------------------------------
-        # 6. Compare with hotkey
-        # ---------------------------------------------------
-        if pressed == hk["key"]:
-            process_text()
 
+def on_release(key):
+    try:
+        name = key_name(key)
+        if name is not None:
+            hotkey_matcher.release(name)
     except Exception as e:
         print("Hotkey error:", e)
 
+apply_hotkeys()
 
-def on_release(key):
-    # ---------------------------------------------------
-    # Delay resetting modifiers to avoid premature clearing
-    # ---------------------------------------------------
-    def clear():
-        # CTRL
-        if key in (Key.ctrl_l, Key.ctrl_r, Key.ctrl):
-            pressed_modifiers["ctrl"] = False
+# -----------------------------
+# LAUNCH REQUESTS
+# -----------------------------
 
-        # ALT (Left, Right, AltGr)
-        if key in (Key.alt_l, Key.alt_r, Key.alt_gr):
-            pressed_modifiers["alt"] = False
+def handle_launch_request(message):
+    """Acts on the command line of this launch or one forwarded by a later launch."""
+    command = message["command"]
+    if command == "settings":
+        run_on_ui(open_settings_window)
+    elif command == "lookup":
+        hotkey_executor.submit(run_launch_request, lookup_text, message["text"], True)
+    elif command == "search":
+        hotkey_executor.submit(run_launch_request, search_text, message["text"])
 
-        # ALT via KeyCode virtual keycodes
-        if isinstance(key, KeyCode) and key.vk in (164, 165):
-            pressed_modifiers["alt"] = False
 
-        # SHIFT
-        if key in (Key.shift_l, Key.shift_r, Key.shift):
-            pressed_modifiers["shift"] = False
+def run_launch_request(func, *args):
+    try:
+        func(*args)
+    except Exception as e:
+        print("Error handling launch request:")
+        print(traceback.format_exc())
+        show_popup(f"Error:\n{str(e)}", title="Error", small=True)
+
+
+# -----------------------------
+# STARTUP REPORT
+# -----------------------------
+
+STARTUP_REPORT_PATH = os.path.join(os.path.dirname(SETTINGS_PATH), "startup_report.json")
+STARTUP_REPORT_DELAY = 10  # seconds; lets the background phases finish before the report is written
+
+
+def report_startup():
+    """Marks the app ready, logs the time to ready and warns when it is over budget."""
+    ready_ms = startup_timer.ready() * 1000
+    print(f"Ready in {ready_ms:.1f} ms.")
+    if ready_ms > STARTUP_BUDGET_MS:
+        print(f"Startup took longer than its {STARTUP_BUDGET_MS} ms budget:")
+        print(startup_timer.format(STARTUP_BUDGET_MS))
 
-    # Schedule the clear AFTER pynput finishes processing the keypress
-    threading.Timer(0.02, clear).start()
+    try:
+        with open(LOAD_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(f"{time.strftime('%Y-%m-%d %H:%M:%S')}\t{__version__}\tstartup\t{ready_ms:.1f} ms\n")
+    except OSError as e:
+        print("Could not write load time log:", e)
+
+    if write_startup_report:
+        timer = threading.Timer(STARTUP_REPORT_DELAY, save_startup_report)
+        timer.daemon = True
+        timer.start()
+
+
+def save_startup_report():
+    """Writes the phase and import timings to STARTUP_REPORT_PATH."""
+    if startup_timer.imports is not None:
+        startup_timer.imports.uninstall()
+    try:
+        startup_timer.dump(STARTUP_REPORT_PATH, STARTUP_BUDGET_MS, version=__version__)
+    except OSError as e:
+        print("Could not write startup report:", e)
+        return
+    print(startup_timer.format(STARTUP_BUDGET_MS))
+    if startup_timer.imports is not None:
+        print(startup_timer.imports.table(limit=20))
+    print(f"Startup report written to {STARTUP_REPORT_PATH}")
+
+
+threading.Thread(target=load_bible, daemon=True).start()
+
+if instance_channel is not None:
+    instance_channel.start(handle_launch_request)
+if launch_request is not None:
+    handle_launch_request(launch_request)
 
 listener = pynput_keyboard.Listener(on_press=on_press, on_release=on_release)
 listener.start()
+report_startup()
+
+threading.Thread(target=create_tray_icon, name="tray", daemon=True).start()
 hidden_root.mainloop()
\ No newline at end of file
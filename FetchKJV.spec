@@ -5,7 +5,7 @@ a = Analysis(
     ['FetchKJV.py'],
     pathex=[],
     binaries=[],
-    datas=[('kjv.json', '.'), ('settings.json', '.'), ('FetchKJV.ico', '.'), ('FetchKJV.png', '.')],
+    datas=[('kjv.kjvz', '.'), ('settings.json', '.'), ('FetchKJV.ico', '.'), ('FetchKJV.png', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1 @@
+"""Benchmarks for the fetchkjv lookup engine. Run each module with ``python -m``."""
@@ -0,0 +1,167 @@
+"""Book-name trie with user aliases: checks, and cost as the alias table grows.
+
+    python -m benchmarks.aliases kjv.json [kjv.kjvc] [--sizes 0,10,100,1000,5000]
+
+First checks that the abbreviations people write resolve on the fast path,
+that aliases resolve, shadow a built-in name and give it back when removed,
+that an incrementally updated trie is the same as one built from scratch,
+and that every selection in selections.EQUIVALENT parses the same with the
+largest alias table as with none. Then, for each table size, times
+
+    parse       ReferenceParser.get_references per selection in
+                selections.SELECTIONS (no pythonbible fallback)
+    find        ReferenceParser.find over a sermon-like document, per KB
+    build       a new BookTrie with the whole alias table
+    update      set_aliases with one alias added to the table
+"""
+
+import argparse
+import string
+import sys
+import time
+
+from fetchkjv import corpus
+from fetchkjv.refparser import BOOK_NAMES, BookTrie, ReferenceParser
+
+from .selections import EQUIVALENT, SELECTIONS
+
+# Written by staff and missed by pythonbible at one time or another
+ABBREVIATIONS = [
+    ("Jn 3:16", ["John 3:16"]),
+    ("1Jn 4:8", ["1 John 4:8"]),
+    ("Rom. 8:28", ["Romans 8:28"]),
+    ("Song of Sol 2:1", ["Song of Songs 2:1"]),
+    ("I Cor 13:4-7", ["1 Corinthians 13:4-7"]),
+]
+
+HOUSE_ALIASES = {"Jno": "John", "1 Jno": "1 John", "Cor A": "1 Cor", "Jn": "Jonah"}
+WITH_ALIASES = [
+    ("Jno 3:16", ["John 3:16"]),
+    ("I Jno. 4:8", ["1 John 4:8"]),
+    ("Cor A 13:4", ["1 Corinthians 13:4"]),
+    ("Jn 1:17", ["Jonah 1:17"]),
+    ("John 3:16", ["John 3:16"]),
+]
+
+DOCUMENT = (
+    "As the apostle writes in Rom 8:28, all things work together for good. "
+    "Compare Jno 3:16 with 1 Jno 4:8, and see how the Psalmist puts it in Ps 23. "
+) * 64
+
+
+def alias_table(size):
+    """size made-up aliases, some of several words or numbered, for all the books."""
+    titles = [title for title, _ in BOOK_NAMES]
+    letters = string.ascii_lowercase
+    aliases = {}
+    for i in range(size):
+        name = "Qx" + letters[i % 26] + letters[i // 26 % 26] + letters[i // 676 % 26]
+        if i % 4 == 1:
+            name += " Ep"
+        elif i % 5 == 2:
+            name = "2 " + name
+        aliases[name] = titles[i % len(titles)]
+    return aliases
+
+
+def formatted(parser, text):
+    return [parser.format_reference(ref) for ref in parser.get_references(text)]
+
+
+def check(store, largest):
+    failures = 0
+    parser = ReferenceParser(store, fallback=False)
+
+    for text, expected in ABBREVIATIONS:
+        if formatted(parser, text) != expected:
+            print(f"FAIL: {text!r} -> {formatted(parser, text)}, expected {expected}")
+            failures += 1
+
+    skipped = parser.set_aliases(dict(HOUSE_ALIASES, Bad="Nowhere"))
+    if skipped != ["Bad"]:
+        print(f"FAIL: skipped {skipped}, expected ['Bad']")
+        failures += 1
+    for text, expected in WITH_ALIASES:
+        if formatted(parser, text) != expected:
+            print(f"FAIL: {text!r} -> {formatted(parser, text)}, expected {expected} with aliases")
+            failures += 1
+
+    parser.set_aliases({})
+    if formatted(parser, "Jno 3:16") or formatted(parser, "Jn 1:17") != ["John 1:17"]:
+        print("FAIL: removing the aliases didn't give back the built-in names")
+        failures += 1
+    if parser.names.root != BookTrie().root:
+        print("FAIL: the trie isn't back to the built-in names")
+        failures += 1
+
+    # Grow, shrink and change the table in steps; the trie must match a fresh build
+    for step in (alias_table(10), largest, dict(list(largest.items())[::2], Jn="Jonah"), {}):
+        parser.set_aliases(step)
+        fresh = BookTrie()
+        fresh.set_aliases(step)
+        if parser.names.root != fresh.root:
+            print(f"FAIL: updated trie with {len(step)} aliases differs from a fresh build")
+            failures += 1
+
+    plain = ReferenceParser(store, fallback=False)
+    parser.set_aliases(largest)
+    for text in EQUIVALENT:
+        if formatted(parser, text) != formatted(plain, text):
+            print(f"FAIL: {text!r} parses differently with {len(largest)} aliases")
+            failures += 1
+
+    print(f"checks: {'ok' if not failures else f'{failures} failed'}")
+    return failures
+
+
+def best_of(fn, rounds, repeat=5):
+    """Fastest of repeat runs of rounds calls, in seconds per call."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn()
+        elapsed = (time.perf_counter() - start) / rounds
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.aliases")
+    parser.add_argument("kjv_json")
+    parser.add_argument("kjv_kjvc", nargs="?", default="")
+    parser.add_argument("--sizes", default="0,10,100,1000,5000", help="alias table sizes, comma-separated")
+    args = parser.parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    store = corpus.load_verse_store(args.kjv_json, args.kjv_kjvc)
+    failures = check(store, alias_table(max(sizes)))
+
+    print(f"\n{'aliases':>8}{'parse':>14}{'find':>14}{'build':>12}{'update':>12}")
+    for size in sizes:
+        table = alias_table(size)
+        grown = dict(table, Qzz="John")
+        ref_parser = ReferenceParser(store, fallback=False, aliases=table)
+
+        parse = best_of(lambda: [ref_parser.get_references(text) for text in SELECTIONS], 20) / len(SELECTIONS)
+        find = best_of(lambda: ref_parser.find(DOCUMENT), 20) / (len(DOCUMENT) / 1024)
+
+        def build():
+            BookTrie().set_aliases(table)
+
+        def update():
+            ref_parser.set_aliases(grown)
+            ref_parser.set_aliases(table)
+
+        build_time = best_of(build, 3)
+        update_time = best_of(update, 3) / 2
+        print(f"{size:>8}{parse * 1e6:>10.2f} us{find * 1e6:>10.1f} us"
+              f"{build_time * 1e3:>9.2f} ms{update_time * 1e3:>9.2f} ms")
+
+    store.close()
+    print(f"\nfailures: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
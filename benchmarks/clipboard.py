@@ -0,0 +1,72 @@
+"""Selection capture against a simulated application.
+
+    python -m benchmarks.clipboard
+
+A FakeClipboard stands in for the system clipboard and the "application"
+answers Ctrl+C after a given delay (or never, when nothing is selected).
+For each delay this compares the old fixed waits (50 ms + 100 ms, then read
+whatever is there) with capture_selection, with and without a clipboard
+change counter, and reports how long each took and whether it returned the
+selection.
+"""
+
+import sys
+import time
+
+from fetchkjv.clipboard import FakeClipboard, capture_selection
+
+SELECTION = "John 3:16"
+PREVIOUS = "something copied earlier"
+DELAYS_MS = [1, 5, 20, 60, 120, 300, None]  # None: nothing is selected
+ROUNDS = 3
+
+
+def old_capture(backend, delay):
+    original = backend.get_text()
+    time.sleep(0.05)
+    if delay is not None:
+        backend.schedule_copy(SELECTION, delay)
+    time.sleep(0.1)
+    selected = backend.get_text()
+    backend.set_text(original)
+    return selected
+
+
+def new_capture(backend, delay):
+    def send_copy():
+        if delay is not None:
+            backend.schedule_copy(SELECTION, delay)
+
+    return capture_selection(backend, send_copy)
+
+
+def run(capture, delay_ms, track_sequence):
+    delay = None if delay_ms is None else delay_ms / 1000
+    elapsed = 0.0
+    correct = True
+    for _ in range(ROUNDS):
+        backend = FakeClipboard(PREVIOUS, track_sequence=track_sequence)
+        start = time.perf_counter()
+        selected = capture(backend, delay)
+        elapsed += time.perf_counter() - start
+        expected = SELECTION if delay is not None and delay < 0.4 else ""
+        correct &= selected == expected and backend.get_text() == PREVIOUS
+    return elapsed / ROUNDS * 1000, correct
+
+
+def main(argv):
+    print(f"{'app delay':>10} {'old fixed sleeps':>22} {'capture (sequence)':>22} {'capture (content)':>22}")
+    for delay_ms in DELAYS_MS:
+        cells = []
+        for capture, track_sequence in ((old_capture, True), (new_capture, True), (new_capture, False)):
+            ms, correct = run(capture, delay_ms, track_sequence)
+            cells.append(f"{ms:8.1f} ms {'ok' if correct else 'WRONG':>6}")
+        label = "none" if delay_ms is None else f"{delay_ms} ms"
+        print(f"{label:>10} " + " ".join(f"{cell:>22}" for cell in cells))
+    print()
+    print("WRONG: returned stale or missing text, or didn't restore the clipboard.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
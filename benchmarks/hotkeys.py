@@ -0,0 +1,275 @@
+"""Hotkey matcher: replayed key events and per-event cost.
+
+    python -m benchmarks.hotkeys [events.jsonl ...]
+
+Replays the scripted SCENARIOS and a few thousand random event streams
+through HotkeyMatcher and through a model of the old listener (a
+threading.Timer per release, simulated here), and checks both fire the same
+hotkeys at the same times. Files given on the command line hold one
+[time, "press" | "release", key] JSON array per line and are replayed the
+same way. CONCURRENT checks modifier events that land while another thread
+is asking which modifiers are held. Then times HotkeyMatcher.press.
+"""
+
+import json
+import random
+import sys
+import time
+
+from fetchkjv.hotkeys import RELEASE_DELAY, HotkeyMatcher, replay
+
+HOTKEYS = [
+    ("lookup", {"key": "c", "ctrl": False, "alt": True, "shift": False}),
+    ("search", {"key": "s", "ctrl": False, "alt": True, "shift": True}),
+    ("f-key", {"key": "f21", "ctrl": False, "alt": False, "shift": False}),
+]
+
+_MODIFIER_NAMES = {
+    "ctrl_l": "ctrl", "ctrl_r": "ctrl", "ctrl": "ctrl",
+    "alt_l": "alt", "alt_r": "alt", "alt_gr": "alt",
+    "shift_l": "shift", "shift_r": "shift", "shift": "shift",
+}
+
+
+class LegacyListener:
+    """The on_press/on_release logic FetchKJV used before HotkeyMatcher.
+
+    Every release started threading.Timer(0.02, clear); here the timers are
+    kept in a list and run when the replay clock passes them.
+    """
+
+    def __init__(self, hotkeys):
+        self.hotkeys = hotkeys
+        self.modifiers = {"ctrl": False, "alt": False, "shift": False}
+        self.timers = []
+
+    def _run_timers(self, now):
+        due = [t for t in self.timers if t[0] <= now]
+        self.timers = [t for t in self.timers if t[0] > now]
+        for _, modifier in sorted(due):
+            self.modifiers[modifier] = False
+
+    def press(self, key, now):
+        self._run_timers(now)
+        if key == "c" and self.modifiers["ctrl"]:
+            return None
+        modifier = _MODIFIER_NAMES.get(key)
+        if modifier:
+            self.modifiers[modifier] = True
+            return None
+        for action, hk in self.hotkeys:
+            if all(self.modifiers[m] for m in ("ctrl", "alt", "shift") if hk[m]) and key == hk["key"]:
+                return action
+        return None
+
+    def release(self, key, now):
+        self._run_timers(now)
+        modifier = _MODIFIER_NAMES.get(key)
+        if modifier:
+            self.timers.append((now + RELEASE_DELAY, modifier))
+
+
+# name → (events, expected (time, action) list)
+SCENARIOS = {
+    "alt+c": (
+        [(0.0, "press", "alt_l"), (0.1, "press", "c"), (0.15, "release", "c"), (0.2, "release", "alt_l")],
+        [(0.1, "lookup")],
+    ),
+    "c alone": (
+        [(0.0, "press", "c"), (0.1, "release", "c")],
+        [],
+    ),
+    "alt released just before c": (
+        [(0.0, "press", "alt_r"), (0.1, "release", "alt_r"), (0.11, "press", "c")],
+        [(0.11, "lookup")],
+    ),
+    "alt released well before c": (
+        [(0.0, "press", "alt_l"), (0.1, "release", "alt_l"), (0.2, "press", "c")],
+        [],
+    ),
+    "synthetic ctrl+c while alt held": (
+        [(0.0, "press", "alt_l"), (0.1, "press", "ctrl_l"), (0.11, "press", "c"),
+         (0.12, "release", "c"), (0.13, "release", "ctrl_l")],
+        [],
+    ),
+    "alt+shift+s": (
+        [(0.0, "press", "alt_l"), (0.05, "press", "shift_l"), (0.1, "press", "s")],
+        [(0.1, "search")],
+    ),
+    "alt+s is not the search hotkey": (
+        [(0.0, "press", "alt_l"), (0.1, "press", "s")],
+        [],
+    ),
+    "altgr+c": (
+        [(0.0, "press", "ctrl_l"), (0.0, "press", "alt_gr"), (0.1, "press", "c")],
+        [],
+    ),
+    "f21 with anything held": (
+        [(0.0, "press", "shift_r"), (0.1, "press", "f21"), (0.2, "press", "f21")],
+        [(0.1, "f-key"), (0.2, "f-key")],
+    ),
+}
+
+# Where the old listener was wrong: its timer cleared a modifier that had
+# been pressed again within 20 ms of being released
+FIXED = {
+    "alt re-pressed within the grace period": (
+        [(0.0, "press", "alt_l"), (0.1, "release", "alt_l"), (0.11, "press", "alt_l"), (0.2, "press", "c")],
+        [(0.2, "lookup")],
+    ),
+}
+
+# A check of the held modifiers from another thread (send_copy_keys on the
+# hotkey worker) with listener events landing in the middle of it, between
+# its snapshot of the lingering modifiers and its clean-up of the expired
+# ones: name → (events before, check time, events during, events after,
+# expected (time, action) list)
+CONCURRENT = {
+    "alt re-pressed during a check": (
+        [(0.0, "press", "alt_l"), (0.1, "release", "alt_l")],
+        0.2,
+        [(0.2, "press", "alt_l")],
+        [(0.21, "press", "c")],
+        [(0.21, "lookup")],
+    ),
+    "alt re-pressed and released during a check": (
+        [(0.0, "press", "alt_l"), (0.1, "release", "alt_l")],
+        0.2,
+        [(0.2, "press", "alt_l"), (0.201, "release", "alt_l")],
+        [(0.3, "press", "c")],
+        [],
+    ),
+}
+
+KEYS = ["alt_l", "alt_r", "ctrl_l", "shift_l", "c", "s", "f21", "x"]
+
+
+def random_events(rng, count=40):
+    """Random press/release stream that never re-presses a modifier inside its grace period."""
+    events = []
+    now = 0.0
+    down = set()
+    released_at = {}
+    while len(events) < count:
+        now = round(now + rng.choice([0.001, 0.005, 0.01, 0.019, 0.021, 0.05, 0.2]), 3)
+        key = rng.choice(KEYS)
+        modifier = _MODIFIER_NAMES.get(key)
+        if key in down:
+            events.append((now, "release", key))
+            down.discard(key)
+            if modifier:
+                released_at[modifier] = now
+        elif modifier and now - released_at.get(modifier, -1.0) <= RELEASE_DELAY:
+            continue
+        else:
+            events.append((now, "press", key))
+            if modifier:
+                down.add(key)
+    return events
+
+
+def legacy_replay(events):
+    listener = LegacyListener(HOTKEYS)
+    fired = []
+    for at, kind, key in events:
+        if kind == "press":
+            action = listener.press(key, at)
+            if action is not None:
+                fired.append((at, action))
+        else:
+            listener.release(key, at)
+    return fired
+
+
+def check(name, events, expected=None):
+    got = replay(HotkeyMatcher(HOTKEYS), events)
+    if expected is None:
+        expected = legacy_replay(events)
+    if got != expected:
+        print(f"MISMATCH {name}: expected {expected}, got {got}")
+        return False
+    return True
+
+
+class _Interleaved(dict):
+    """Lingering-modifier dict that replays listener events right after held() snapshots it."""
+
+    def __init__(self, matcher, events, *args):
+        super().__init__(*args)
+        self.matcher = matcher
+        self.events = events
+
+    def items(self):
+        snapshot = list(super().items())
+        events, self.events = self.events, []
+        replay(self.matcher, events)
+        return snapshot
+
+
+def check_concurrent(name, before, at, during, after, expected):
+    matcher = HotkeyMatcher(HOTKEYS)
+    fired = replay(matcher, before)
+    matcher._lingering = _Interleaved(matcher, during, matcher._lingering)
+    try:
+        matcher.held(at)
+    except Exception as e:
+        print(f"FAIL {name}: held() raised {e!r}")
+        return False
+    fired += replay(matcher, after)
+    if fired != expected:
+        print(f"MISMATCH {name}: expected {expected}, got {fired}")
+        return False
+    return True
+
+
+def main(argv):
+    failures = 0
+
+    for name, (events, expected) in SCENARIOS.items():
+        failures += not check(name, events, expected)
+        failures += not check(name + " (old listener)", events)
+    for name, (events, expected) in FIXED.items():
+        failures += not check(name, events, expected)
+    for name, case in CONCURRENT.items():
+        failures += not check_concurrent(name, *case)
+    print(f"scenarios: {len(SCENARIOS) + len(FIXED) + len(CONCURRENT)} checked")
+
+    rng = random.Random(1611)
+    streams = 5000
+    for i in range(streams):
+        failures += not check(f"random stream {i}", random_events(rng))
+    print(f"random streams: {streams} checked against the old listener")
+
+    for path in argv:
+        with open(path, "r", encoding="utf-8") as f:
+            events = [tuple(json.loads(line)) for line in f if line.strip()]
+        fired = replay(HotkeyMatcher(HOTKEYS), events)
+        failures += not check(path, events)
+        print(f"{path}: {len(events)} events, {len(fired)} hotkeys fired")
+
+    print(f"failures: {failures}")
+
+    # Cost of the listener callback's work for an ordinary key while typing
+    matcher = HotkeyMatcher(HOTKEYS)
+    matcher.press("shift_l")
+    matcher.release("shift_l")
+    rounds = 200_000
+    start = time.perf_counter()
+    for _ in range(rounds):
+        matcher.press("x")
+        matcher.release("x")
+    typing = (time.perf_counter() - start) / rounds
+    start = time.perf_counter()
+    for _ in range(rounds):
+        matcher.press("alt_l")
+        matcher.press("c")
+        matcher.release("alt_l")
+    hotkey = (time.perf_counter() - start) / rounds
+    print(f"press+release of an ordinary key: {typing * 1e6:.2f} µs")
+    print(f"alt press, hotkey match, alt release: {hotkey * 1e6:.2f} µs")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
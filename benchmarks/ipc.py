@@ -0,0 +1,65 @@
+"""Second-launch forwarding: how quickly a forwarded request is handed over.
+
+    python -m benchmarks.ipc
+
+Opens an InstanceChannel under a test name (so a running FetchKJV isn't
+disturbed), then times forward() from this process, and a whole second
+launch: a fresh Python process that imports fetchkjv.ipc, forwards a
+lookup and exits. Both check that every message arrived intact.
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+from fetchkjv import ipc
+
+NAME = "FetchKJV-benchmark"
+ROUNDS = 200
+LAUNCHES = 10
+
+SECOND_LAUNCH = (
+    "import sys; from fetchkjv import ipc; "
+    f"sys.exit(0 if ipc.forward(ipc.launch_message(sys.argv[1:]), {NAME!r}) else 1)"
+)
+
+
+def main(argv):
+    received = []
+    channel = ipc.InstanceChannel(NAME)
+    if not channel.listen():
+        print("The test channel is already in use.")
+        return 1
+    channel.start(received.append)
+    failures = 0
+
+    try:
+        times = []
+        for i in range(ROUNDS):
+            start = time.perf_counter()
+            failures += not ipc.forward({"command": "lookup", "text": f"John 3:{i}"}, NAME)
+            times.append(time.perf_counter() - start)
+        print(f"forward():      median {statistics.median(times) * 1000:.2f} ms, max {max(times) * 1000:.2f} ms")
+
+        launches = []
+        for i in range(LAUNCHES):
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable, "-c", SECOND_LAUNCH, "Rom", f"8:{i}"])
+            launches.append(time.perf_counter() - start)
+            failures += result.returncode != 0
+        print(f"second launch:  median {statistics.median(launches) * 1000:.1f} ms (Python startup included)")
+    finally:
+        time.sleep(0.1)
+        channel.close()
+
+    expected = [{"command": "lookup", "text": f"John 3:{i}"} for i in range(ROUNDS)]
+    expected += [{"command": "lookup", "text": f"Rom 8:{i}"} for i in range(LAUNCHES)]
+    failures += received != expected
+    print(f"messages received: {len(received)}/{len(expected)}")
+    print(f"failures: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
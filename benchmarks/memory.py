@@ -0,0 +1,82 @@
+"""Memory used by each way of holding the Bible in FetchKJV.
+
+    python -m benchmarks.memory kjv.json [kjv.kjvc]
+
+Compares the original ``verse_index`` dict of (book, chapter, verse) tuples
+(plus the parsed ``data`` it kept alive) with the array-backed VerseStore,
+both built from kjv.json, and with the mmap-backed kjv.kjvc Corpus. Python
+heap is measured with tracemalloc; the mapped file is paged in by the OS on
+demand and shared between processes, so it is listed separately.
+"""
+
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from fetchkjv import corpus
+
+
+def measure(build):
+    """Return (object, bytes of Python heap still held by it)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    obj = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, after - before
+
+
+def old_verse_index(json_path):
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    verses = data["verses"]
+    verse_index = {
+        (entry["book_name"], entry["chapter"], entry["verse"]): entry["text"]
+        for entry in verses
+    }
+    return data, verses, verse_index
+
+
+def main(argv):
+    if not argv:
+        print(__doc__)
+        return 2
+
+    json_path = argv[0]
+    if len(argv) > 1:
+        corpus_path = argv[1]
+    else:
+        corpus_path = os.path.join(tempfile.mkdtemp(), "kjv.kjvc")
+        corpus.build_corpus(json_path, corpus_path)
+
+    rows = []
+
+    old, size = measure(lambda: old_verse_index(json_path))
+    rows.append(("dict + parsed kjv.json (before)", size, 0))
+    del old
+
+    old, size = measure(lambda: old_verse_index(json_path)[2])
+    rows.append(("verse_index dict alone", size, 0))
+    del old
+
+    store, size = measure(lambda: corpus.load_json_store(json_path))
+    rows.append(("VerseStore from kjv.json", size, 0))
+    del store
+
+    mapped, size = measure(lambda: corpus.Corpus(corpus_path))
+    rows.append(("Corpus (mmap kjv.kjvc)", size, os.path.getsize(corpus_path)))
+    mapped.close()
+
+    print(f"{'representation':<34}{'python heap':>14}{'mapped file':>14}")
+    for name, heap, mapped_size in rows:
+        print(f"{name:<34}{heap / 1e6:>11.2f} MB{mapped_size / 1e6:>11.2f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
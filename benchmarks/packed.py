@@ -0,0 +1,117 @@
+"""Size and lookup latency of the block-compressed kjv.kjvz against kjv.json and kjv.kjvc.
+
+    python -m benchmarks.packed kjv.json [--cache-kb 1024] [--rounds 20]
+
+Builds kjv.kjvc and every kjv.kjvz layout (zlib/lzma, chapter/book blocks)
+into a temporary folder, checks that each kjv.kjvz gives exactly the same
+verses as kjv.kjvc, and reports for each way of shipping the Bible:
+
+    package     bytes a one-file EXE unpacks to its temp folder on every
+                launch, and the same files zlib-compressed as PyInstaller
+                stores them inside the EXE
+    open        opening (or parsing) the file
+    cold        the selections in selections.EQUIVALENT, looked up right
+                after opening: every chapter they touch is read (and
+                decompressed) for the first time
+    warm        the same lookups again, from the block LRU
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+
+from fetchkjv import corpus, packed, passages, refparser
+
+from .selections import EQUIVALENT
+
+
+def zlib_size(paths):
+    total = 0
+    for path in paths:
+        with open(path, "rb") as f:
+            total += len(zlib.compress(f.read(), 6))
+    return total
+
+
+def time_lookups(open_store, refs, rounds):
+    """Median (open, cold lookups, warm lookups) seconds over rounds fresh opens."""
+    opens, colds, warms = [], [], []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        store = open_store()
+        opened = time.perf_counter()
+        for ref in refs:
+            passages.format_passage(passages.iter_reference(store, ref, styled=True))
+        cold = time.perf_counter()
+        for ref in refs:
+            passages.format_passage(passages.iter_reference(store, ref, styled=True))
+        warm = time.perf_counter()
+        store.close()
+        opens.append(opened - start)
+        colds.append(cold - opened)
+        warms.append(warm - cold)
+    return statistics.median(opens), statistics.median(colds), statistics.median(warms)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.packed")
+    parser.add_argument("kjv_json")
+    parser.add_argument("--cache-kb", type=int, default=packed.DEFAULT_CACHE_BYTES // 1024,
+                        help="decompressed block cache of each kjv.kjvz")
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args(argv)
+    cache_bytes = args.cache_kb * 1024
+
+    tmp_dir = tempfile.mkdtemp()
+    failures = 0
+    try:
+        kjvc_path = os.path.join(tmp_dir, "kjv.kjvc")
+        corpus.build_corpus(args.kjv_json, kjvc_path)
+        reference = corpus.Corpus(kjvc_path)
+        ref_parser = refparser.ReferenceParser(reference, fallback=False)
+        refs = [ref for text in EQUIVALENT for ref in ref_parser.get_references(text)]
+        expected = reference.texts(0, len(reference) - 1)
+
+        rows = [
+            ("kjv.json", [args.kjv_json], lambda: corpus.load_json_store(args.kjv_json)),
+            ("kjv.kjvc", [kjvc_path], lambda: corpus.Corpus(kjvc_path)),
+            ("kjv.json + kjv.kjvc", [args.kjv_json, kjvc_path], None),
+        ]
+        for codec in packed.CODECS:
+            for block in packed.BLOCK_KINDS:
+                path = os.path.join(tmp_dir, f"kjv-{codec}-{block}.kjvz")
+                packed.build_packed(args.kjv_json, path, codec, block)
+                store = packed.PackedCorpus(path)
+                if store.texts(0, len(store) - 1) != expected or store.checksum() != reference.checksum():
+                    print(f"FAIL: {os.path.basename(path)} differs from kjv.kjvc")
+                    failures += 1
+                store.close()
+                rows.append((f"kjv.kjvz {codec}/{block}", [path],
+                             lambda path=path: packed.PackedCorpus(path, cache_bytes)))
+        reference.close()
+
+        print(f"{len(refs)} references, median of {args.rounds} opens, "
+              f"{args.cache_kb} KB block cache\n")
+        print(f"{'shipped as':<24}{'unpacked':>11}{'in EXE':>11}{'open':>11}{'cold':>11}{'warm':>11}")
+        for name, paths, open_store in rows:
+            size = sum(os.path.getsize(path) for path in paths)
+            line = f"{name:<24}{size / 1e6:>8.2f} MB{zlib_size(paths) / 1e6:>8.2f} MB"
+            if open_store is not None:
+                rounds = max(1, args.rounds // 10) if name == "kjv.json" else args.rounds
+                opened, cold, warm = time_lookups(open_store, refs, rounds)
+                line += f"{opened * 1000:>8.2f} ms{cold * 1000:>8.2f} ms{warm * 1000:>8.2f} ms"
+            print(line)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print(f"\nfailures: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,158 @@
+"""Time to first paint of the passage popup, from one verse to the whole Bible.
+
+    python -m benchmarks.popup kjv.json [kjv.kjvc] [--verse-limit 500] [--tk]
+
+For passages of growing length, builds the popup's lines as show_references
+does and streams them through popup.PopupText, reporting
+
+    first       building the lines, creating the stream and cutting its first
+                batch (a screenful): the part of a lookup the popup waits for
+    batch       the slowest later batch, one after() callback's worth
+    batches     batches up to the verse limit, and pages ("load more")
+                needed for the whole passage
+
+and checks that streaming every page gives exactly the text the popup used
+to insert in one go, and that passages.count_passage counts the verses. With --tk (needs a display) the batches are also
+inserted into a real tk.Text, next to inserting the whole passage at once.
+"""
+
+import argparse
+import sys
+import time
+
+from fetchkjv import corpus, passages, popup
+
+# (title, iter_passage arguments, end book): a verse, a chapter, a book,
+# five books, the Bible
+PASSAGES = [
+    ("John 3:16", ("John", 3, 16, 3, 16), None),
+    ("Psalms 119", ("Psalms", 119), None),
+    ("Psalms", ("Psalms",), None),
+    ("Genesis - Deuteronomy", ("Genesis",), "Deuteronomy"),
+    ("Genesis - Revelation", ("Genesis",), "Revelation"),
+]
+SCREENFUL = 90 * 25  # default popup width_large x height_large
+
+
+def popup_lines(store, title, args, end_book):
+    """The popup's lines for a passage, built the way show_references builds them."""
+    verses = passages.label_verses(passages.iter_passage(store, *args, end_book=end_book, styled=True))
+    count = passages.count_passage(store, *args, end_book=end_book)
+    return [("title", title), ("ref", title), ("verses", (count, verses))]
+
+
+def expected_text(store, title, args, end_book):
+    """What the popup used to insert in one go, and the passage's verse count."""
+    verses = list(passages.iter_passage(store, *args, end_book=end_book, styled=True))
+    return title + "\n" + popup.DIVIDER + "\n\n" + passages.format_passage(verses).text + "\n\n", len(verses)
+
+
+def stream(make_lines, verse_limit):
+    """(first batch seconds, slowest later batch seconds, batches of page one, pages, text)."""
+    start = time.perf_counter()
+    text = popup.PopupText(make_lines(), verse_limit)
+    batches = [text.next_batch(SCREENFUL)]
+    first = time.perf_counter() - start
+
+    slowest = 0.0
+    count = 1
+    pages = 1
+    while not text.done:
+        if text.paused:
+            text.more()
+            pages += 1
+        start = time.perf_counter()
+        batch = text.next_batch()
+        slowest = max(slowest, time.perf_counter() - start)
+        batches.append(batch)
+        if pages == 1:
+            count += 1
+    inserted = "".join(segment for batch in batches for segment, _ in batch)
+    return first, slowest, count, pages, inserted
+
+
+def time_tk(make_lines, verse_limit):
+    """(first batch ms, slowest batch ms, whole passage at once ms) inserted into a tk.Text."""
+    import tkinter as tk
+
+    root = tk.Tk()
+    widget = tk.Text(root, width=90, height=25)
+    widget.pack()
+    root.update()
+    try:
+        start = time.perf_counter()
+        text = popup.PopupText(make_lines(), verse_limit)
+        widget.insert(tk.END, *popup.insert_args(text.next_batch(SCREENFUL)))
+        root.update_idletasks()
+        first = time.perf_counter() - start
+
+        slowest = 0.0
+        while not text.done and not text.paused:
+            start = time.perf_counter()
+            widget.insert(tk.END, *popup.insert_args(text.next_batch()))
+            root.update_idletasks()
+            slowest = max(slowest, time.perf_counter() - start)
+
+        widget.delete("1.0", tk.END)
+        start = time.perf_counter()
+        text = popup.PopupText(make_lines(), None)
+        while not text.done:
+            for segment, tags in text.next_batch():
+                widget.insert(tk.END, segment, tags)
+        root.update_idletasks()
+        whole = time.perf_counter() - start
+    finally:
+        root.destroy()
+    return first * 1000, slowest * 1000, whole * 1000
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.popup")
+    parser.add_argument("kjv_json")
+    parser.add_argument("kjv_kjvc", nargs="?")
+    parser.add_argument("--verse-limit", type=int, default=popup.DEFAULT_VERSE_LIMIT)
+    parser.add_argument("--tk", action="store_true", help="also insert into a tk.Text (needs a display)")
+    args = parser.parse_args(argv)
+
+    if args.kjv_kjvc:
+        store = corpus.load_verse_store(args.kjv_json, args.kjv_kjvc)
+    else:
+        store = corpus.load_json_store(args.kjv_json)
+
+    failures = 0
+    print(f"verse limit {args.verse_limit}, first batch {SCREENFUL} characters\n")
+    header = f"{'passage':<24}{'verses':>8}{'first':>12}{'batch':>12}{'batches':>9}{'pages':>7}"
+    if args.tk:
+        header += f"{'tk first':>12}{'tk batch':>12}{'tk at once':>13}"
+    print(header)
+    for title, passage_args, end_book in PASSAGES:
+        expected, verse_count = expected_text(store, title, passage_args, end_book)
+
+        def make_lines():
+            return popup_lines(store, title, passage_args, end_book)
+
+        runs = [stream(make_lines, args.verse_limit) for _ in range(5)]
+        first = min(run[0] for run in runs)
+        slowest = min(run[1] for run in runs)
+        _, _, count, pages, inserted = runs[0]
+        if inserted != expected:
+            print(f"FAIL: {title} streams different text")
+            failures += 1
+        if passages.count_passage(store, *passage_args, end_book=end_book) != verse_count:
+            print(f"FAIL: {title} is counted as {passages.count_passage(store, *passage_args, end_book=end_book)} verses")
+            failures += 1
+
+        line = (f"{title:<24}{verse_count:>8}{first * 1e6:>9.1f} us{slowest * 1e6:>9.1f} us"
+                f"{count:>9}{pages:>7}")
+        if args.tk:
+            tk_first, tk_batch, tk_whole = time_tk(make_lines, args.verse_limit)
+            line += f"{tk_first:>9.2f} ms{tk_batch:>9.2f} ms{tk_whole:>10.1f} ms"
+        print(line)
+
+    store.close()
+    print(f"\nfailures: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,107 @@
+"""Fast reference parser vs pythonbible: equivalence check and timings.
+
+    python -m benchmarks.refparser kjv.json [kjv.kjvc]
+
+Every selection in selections.EQUIVALENT must parse to the same references
+and format to the same text as pythonbible (skipped when pythonbible isn't
+installed), and every selection in selections.KNOWN_DIFFERENCES must format
+to its listed result. Then both parsers are timed over all selections.
+"""
+
+import sys
+import time
+
+from fetchkjv import corpus
+from fetchkjv.refparser import ReferenceParser
+
+from .selections import EQUIVALENT, KNOWN_DIFFERENCES, SELECTIONS
+
+ROUNDS = 200
+
+
+def fields(ref):
+    return (
+        ref.book.title,
+        ref.start_chapter,
+        ref.start_verse,
+        ref.end_chapter,
+        ref.end_verse,
+        ref.end_book.title if getattr(ref, "end_book", None) else None,
+    )
+
+
+def check_equivalence(parser, bible):
+    failures = 0
+    for text in EQUIVALENT:
+        ours = parser.parse(text)
+        theirs = bible.get_references(text)
+        ours_fields = [fields(r) for r in ours]
+        theirs_fields = [fields(r) for r in theirs]
+        ours_text = [parser.format_reference(r) for r in ours]
+        theirs_text = [bible.format_single_reference(r) for r in theirs]
+        if ours_fields != theirs_fields or ours_text != theirs_text:
+            failures += 1
+            print(f"MISMATCH {text!r}")
+            print(f"    fast:        {ours_text} {ours_fields}")
+            print(f"    pythonbible: {theirs_text} {theirs_fields}")
+    print(f"equivalence: {len(EQUIVALENT) - failures}/{len(EQUIVALENT)} selections match pythonbible")
+    return failures
+
+
+def check_known_differences(parser):
+    failures = 0
+    for text, expected in KNOWN_DIFFERENCES:
+        got = [parser.format_reference(r) for r in parser.parse(text)]
+        if got != expected:
+            failures += 1
+            print(f"MISMATCH {text!r}: expected {expected}, got {got}")
+    print(f"known differences: {len(KNOWN_DIFFERENCES) - failures}/{len(KNOWN_DIFFERENCES)} as expected")
+    return failures
+
+
+def per_call_us(fn, rounds=ROUNDS):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in SELECTIONS:
+            fn(text)
+    return (time.perf_counter() - start) / (rounds * len(SELECTIONS)) * 1e6
+
+
+def main(argv):
+    if not argv:
+        print(__doc__)
+        return 2
+
+    store = corpus.load_verse_store(argv[0], argv[1] if len(argv) > 1 else "")
+    parser = ReferenceParser(store, fallback=False)
+
+    start = time.perf_counter()
+    try:
+        import pythonbible as bible
+    except ImportError:
+        bible = None
+    import_ms = (time.perf_counter() - start) * 1000
+
+    failures = check_known_differences(parser)
+    if bible is None:
+        print("pythonbible is not installed: skipping the equivalence check")
+    else:
+        print(f"import pythonbible: {import_ms:.1f} ms")
+        failures += check_equivalence(parser, bible)
+
+    def fast(text):
+        try:
+            parser.parse(text)
+        except Exception:
+            pass
+
+    print(f"fast parser:  {per_call_us(fast):8.1f} µs per selection")
+    if bible is not None:
+        slow = per_call_us(bible.get_references, rounds=ROUNDS // 10)
+        print(f"pythonbible:  {slow:8.1f} µs per selection")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
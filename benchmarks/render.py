@@ -0,0 +1,85 @@
+"""Clipboard encoder: golden outputs and whole-book throughput.
+
+    python -m benchmarks.render kjv.json [kjv.kjvc]
+
+First checks encode_payload against the expected plain text and RTF bytes
+below, then encodes whole books through the same path process_text uses.
+"""
+
+import sys
+import time
+
+from fetchkjv import corpus, passages
+from fetchkjv.markup import StyledText, join_styled, parse_brackets
+from fetchkjv.render import encode_payload
+
+BOOKS = ["Genesis", "Psalms", "Isaiah", "Matthew", "Revelation"]
+ROUNDS = 5
+
+GOLDEN = [
+    (
+        [("John 3:16", join_styled(["16 ", parse_brackets("For God so loved the world, that he gave his only begotten Son")]))],
+        True,
+        "John 3:16\n16 For God so loved the world, that he gave his only begotten Son",
+        rb"{\rtf1\ansi\ansicpg1252\uc1 John 3:16\par" b"\n"
+        rb"16 For God so loved the world, that he gave his only begotten Son}",
+    ),
+    (
+        [
+            ("Psalms 23:1", join_styled(["1 ", parse_brackets("The LORD [is] my shepherd; I shall not want.")])),
+            ("Psalms 23:2", join_styled(["2 ", parse_brackets("He maketh me to lie down in green pastures")])),
+        ],
+        False,
+        "1 The LORD is my shepherd; I shall not want.\n\n2 He maketh me to lie down in green pastures",
+        rb"{\rtf1\ansi\ansicpg1252\uc1 1 The LORD {\i is} my shepherd; I shall not want.\par" b"\n"
+        rb"\par" b"\n"
+        rb"2 He maketh me to lie down in green pastures}",
+    ),
+    (
+        [("Test 1:1", StyledText("1 a\\b {c} café — \U0001D11E", ((2, 5),)))],
+        True,
+        "Test 1:1\n1 a\\b {c} café — \U0001D11E",
+        rb"{\rtf1\ansi\ansicpg1252\uc1 Test 1:1\par" b"\n"
+        rb"1 {\i a\\b} \{c\} caf\u233? \u8212? \u-10188?\u-8930?}",
+    ),
+]
+
+
+def check_golden():
+    failures = 0
+    for blocks, include_refs, plain, rtf in GOLDEN:
+        got_rtf, got_plain = encode_payload(blocks).select(include_refs)
+        if got_plain != plain or got_rtf != rtf:
+            failures += 1
+            print("GOLDEN MISMATCH")
+            print(f"    expected {plain!r}\n             {rtf!r}")
+            print(f"    got      {got_plain!r}\n             {got_rtf!r}")
+    print(f"golden outputs: {len(GOLDEN) - failures}/{len(GOLDEN)} match")
+    return failures
+
+
+def main(argv):
+    if not argv:
+        print(__doc__)
+        return 2
+
+    failures = check_golden()
+
+    store = corpus.load_verse_store(argv[0], argv[1] if len(argv) > 1 else "")
+    for book in BOOKS:
+        verses = list(passages.iter_passage(store, book, styled=True))
+        blocks = [(book, join_styled(p for _, v, text in verses for p in (f" {v} ", text)))]
+
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            payload = encode_payload(blocks)
+        seconds = (time.perf_counter() - start) / ROUNDS
+
+        size = len(payload.rtf_with_refs) + len(payload.rtf_without_refs)
+        print(f"{book:<12}{len(verses):>6} verses {seconds * 1000:8.2f} ms  {size / seconds / 1e6:7.1f} MB/s RTF")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
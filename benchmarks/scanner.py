@@ -0,0 +1,101 @@
+"""Document scanner: chunked output against a whole-document scan, and speed.
+
+    python -m benchmarks.scanner kjv.json [kjv.kjvc] [megabytes]
+
+Builds a sermon-like document from the selections in selections.py mixed
+with prose, then checks that annotate_stream gives the same output with
+every chunk size (including tiny ones that put chunk boundaries in the
+middle of references) as scanning the document in one piece, and with a
+process pool as in-process. Then times both on a document of the given size
+(default 20 MB) and reports the peak memory of this process.
+"""
+
+import io
+import os
+import random
+import resource
+import sys
+import time
+
+from fetchkjv import scanner
+
+from .selections import SELECTIONS
+
+PROSE = [
+    "And so we come this morning to a familiar passage.",
+    "Notice what the apostle does not say here.",
+    "We meet at 7:30 on Sunday evening, and on the 3rd of June.",
+    "Turn with me, if you would,",
+    "Verses 1-3 of the hymn are printed in your bulletin.",
+    "Mark my words: chapter and verse matter.",
+    "\n\n",
+]
+
+
+def sermon(rng, size):
+    """Prose with a reference every sentence or two, about size characters."""
+    parts = []
+    length = 0
+    while length < size:
+        part = rng.choice(PROSE) if rng.random() < 0.6 else rng.choice(SELECTIONS)
+        parts.append(part)
+        length += len(part) + 1
+    return " ".join(parts)
+
+
+def annotate(text, json_path, corpus_path, **kwargs):
+    out = io.StringIO()
+    count = scanner.annotate_stream(io.StringIO(text), out, json_path, corpus_path, **kwargs)
+    return out.getvalue(), count
+
+
+def main(argv):
+    json_path = argv[0]
+    corpus_path = argv[1] if len(argv) > 1 and not argv[1].replace(".", "").isdigit() else ""
+    megabytes = float(argv[-1]) if len(argv) > 1 and argv[-1].replace(".", "").isdigit() else 20
+    rng = random.Random(18)
+    failures = 0
+
+    # Chunking must not change the output
+    text = sermon(rng, 200_000)
+    expected, count = annotate(text, json_path, corpus_path, chunk_size=len(text) + 1)
+    print(f"whole document: {len(text):,} chars, {count} citations")
+    for chunk_size, context in [(64, 64), (100, 64), (333, 128), (4096, 512), (scanner.CHUNK_SIZE, scanner.CONTEXT)]:
+        got, got_count = annotate(text, json_path, corpus_path, chunk_size=chunk_size, context=context)
+        ok = got == expected and got_count == count
+        failures += not ok
+        print(f"  chunk {chunk_size:>6} context {context:>5}: {'same' if ok else 'DIFFERENT'}")
+
+    workers = max(2, os.cpu_count() or 1)  # at least 2, so the pool is exercised
+    got, _ = annotate(text, json_path, corpus_path, workers=workers, chunk_size=4096, context=512)
+    ok = got == expected
+    failures += not ok
+    print(f"  {workers} processes: {'same' if ok else 'DIFFERENT'}")
+
+    # Throughput on a large document, from and to real files
+    big = sermon(rng, int(megabytes * 1024 * 1024))
+    src = os.path.join(os.path.dirname(os.path.abspath(json_path)), "scanner_bench.txt")
+    with open(src, "w", encoding="utf-8") as f:
+        f.write(big)
+    del big, text, expected, got
+
+    try:
+        size = os.path.getsize(src) / 1024 / 1024
+        print()
+        for label, jobs in (("in-process", 1), (f"{workers} processes", workers)):
+            with open(src, "r", encoding="utf-8") as f, open(os.devnull, "w", encoding="utf-8") as out:
+                start = time.perf_counter()
+                found = scanner.annotate_stream(f, out, json_path, corpus_path, workers=jobs)
+                elapsed = time.perf_counter() - start
+            print(f"{label:<14} {size:6.1f} MB in {elapsed:6.2f} s  {size / elapsed:6.2f} MB/s  {found:,} citations")
+    finally:
+        os.remove(src)
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"peak memory of this process: {peak:.0f} MB")
+    print(f"failures: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
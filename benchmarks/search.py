@@ -0,0 +1,111 @@
+"""Full-text search: index build/load times and query latency.
+
+    python -m benchmarks.search kjv.json [kjv.kjvc]
+
+Builds the index, saves and reloads it, checks every query in QUERIES
+against a brute-force scan of the tokenized verses, then times the queries.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from fetchkjv import corpus
+from fetchkjv.search import SearchIndex, parse_query, tokenize
+
+QUERIES = [
+    "god",
+    "shepherd",
+    "lord shepherd",
+    "lord AND shepherd want",
+    '"in the beginning"',
+    '"the lord"',
+    '"and the lord said unto"',
+    "faith NEAR/3 works",
+    "god NEAR/1 said",
+    '"the lord" NEAR/5 moses',
+    "light NEAR/2 darkness NEAR/10 god",
+    "beer-sheba",
+    "unto",
+]
+ROUNDS = 20
+
+
+def brute_force(words_by_verse, query):
+    """Reference answer: check every verse against every clause."""
+
+    def spans(words, operand):
+        n = len(operand)
+        return [
+            (i, i + n - 1)
+            for i in range(len(words) - n + 1)
+            if tuple(words[i:i + n]) == operand
+        ]
+
+    clauses = parse_query(query)
+    results = []
+    for vid, words in enumerate(words_by_verse):
+        if not clauses:
+            break
+        for clause in clauses:
+            found = spans(words, clause[0])
+            for i in range(1, len(clause), 2):
+                right = spans(words, clause[i + 1])
+                found = [
+                    (min(a[0], b[0]), max(a[1], b[1]))
+                    for a in found
+                    for b in right
+                    if max(b[0] - a[1], a[0] - b[1]) <= clause[i]
+                ]
+            if not found:
+                break
+        else:
+            results.append(vid)
+    return results
+
+
+def main(argv):
+    if not argv:
+        print(__doc__)
+        return 2
+
+    store = corpus.load_verse_store(argv[0], argv[1] if len(argv) > 1 else "")
+
+    start = time.perf_counter()
+    index = SearchIndex.build(store)
+    print(f"build: {(time.perf_counter() - start) * 1000:8.1f} ms  "
+          f"({len(index)} terms, {len(index._postings)} postings)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "search.kjvi")
+        start = time.perf_counter()
+        index.save(path)
+        print(f"save:  {(time.perf_counter() - start) * 1000:8.1f} ms  ({os.path.getsize(path) / 1e6:.1f} MB)")
+        start = time.perf_counter()
+        index = SearchIndex.load(path)
+        print(f"load:  {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    words_by_verse = [tokenize(text or "") for text in store.texts(0, len(store) - 1)]
+    failures = 0
+    for query in QUERIES:
+        expected = brute_force(words_by_verse, query)
+        got = index.search(query)
+        if got != expected:
+            failures += 1
+            print(f"MISMATCH {query!r}: index {len(got)} verses, scan {len(expected)}")
+    print(f"matches brute force: {len(QUERIES) - failures}/{len(QUERIES)} queries")
+
+    print()
+    for query in QUERIES:
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            results = index.search(query)
+        seconds = (time.perf_counter() - start) / ROUNDS
+        print(f"{query:<40}{len(results):>7} verses {seconds * 1000:9.2f} ms")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
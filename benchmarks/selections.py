@@ -0,0 +1,85 @@
+"""Selections copied from real sermon notes, bulletins and study guides.
+
+Shared by the benchmarks. EQUIVALENT are handled by the fast reference
+parser and must give the same result as pythonbible. KNOWN_DIFFERENCES are
+forms pythonbible 0.15 gets wrong (en-dashes, "; 4:1" continuations, some
+abbreviations), with what the fast parser returns instead. OTHER exercise the
+pythonbible fallback or contain no references at all.
+"""
+
+EQUIVALENT = [
+    "John 3:16",
+    "John 3:16-18",
+    "1 Corinthians 13:4-7",
+    "Ps 23",
+    "Psalm 23",
+    "Psalms 1-3",
+    "Rom 8:28",
+    "Rom. 8:28-39",
+    "Romans 8:28, 31-39",
+    "Gen 1:1-2:3",
+    "Genesis 1:1",
+    "II Kings 2",
+    "2 Kings 2:11",
+    "1 John 4:8",
+    "1Jn 1:9",
+    "Matt 5:3-12",
+    "Matthew 28:18-20",
+    "Eph 2:8-9",
+    "Ephesians 6:10-18",
+    "Phil 4:13",
+    "Philippians 4:6-7",
+    "Heb 11:1",
+    "Hebrews 12:1-2",
+    "Isa 53:5",
+    "Isaiah 40:31",
+    "Jer 29:11",
+    "Prov 3:5-6",
+    "Acts 2:38",
+    "Gal 5:22-23",
+    "Col 3:23",
+    "1 Thess 5:16-18",
+    "2 Tim 3:16-17",
+    "Jas 1:2-4",
+    "1 Pet 5:7",
+    "Rev 21:4",
+    "Revelation 22:20-21",
+    "Deut 6:4-9",
+    "Josh 1:9",
+    "Mic 6:8",
+    "Read Matt 5:3-12 and then Luke 6:20-23 side by side.",
+    "Our text this morning is John 15:1-8 (compare Ps 80:8-16).",
+    "Song of Solomon 2:4",
+    "Eccl 3:1-8",
+    "Lam 3:22-23",
+    "Jude 3",
+    "Obad 3",
+    "John 3-4:5",
+    "Rev 22",
+    "Ps 119",
+    "First John 1:9",
+    "1st John 1:9",
+    "John 3:16, 17",
+    "John 3:16-4:2",
+]
+
+KNOWN_DIFFERENCES = [
+    ("1 Cor 13:4–7", ["1 Corinthians 13:4-7"]),
+    ("Proverbs 3:5–6", ["Proverbs 3:5-6"]),
+    ("John 3:16; 4:1", ["John 3:16", "John 4:1"]),
+    ("John 3:16, 1 John 4:8", ["John 3:16", "1 John 4:8"]),
+    ("Ps 23, 24", ["Psalms 23:1-6", "Psalms 24:1-10"]),
+    ("Mk 16:15", ["Mark 16:15"]),
+    ("Lk 2:1-20", ["Luke 2:1-20"]),
+]
+
+OTHER = [
+    "Is 53:5",
+    "Ex 20:1-17",
+    "Jude 24-25",
+    "Gen 50 - Ex 2",
+    "We meet at 7:30 on Sunday evening.",
+    "Thank you all for coming this morning.",
+]
+
+SELECTIONS = EQUIVALENT + [text for text, _ in KNOWN_DIFFERENCES] + OTHER
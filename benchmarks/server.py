@@ -0,0 +1,136 @@
+"""Load test for the local query server.
+
+    python -m benchmarks.server kjv.json [--clients 50] [--requests 500]
+                                [--depth 8] [--search 0.1] [--connect HOST:PORT]
+
+Starts "python -m fetchkjv serve" on a free port (or uses the server given
+with --connect) and has --clients connections each send --requests
+requests, keeping up to --depth of them in flight (pipelined). A --search
+fraction of the requests are searches, the rest lookups of the selections
+in selections.py. Reports requests per second and the latency of each
+request from being sent to its answer arriving (p50/p95/p99/max).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+
+from fetchkjv.metrics import percentile
+
+from .selections import SELECTIONS
+
+QUERIES = ["lord", "god NEAR/3 said", '"the lord"', "thee thou", "faith"]
+
+
+def requests_for(rng, count, search_fraction):
+    lines = []
+    for i in range(count):
+        if rng.random() < search_fraction:
+            request = {"id": i, "op": "search", "query": rng.choice(QUERIES), "limit": 20}
+        else:
+            request = {"id": i, "op": "resolve", "text": rng.choice(SELECTIONS)}
+        lines.append((json.dumps(request) + "\n").encode("utf-8"))
+    return lines
+
+
+async def client(host, port, lines, depth, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port, limit=16 * 1024 * 1024)
+    window = asyncio.Semaphore(depth)
+    sent = deque()  # send times; answers come back in order
+
+    async def send():
+        for line in lines:
+            await window.acquire()
+            sent.append(time.perf_counter())
+            writer.write(line)
+            await writer.drain()
+
+    sender = asyncio.create_task(send())
+    for _ in lines:
+        answer = await reader.readline()
+        latencies.append(time.perf_counter() - sent.popleft())
+        window.release()
+        if not json.loads(answer).get("ok"):
+            errors.append(answer)
+    await sender
+    writer.close()
+
+
+async def run(host, port, args):
+    rng = random.Random(19)
+    latencies = []
+    errors = []
+    batches = [requests_for(rng, args.requests, args.search) for _ in range(args.clients)]
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, lines, args.depth, latencies, errors) for lines in batches))
+    elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+
+def start_server(args, tmp_dir):
+    """Popen of a server on a free port, and that port."""
+    command = [sys.executable, "-m", "fetchkjv", "serve", "--port", "0", "--bible", args.kjv_json]
+    if args.search:
+        command += ["--index", os.path.join(tmp_dir, "search.kjvi")]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith("Listening on "):
+        process.kill()
+        raise SystemExit(f"Server did not start: {line!r}")
+    return process, int(line.rsplit(":", 1)[1])
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.server")
+    parser.add_argument("kjv_json")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=500, help="requests per client")
+    parser.add_argument("--depth", type=int, default=8, help="requests each client keeps in flight")
+    parser.add_argument("--search", type=float, default=0.1, help="fraction of requests that are searches")
+    parser.add_argument("--connect", metavar="HOST:PORT", help="use a server that is already running")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        process = None
+        if args.connect:
+            host, port = args.connect.rsplit(":", 1)
+            port = int(port)
+        else:
+            process, port = start_server(args, tmp_dir)
+            host = "127.0.0.1"
+
+        try:
+            latencies, errors, elapsed = asyncio.run(run(host, port, args))
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    ordered = sorted(latencies)
+    total = len(ordered)
+    print(f"{args.clients} clients x {args.requests} requests, {args.depth} in flight each, "
+          f"{args.search:.0%} searches")
+    print(f"requests:   {total:,} in {elapsed:.2f} s = {total / elapsed:,.0f} requests/s")
+    print("latency:    " + "  ".join(
+        f"{name} {value * 1000:.2f} ms" for name, value in (
+            ("p50", percentile(ordered, 0.50)),
+            ("p95", percentile(ordered, 0.95)),
+            ("p99", percentile(ordered, 0.99)),
+            ("max", ordered[-1]),
+        )))
+    print(f"errors:     {len(errors)}")
+    for answer in errors[:5]:
+        print("  ", answer[:200])
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,211 @@
+"""Microbenchmarks for the lookup and formatting pipeline, with baselines.
+
+    python -m benchmarks.suite kjv.json [--output results.json]
+                               [--baseline baseline.json] [--threshold 0.25]
+                               [--filter NAME]
+
+Runs headless: only the fetchkjv package is imported, no Tk, pynput or
+pywin32. Every case is timed like timeit (loop count picked automatically,
+best and median of REPEAT runs) and reported per call. --output writes the
+results as JSON; --baseline compares them with a file written the same way
+earlier and exits with status 1 if any case got slower by more than the
+threshold (0.25 = 25 %). The comparison uses the best run of each case,
+which is the least affected by other load on the machine.
+
+Typical use before a release:
+
+    python -m benchmarks.suite kjv.json --output baseline.json   (on the last release)
+    python -m benchmarks.suite kjv.json --baseline baseline.json (on the candidate)
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+
+from fetchkjv import corpus, packed, passages, search
+from fetchkjv.markup import join_styled, parse_brackets
+from fetchkjv.refparser import ReferenceParser
+from fetchkjv.render import build_rtf_document, encode_payload, rtf_escape
+
+from .selections import SELECTIONS
+
+REPEAT = 5
+MIN_RUN_SECONDS = 0.2
+DEFAULT_THRESHOLD = 0.25
+
+
+# -----------------------------
+# CASES
+# -----------------------------
+
+def build_cases(json_path, tmp_dir):
+    """[(name, callable, unit count, unit)] for every benchmark, and the stores they read.
+
+    The caller closes the stores; on Windows tmp_dir can't be removed while
+    they are mapped.
+    """
+    corpus_path = os.path.join(tmp_dir, "kjv.kjvc")
+    corpus.build_corpus(json_path, corpus_path)
+    store = corpus.Corpus(corpus_path)
+    packed_path = os.path.join(tmp_dir, "kjv.kjvz")
+    packed.build_packed(json_path, packed_path)
+    packed_store = packed.PackedCorpus(packed_path)
+    parser = ReferenceParser(store, fallback=False)
+    index = search.SearchIndex.build(store)
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        raw_verses = [entry["text"] for entry in json.load(f)["verses"]]
+    genesis_raw = raw_verses[:store.verse_id("Exodus", 1, 1)]
+
+    def styled(book, start_chapter=None, start_verse=None, end_chapter=None, end_verse=None):
+        verses = passages.iter_passage(store, book, start_chapter, start_verse, end_chapter, end_verse, styled=True)
+        return join_styled(p for _, v, text in verses for p in (f" {v} ", text or ""))
+
+    genesis = styled("Genesis")
+    genesis_text = genesis.text
+    lookup_blocks = [
+        ("John 3:16-18", styled("John", 3, 16, 3, 18)),
+        ("Romans 8:28-39", styled("Romans", 8, 28, 8, 39)),
+    ]
+    lookup_text = "\n".join(block.text for _, block in lookup_blocks)
+    references = [ref for text in SELECTIONS for ref in parser.get_references(text)]
+
+    def verse_range(*args):
+        return lambda: list(passages.iter_passage(store, *args, styled=True))
+
+    def cold_chapter(book, chapter):
+        def run():
+            packed_store.blocks.clear()
+            return list(passages.iter_passage(packed_store, book, chapter, styled=True))
+        return run
+
+    def search_query(query):
+        return lambda: index.search(query)
+
+    cases = [
+        ("corpus.load_json", lambda: corpus.load_json_store(json_path), 1, "load"),
+        ("corpus.open_kjvc", lambda: corpus.Corpus(corpus_path).close(), 1, "open"),
+        ("corpus.build_kjvc", lambda: corpus.build_corpus(json_path, corpus_path + ".bench"), 1, "build"),
+        ("corpus.open_kjvz", lambda: packed.PackedCorpus(packed_path).close(), 1, "open"),
+        ("refparser.parse", lambda: [parser.get_references(text) for text in SELECTIONS], len(SELECTIONS), "selection"),
+        ("refparser.format", lambda: [parser.format_reference(ref) for ref in references], len(references), "reference"),
+        ("passage.verse", verse_range("John", 3, 16, 3, 16), 1, "lookup"),
+        ("passage.chapter", verse_range("Psalms", 119), 1, "lookup"),
+        ("passage.book", verse_range("Genesis"), 1, "lookup"),
+        ("passage.chapter_kjvz_cold", cold_chapter("Psalms", 119), 1, "lookup"),
+        ("markup.parse_brackets", lambda: [parse_brackets(text) for text in genesis_raw], len(genesis_raw), "verse"),
+        ("render.rtf_escape", lambda: rtf_escape(genesis_text), len(genesis_text), "char"),
+        ("render.build_rtf_document", lambda: build_rtf_document(rtf_escape(lookup_text)), len(lookup_text), "char"),
+        ("render.payload_lookup", lambda: encode_payload(lookup_blocks), 1, "payload"),
+        ("render.payload_book", lambda: encode_payload([("Genesis", genesis)]), 1, "payload"),
+        ("search.word", search_query("faith"), 1, "query"),
+        ("search.phrase", search_query('"the lord"'), 1, "query"),
+        ("search.near", search_query("god NEAR/3 said"), 1, "query"),
+    ]
+    return cases, (store, packed_store)
+
+
+# -----------------------------
+# RUNNER
+# -----------------------------
+
+def measure(func):
+    """(best, median) seconds per call, and the loop count used."""
+    timer = timeit.Timer(func)
+    loops, seconds = timer.autorange()
+    if seconds < MIN_RUN_SECONDS:
+        loops = max(loops, int(loops * MIN_RUN_SECONDS / max(seconds, 1e-9)))
+    runs = [t / loops for t in timer.repeat(REPEAT, loops)]
+    return min(runs), statistics.median(runs), loops
+
+
+def compare(results, baseline, threshold):
+    """Print each case against the baseline. Returns the names that regressed."""
+    regressions = []
+    old_results = baseline.get("results", {})
+    print()
+    print(f"{'case (best run)':<28}{'baseline':>12}{'now':>12}{'change':>10}")
+    for name, result in results.items():
+        old = old_results.get(name)
+        if old is None:
+            print(f"{name:<28}{'-':>12}{result['best_us']:>10.2f}us{'new':>10}")
+            continue
+        change = result["best_us"] / old["best_us"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  SLOWER"
+        print(f"{name:<28}{old['best_us']:>10.2f}us{result['best_us']:>10.2f}us{change:>+9.0%}{flag}")
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="FetchKJV microbenchmarks")
+    parser.add_argument("kjv_json")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare with results written earlier by --output")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a case counts as a regression (default 0.25)")
+    parser.add_argument("--filter", default="", help="only run cases whose name contains this")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cases, stores = build_cases(args.kjv_json, tmp_dir)
+        results = {}
+        try:
+            print(f"{'case':<28}{'median':>12}{'best':>12}{'per unit':>20}")
+            for name, func, units, unit in cases:
+                if args.filter not in name:
+                    continue
+                best, median, loops = measure(func)
+                results[name] = {
+                    "median_us": round(median * 1e6, 3),
+                    "best_us": round(best * 1e6, 3),
+                    "loops": loops,
+                    "repeat": REPEAT,
+                    "units": units,
+                    "unit": unit,
+                }
+                per_unit = f"{median * 1e6 / units:.4g}us/{unit}"
+                print(f"{name:<28}{median * 1e6:>10.2f}us{best * 1e6:>10.2f}us{per_unit:>20}")
+        finally:
+            for store in stores:
+                store.close()
+
+    report = {
+        "meta": {
+            "written": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "kjv_json_bytes": os.path.getsize(args.kjv_json),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}: "
+                  + ", ".join(regressions))
+            return 1
+        print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
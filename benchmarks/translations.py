@@ -0,0 +1,165 @@
+"""Memory and first-lookup latency of each translation in a TranslationRegistry.
+
+    python -m benchmarks.translations kjv.json [CODE=path.json ...] [--json]
+
+Registers kjv.json as the KJV and every CODE=path.json given (asv.json,
+web.json, ...). Without any, three stand-ins are generated from kjv.json
+(same versification, altered text) so the registry can be measured anyway.
+Each translation is measured from its .kjvc corpus (built into a temporary
+folder) and, with --json, also straight from its .json.
+
+For every translation it reports the time of the first lookup (opening the
+corpus plus formatting the passage), a warm lookup, and the memory the open
+translation holds: Python heap measured with tracemalloc, plus the size of
+the mapped file. Finally it opens every translation in turn through a
+registry with max_open=2 and reports what stays open, and checks that a
+translation evicted while it is being read stays readable until released.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from fetchkjv import corpus, passages, refparser, translations
+
+from .memory import measure
+
+LOOKUPS = ("John 3:16", "Psalms 23", "Romans 8:28-39")
+
+
+def make_stand_in(json_path, out_path, code):
+    """Writes a copy of json_path whose every verse text is tagged with code."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for entry in data["verses"]:
+        entry["text"] = f"{code.lower()} {entry['text']}"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def first_lookup(registry, code, refs):
+    """(first lookup seconds including the open, warm lookup seconds, heap bytes held)."""
+    def lookup():
+        store = registry.store(code)
+        for ref in refs:
+            passages.format_passage(passages.iter_reference(store, ref, styled=True))
+
+    start = time.perf_counter()
+    lookup()
+    first = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lookup()
+    warm = time.perf_counter() - start
+
+    # Opened again under tracemalloc, which would have slowed the timed open
+    registry.evict(code)
+    _, heap = measure(lambda: registry.store(code))
+    return first, warm, heap
+
+
+def check_eviction(sources, corpora):
+    """Evicts a translation mid-read; the read must finish and the store close on release."""
+    failures = 0
+    registry = translations.TranslationRegistry(max_open=2, idle_seconds=None)
+    for code, json_path in sources.items():
+        registry.register(code, json_path, corpora[code])
+    code, *others = [code for code in sources if code != registry.default]
+    # A whole book, as the popup reads it: chapter by chapter, as it streams in
+    expected = passages.format_passage(passages.iter_passage(registry.store(code), "Psalms", styled=True))
+
+    with registry.reading(code) as store:
+        verses = passages.iter_passage(store, "Psalms", styled=True)
+        read = [next(verses)]
+        # Opening the others pushes code out (max_open=2), and so does evict()
+        for other in others:
+            registry.store(other)
+        registry.evict(code)
+        try:
+            read.extend(verses)
+            if passages.format_passage(read) != expected:
+                print(f"FAIL: {code} read different text after being evicted")
+                failures += 1
+        except ValueError as e:
+            print(f"FAIL: {code} was closed while being read: {e}")
+            failures += 1
+    if store.nbytes():
+        print(f"FAIL: {code} is still open after its last reader released it")
+        failures += 1
+    if registry.store(code) is store:
+        print(f"FAIL: {code} was handed out again after being evicted")
+        failures += 1
+    registry.close()
+    return failures
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.translations")
+    parser.add_argument("kjv_json")
+    parser.add_argument("translations", nargs="*", metavar="CODE=path.json")
+    parser.add_argument("--json", action="store_true", help="also measure opening the .json files")
+    args = parser.parse_args(argv)
+
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        sources = {translations.DEFAULT_TRANSLATION: args.kjv_json}
+        for item in args.translations:
+            code, _, path = item.partition("=")
+            sources[code.upper()] = path
+        if len(sources) == 1:
+            for code in ("ASV", "WEB", "YLT"):
+                sources[code] = os.path.join(tmp_dir, code.lower() + ".json")
+                make_stand_in(args.kjv_json, sources[code], code)
+            print("No other translations given: measuring stand-ins generated from kjv.json.\n")
+
+        corpora = {}
+        for code, json_path in sources.items():
+            corpora[code] = os.path.join(tmp_dir, code.lower() + ".kjvc")
+            corpus.build_corpus(json_path, corpora[code])
+
+        kjv = corpus.load_json_store(args.kjv_json)
+        ref_parser = refparser.ReferenceParser(kjv, fallback=False)
+        refs = [ref for text in LOOKUPS for ref in ref_parser.get_references(text)]
+
+        variants = [("kjvc", corpora)]
+        if args.json:
+            variants.append(("json", {code: None for code in sources}))
+
+        print(f"{'translation':<14}{'first lookup':>14}{'warm lookup':>13}{'python heap':>14}{'mapped file':>14}")
+        shapes = set()
+        for source, corpus_paths in variants:
+            registry = translations.TranslationRegistry(max_open=len(sources), idle_seconds=None)
+            for code, json_path in sources.items():
+                registry.register(code, json_path, corpus_paths[code])
+            for code in sources:
+                first, warm, heap = first_lookup(registry, code, refs)
+                store = registry.store(code)
+                shapes.add(id(store.shape))
+                mapped = store.nbytes() if store.mapped else 0
+                print(f"{code + ' ' + source:<14}{first * 1000:>11.1f} ms{warm * 1000:>10.2f} ms"
+                      f"{heap / 1e6:>11.2f} MB{mapped / 1e6:>11.2f} MB")
+            registry.close()
+        print(f"\nbook/chapter tables: {len(shapes)} shared Shape(s) for {len(sources)} translations")
+
+        registry = translations.TranslationRegistry(max_open=2, idle_seconds=None)
+        for code, json_path in sources.items():
+            registry.register(code, json_path, corpora[code])
+        for code in sources:
+            registry.store(code)
+        still_open = [stats["code"] for stats in registry.stats() if stats["open"]]
+        print(f"after using all {len(sources)} with max_open=2: open {', '.join(still_open)}")
+        registry.close()
+
+        failures = check_eviction(sources, corpora)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print(f"\nfailures: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,5 @@
+"""Bible lookup engine used by FetchKJV.
+
+Nothing in this package imports tkinter, pynput, pystray or pywin32, so it
+can be used from scripts and build tools as well as from the tray app.
+"""
@@ -0,0 +1,7 @@
+import sys
+
+from .cli import main
+
+# Guarded so process pool workers started with spawn can import this module
+if __name__ == "__main__":
+    sys.exit(main())
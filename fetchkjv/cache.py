@@ -0,0 +1,173 @@
+"""Bounded LRU caches for the hotkey path.
+
+Sermon notes get looked up over and over, and pythonbible's reference regexes
+are the heaviest part of a lookup. ReferenceCache puts an LRU in front of
+parsing (keyed by the whitespace-normalised selection) and formatting (keyed
+by the reference's fields), so a repeat lookup skips both.
+"""
+
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with hit/miss counters."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, calling compute() and storing the result on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self):
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ByteLRUCache(LRUCache):
+    """LRUCache bounded by the total len() of its values rather than their number.
+
+    The most recent value is always kept, even if it alone is over max_bytes.
+    """
+
+    def __init__(self, max_bytes):
+        super().__init__(maxsize=None)
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+
+    def put(self, key, value):
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.nbytes -= len(old)
+            self._data[key] = value
+            self.nbytes += len(value)
+            self._shrink()
+
+    def _shrink(self):
+        while self.nbytes > self.max_bytes and len(self._data) > 1:
+            _, value = self._data.popitem(last=False)
+            self.nbytes -= len(value)
+
+    def invalidate(self, key):
+        with self._lock:
+            value = self._data.pop(key, None)
+            if value is not None:
+                self.nbytes -= len(value)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def resize(self, max_bytes):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._shrink()
+
+    def stats(self):
+        stats = super().stats()
+        stats.update(bytes=self.nbytes, max_bytes=self.max_bytes)
+        return stats
+
+
+def normalize_selection(text):
+    """Collapse all runs of whitespace so re-selections of the same text share a key."""
+    return " ".join(text.split())
+
+
+def reference_key(ref):
+    """Hashable key for a pythonbible-style NormalizedReference."""
+    return (
+        ref.book,
+        ref.start_chapter,
+        ref.start_verse,
+        ref.end_chapter,
+        ref.end_verse,
+        getattr(ref, "end_book", None),
+    )
+
+
+class ReferenceCache:
+    """Caches ``parse(selection)`` and ``format(ref)`` results.
+
+    parse and format are normally pythonbible.get_references and
+    pythonbible.format_single_reference.
+    """
+
+    def __init__(self, parse, format, maxsize=256):
+        self._parse = parse
+        self._format = format
+        self.references = LRUCache(maxsize)
+        self.formatted = LRUCache(maxsize)
+
+    def get_references(self, selected):
+        """References in the selection, as a tuple."""
+        text = normalize_selection(selected)
+        return self.references.get_or_compute(text, lambda: tuple(self._parse(text)))
+
+    def format_reference(self, ref):
+        return self.formatted.get_or_compute(reference_key(ref), lambda: self._format(ref))
+
+    def invalidate(self, selected=None):
+        """Forget one selection, or everything when called without arguments."""
+        if selected is None:
+            self.references.clear()
+            self.formatted.clear()
+        else:
+            self.references.invalidate(normalize_selection(selected))
+
+    def resize(self, maxsize):
+        self.references.resize(maxsize)
+        self.formatted.resize(maxsize)
+
+    def stats(self):
+        return {"references": self.references.stats(), "formatted": self.formatted.stats()}
@@ -0,0 +1,265 @@
+"""Command-line entry point: python -m fetchkjv <command>.
+
+    python -m fetchkjv resolve [--format plain|rtf|json] [REFERENCE ...]
+    python -m fetchkjv scan [--output FILE] [--jobs N] [DOCUMENT]
+    python -m fetchkjv serve [--port N | --unix PATH]
+
+resolve looks up the references given as arguments, or read from stdin one
+per line when there are none, and writes their passages to stdout as they
+are found: plain text (the same text the tray app copies), one RTF document
+covering every passage, or one JSON object per input line. Lines without a
+reference are reported on stderr and make the exit status 1.
+
+scan copies a document (or stdin) to stdout or --output with the passage of
+every reference it cites inserted after the reference; see scanner.py.
+
+serve answers lookups and searches from other programs over a local socket
+until interrupted; see server.py. The tray app can run the same server.
+
+The Bible is read from kjv.kjvc / kjv.json in the current directory or the
+FetchKJV directory, or from --bible / --corpus. Only the fetchkjv package is
+imported, so this runs anywhere Python does, with no desktop.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+
+from . import cache, corpus, passages, refparser, scanner, search
+from .render import RTF_FOOTER, RTF_HEADER, rtf_escape, rtf_styled
+
+FORMATS = ("plain", "rtf", "json")
+SERVE_PORT = 47017  # server.DEFAULT_PORT; server and asyncio are only imported by serve
+
+
+# -----------------------------
+# BIBLE
+# -----------------------------
+
+def default_bible_path(name):
+    """name in the current directory if it is there, otherwise next to FetchKJV.py."""
+    if os.path.exists(name):
+        return name
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), name)
+
+
+def bible_paths(args):
+    """(kjv.json path, corpus path) for the --bible / --corpus arguments."""
+    json_path = args.bible or default_bible_path("kjv.json")
+    return json_path, args.corpus or corpus.find_corpus(json_path)
+
+
+def open_bible(args):
+    """(VerseStore, reference cache) for the --bible / --corpus arguments."""
+    store, parser = open_parser(args)
+    references = cache.ReferenceCache(parser.get_references, parser.format_reference, maxsize=args.cache_size)
+    return store, references
+
+
+def open_parser(args):
+    """(VerseStore, ReferenceParser) for the --bible / --corpus arguments."""
+    store = corpus.load_verse_store(*bible_paths(args))
+    # Unusual selections go to pythonbible, but only if it is installed
+    fallback = importlib.util.find_spec("pythonbible") is not None
+    parser = refparser.ReferenceParser(store, fallback=fallback)
+    for alias in parser.set_aliases(book_aliases(args)):
+        sys.stderr.write(f"Ignoring --alias {alias}: an alias is words, and its book a known book name\n")
+    return store, parser
+
+
+def book_aliases(args):
+    """{alias: book} from the --alias arguments."""
+    aliases = {}
+    for value in args.alias:
+        alias, _, book = value.partition("=")
+        aliases[alias.strip()] = book.strip()
+    return aliases
+
+
+def add_bible_arguments(parser):
+    parser.add_argument("--bible", metavar="KJV_JSON", help="path to kjv.json (default: ./kjv.json)")
+    parser.add_argument("--corpus", metavar="KJV_KJVC", help="path to kjv.kjvc or kjv.kjvz (default: next to kjv.json)")
+    parser.add_argument("--cache-size", type=int, default=1024, help="selections whose references are kept (default 1024)")
+    parser.add_argument("--alias", action="append", default=[], metavar="ALIAS=BOOK",
+                        help='extra book name, e.g. "Jno=John" (repeatable)')
+
+
+def input_lines(values, stream):
+    """The arguments, or the non-blank lines of stream when there are none."""
+    if values:
+        return values
+    return (line.strip() for line in stream if line.strip())
+
+
+# -----------------------------
+# RESOLVE
+# -----------------------------
+
+def resolve(args, out, err):
+    store, references = open_bible(args)
+    streaming = not args.references
+    unresolved = 0
+    first = True
+
+    if args.format == "rtf":
+        out.write(RTF_HEADER)
+
+    try:
+        for text in input_lines(args.references, sys.stdin):
+            blocks = passages.lookup(store, references, text)
+            if not blocks:
+                unresolved += 1
+                # Plain text and RTF have nowhere else to say so
+                if args.format != "json":
+                    err.write(f"No Bible reference found in: {text}\n")
+
+            if args.format == "json":
+                record = {"input": text, "references": [passages.passage_record(*block) for block in blocks]}
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            else:
+                for ref_str, passage, _ in blocks:
+                    if args.format == "rtf":
+                        if not first:
+                            out.write("\\par\n\\par\n")
+                        out.write(rtf_escape(ref_str) + "\\par\n" + rtf_styled(passage))
+                    else:
+                        if not first:
+                            out.write("\n")
+                        out.write(ref_str + "\n" + passage.text + "\n")
+                    first = False
+
+            # Someone may be waiting on each answer at the other end of a pipe
+            if streaming:
+                out.flush()
+    finally:
+        if args.format == "rtf":
+            out.write(RTF_FOOTER + "\n")
+        out.flush()
+        store.close()
+
+    return 1 if unresolved else 0
+
+
+# -----------------------------
+# SCAN
+# -----------------------------
+
+def scan(args, out, err):
+    json_path, corpus_path = bible_paths(args)
+    if args.document in (None, "-"):
+        source = sys.stdin
+        workers = args.jobs or 1
+    else:
+        source = open(args.document, "r", encoding="utf-8", errors="replace", newline="")
+        workers = args.jobs or scanner.default_workers(args.document)
+
+    target = out
+    if args.output:
+        target = open(args.output, "w", encoding="utf-8", newline="")
+
+    try:
+        count = scanner.annotate_stream(source, target, json_path, corpus_path,
+                                        workers=workers, max_verses=args.max_verses,
+                                        aliases=book_aliases(args))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if target is not out:
+            target.close()
+
+    err.write(f"{count} citations expanded\n")
+    return 0
+
+
+# -----------------------------
+# SERVE
+# -----------------------------
+
+def serve(args, out, err):
+    # Imported here: asyncio alone would add tens of ms to every resolve
+    import asyncio
+
+    from . import server
+
+    store, parser = open_parser(args)
+    references = cache.ReferenceCache(parser.get_references, parser.format_reference, maxsize=args.cache_size)
+    index = None
+    if args.index:
+        index = search.load_search_index(store, args.index)
+
+    handler = server.QueryHandler(store, parser, references, index)
+    query_server = server.QueryServer(handler, port=args.port, path=args.unix)
+
+    async def run():
+        address = await query_server.start()
+        where = address if args.unix else f"{address[0]}:{address[1]}"
+        # Scripts wait for this line (and read the port from it when --port 0)
+        out.write(f"Listening on {where}\n")
+        out.flush()
+        await query_server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        query_server.close()
+    return 0
+
+
+# -----------------------------
+# MAIN
+# -----------------------------
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m fetchkjv", description="FetchKJV without the tray app.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("resolve", help="print the passages of Bible references")
+    command.add_argument("references", nargs="*", metavar="REFERENCE",
+                         help='e.g. "John 3:16"; read from stdin, one per line, if none are given')
+    command.add_argument("--format", choices=FORMATS, default="plain", help="output format (default plain)")
+    add_bible_arguments(command)
+    command.set_defaults(run=resolve)
+
+    command = commands.add_parser("scan", help="insert the passage after every reference in a document")
+    command.add_argument("document", nargs="?", help="text file to scan (default: stdin)")
+    command.add_argument("-o", "--output", help="write the annotated document here (default: stdout)")
+    command.add_argument("--jobs", type=int, default=0,
+                         help="worker processes (default: one per CPU for files over 1 MB, otherwise 1)")
+    command.add_argument("--max-verses", type=int, default=scanner.MAX_VERSES,
+                         help=f"verses inserted per reference, 0 for all (default {scanner.MAX_VERSES})")
+    add_bible_arguments(command)
+    command.set_defaults(run=scan)
+
+    command = commands.add_parser("serve", help="answer lookups from other programs over a local socket")
+    where = command.add_mutually_exclusive_group()
+    where.add_argument("--port", type=int, default=SERVE_PORT,
+                       help=f"TCP port on 127.0.0.1, 0 for any free one (default {SERVE_PORT})")
+    where.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead")
+    command.add_argument("--index", metavar="KJVI", help="search index file, built if missing (default: no search)")
+    add_bible_arguments(command)
+    command.set_defaults(run=serve)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    # Verse text isn't always representable in the console's code page
+    for stream in (sys.stdout, sys.stderr):
+        if hasattr(stream, "reconfigure"):
+            stream.reconfigure(encoding="utf-8", errors="replace")
+
+    try:
+        return args.run(args, sys.stdout, sys.stderr)
+    except BrokenPipeError:
+        # Output piped into head and the like; keep the exit flush quiet too
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    except (OSError, ValueError) as e:
+        print(f"fetchkjv: {e}", file=sys.stderr)
+        return 2
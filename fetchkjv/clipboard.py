@@ -0,0 +1,221 @@
+"""Clipboard backends and selection capture.
+
+FetchKJV reads the selection by sending Ctrl+C and reading the clipboard.
+capture_selection waits for the clipboard to actually change instead of
+sleeping a fixed time: it polls the backend's change counter (or, when the
+backend has none, the text itself) every few milliseconds until the copy
+lands or a deadline passes.
+
+Backends:
+
+    Win32Clipboard      pywin32; change counter from GetClipboardSequenceNumber,
+                        and RTF alongside the plain text
+    PyperclipClipboard  pyperclip, plain text only, no change counter
+    FakeClipboard       in memory, for exercising capture_selection without
+                        a desktop (copies can be scheduled to land later)
+"""
+
+import sys
+import time
+
+POLL_INTERVAL = 0.005  # seconds between clipboard checks
+CAPTURE_TIMEOUT = 0.4  # seconds to wait for Ctrl+C to reach the clipboard
+
+
+class ClipboardError(RuntimeError):
+    """Raised when the clipboard can't be opened."""
+
+
+class ClipboardBackend:
+    """What capture_selection and the copy functions need from a clipboard."""
+
+    def get_text(self):
+        """Plain text on the clipboard, or "" if there is none."""
+        raise NotImplementedError
+
+    def set_text(self, text):
+        raise NotImplementedError
+
+    def set_rich_text(self, rtf, plain_text):
+        """Puts RTF (bytes) and its plain-text version on the clipboard together."""
+        self.set_text(plain_text)
+
+    def sequence(self):
+        """A number that changes whenever the clipboard does, or None if unknown."""
+        return None
+
+
+# -----------------------------
+# BACKENDS
+# -----------------------------
+
+class Win32Clipboard(ClipboardBackend):
+    """The Windows clipboard through pywin32."""
+
+    OPEN_ATTEMPTS = 10  # another process may hold the clipboard for a moment
+
+    def __init__(self):
+        import win32clipboard
+        import win32con
+
+        self._cb = win32clipboard
+        self._text_format = win32con.CF_UNICODETEXT
+        self._rtf_format = win32clipboard.RegisterClipboardFormat("Rich Text Format")
+
+    def _open(self):
+        for attempt in range(self.OPEN_ATTEMPTS):
+            try:
+                self._cb.OpenClipboard()
+                return
+            except Exception as e:
+                error = e
+                time.sleep(POLL_INTERVAL)
+        raise ClipboardError(f"Could not open the clipboard: {error}")
+
+    def get_text(self):
+        self._open()
+        try:
+            if not self._cb.IsClipboardFormatAvailable(self._text_format):
+                return ""
+            return self._cb.GetClipboardData(self._text_format)
+        finally:
+            self._cb.CloseClipboard()
+
+    def set_text(self, text):
+        self._open()
+        try:
+            self._cb.EmptyClipboard()
+            if text:
+                self._cb.SetClipboardData(self._text_format, text)
+        finally:
+            self._cb.CloseClipboard()
+
+    def set_rich_text(self, rtf, plain_text):
+        if isinstance(rtf, str):
+            rtf = rtf.encode("utf-8")
+        self._open()
+        try:
+            self._cb.EmptyClipboard()
+            # RTF for Word and other rich editors
+            self._cb.SetClipboardData(self._rtf_format, rtf)
+            # Clean plain text for Notepad and simple editors
+            self._cb.SetClipboardData(self._text_format, plain_text)
+        finally:
+            self._cb.CloseClipboard()
+
+    def sequence(self):
+        return self._cb.GetClipboardSequenceNumber()
+
+
+class PyperclipClipboard(ClipboardBackend):
+    """Plain-text clipboard through pyperclip."""
+
+    def __init__(self):
+        import pyperclip
+
+        self._pyperclip = pyperclip
+
+    def get_text(self):
+        return self._pyperclip.paste() or ""
+
+    def set_text(self, text):
+        self._pyperclip.copy(text)
+
+
+class FakeClipboard(ClipboardBackend):
+    """In-memory clipboard.
+
+    schedule_copy(text, delay) makes text appear after delay seconds, the
+    way a real application answers Ctrl+C. With track_sequence=False it
+    behaves like a backend without a change counter.
+    """
+
+    def __init__(self, text="", track_sequence=True, clock=time.monotonic):
+        self.text = text
+        self.rtf = None
+        self.track_sequence = track_sequence
+        self._clock = clock
+        self._sequence = 0
+        self._pending = []  # (time, text)
+
+    def _apply_pending(self):
+        if self._pending:
+            now = self._clock()
+            due = [item for item in self._pending if item[0] <= now]
+            if due:
+                self._pending = [item for item in self._pending if item[0] > now]
+                for _, text in sorted(due, key=lambda item: item[0]):
+                    self._write(text, None)
+
+    def _write(self, text, rtf):
+        self.text = text
+        self.rtf = rtf
+        self._sequence += 1
+
+    def schedule_copy(self, text, delay):
+        self._pending.append((self._clock() + delay, text))
+
+    def get_text(self):
+        self._apply_pending()
+        return self.text
+
+    def set_text(self, text):
+        self._apply_pending()
+        self._write(text, None)
+
+    def set_rich_text(self, rtf, plain_text):
+        self._apply_pending()
+        self._write(plain_text, rtf)
+
+    def sequence(self):
+        if not self.track_sequence:
+            return None
+        self._apply_pending()
+        return self._sequence
+
+
+def default_backend():
+    """Win32Clipboard on Windows when pywin32 is installed, otherwise pyperclip."""
+    if sys.platform == "win32":
+        try:
+            return Win32Clipboard()
+        except ImportError:
+            pass
+    return PyperclipClipboard()
+
+
+# -----------------------------
+# CAPTURE
+# -----------------------------
+
+def capture_selection(backend, send_copy, timeout=CAPTURE_TIMEOUT, interval=POLL_INTERVAL,
+                      clock=time.monotonic, sleep=time.sleep):
+    """Text that send_copy() puts on the clipboard, or "" if nothing arrives by the deadline.
+
+    The clipboard's previous text is put back afterwards if anything
+    changed it. Without a change counter the clipboard is emptied first, so
+    any text that appears is new.
+    """
+    original = backend.get_text()
+
+    before = backend.sequence()
+    if before is None:
+        backend.set_text("")
+
+    try:
+        send_copy()
+        deadline = clock() + timeout
+        while True:
+            if before is None or backend.sequence() != before:
+                # The counter can move before the copying application has
+                # written its text, so keep polling until there is some
+                selected = backend.get_text()
+                if selected:
+                    return selected
+            if clock() >= deadline:
+                return ""
+            sleep(interval)
+    finally:
+        # Leave an untouched clipboard alone (it may hold more than text)
+        if before is None or backend.sequence() != before:
+            backend.set_text(original)
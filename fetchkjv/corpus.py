@@ -0,0 +1,295 @@
+"""Compact binary KJV corpus (kjv.kjvc).
+
+kjv.json is a 4-5 MB list of verse dicts. Parsing it at startup and keeping
+the result around as a dict of tuples is the single biggest cost of launching
+FetchKJV. The build step below turns it into one file that can be opened with
+mmap and read in place:
+
+    header      magic, format version, checksums, counts (HEADER)
+    books       per book: name, chapter count, verse count of every chapter
+    offsets     uint32 start of every verse in the text blob, in canonical
+                order, plus one trailing end offset
+    span index  uint32 index of every verse's first italic span, plus one
+                trailing end index
+    spans       uint16 (start, end) character offsets of italic spans
+    text        every verse as UTF-8 without [brackets], back to back
+
+Build it with:
+
+    python -m fetchkjv.corpus kjv.json kjv.kjvc
+"""
+
+import array
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+
+from .store import VerseStore, pack_verses
+
+MAGIC = b"KJVC"
+FORMAT_VERSION = 2
+
+# magic, version, book count, body crc32, source crc32, source size,
+# source mtime (ns), verse slot count, italic span count, text size
+HEADER = struct.Struct("<4sHHIIQqIII")
+
+
+class CorpusError(ValueError):
+    """Raised when a corpus file is missing, truncated or from another version."""
+
+
+# -----------------------------
+# BUILD
+# -----------------------------
+
+def _align(n, size=4):
+    return (n + size - 1) // size * size
+
+
+def read_source(json_path):
+    """(raw bytes, packed verses) of a kjv.json; see store.pack_verses."""
+    with open(json_path, "rb") as f:
+        raw = f.read()
+
+    data = json.loads(raw)
+    if "verses" not in data:
+        raise ValueError("kjv.json is missing the 'verses' key")
+    return raw, pack_verses(data["verses"])
+
+
+def pack_books(books, chapter_verse_counts):
+    """Book table: per book its UTF-8 name and the verse count of every chapter."""
+    book_table = bytearray()
+    for name, counts in zip(books, chapter_verse_counts):
+        encoded = name.encode("utf-8")
+        book_table += struct.pack("<B", len(encoded)) + encoded
+        book_table += struct.pack(f"<H{len(counts)}H", len(counts), *counts)
+    return book_table
+
+
+def unpack_books(buf, pos, book_count):
+    """(books, chapter_verse_counts, end position) of a book table written by pack_books."""
+    books = []
+    chapter_verse_counts = []
+    for _ in range(book_count):
+        name_len = buf[pos]
+        books.append(bytes(buf[pos + 1:pos + 1 + name_len]).decode("utf-8"))
+        pos += 1 + name_len
+        (chapter_count,) = struct.unpack_from("<H", buf, pos)
+        chapter_verse_counts.append(struct.unpack_from(f"<{chapter_count}H", buf, pos + 2))
+        pos += 2 + 2 * chapter_count
+    return books, chapter_verse_counts, pos
+
+
+def build_corpus(json_path, out_path):
+    """Convert kjv.json into a kjv.kjvc corpus file. Returns the verse count."""
+    raw, (books, chapter_verse_counts, offsets, blob, span_index, spans) = read_source(json_path)
+    book_table = pack_books(books, chapter_verse_counts)
+
+    if sys.byteorder != "little":
+        offsets.byteswap()
+        span_index.byteswap()
+        spans.byteswap()
+
+    body = bytearray(book_table)
+    body += b"\0" * (_align(HEADER.size + len(body)) - HEADER.size - len(body))
+    body += offsets.tobytes() + span_index.tobytes() + spans.tobytes()
+    body += b"\0" * (_align(HEADER.size + len(body)) - HEADER.size - len(body))
+    body += blob
+
+    st = os.stat(json_path)
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        len(books),
+        zlib.crc32(body),
+        zlib.crc32(raw),
+        st.st_size,
+        st.st_mtime_ns,
+        len(offsets) - 1,
+        len(spans) // 2,
+        len(blob),
+    )
+
+    # Write next to the target first so a half-written file is never opened
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(body)
+    os.replace(tmp_path, out_path)
+
+    return len(offsets) - 1
+
+
+# -----------------------------
+# READ
+# -----------------------------
+
+class Corpus(VerseStore):
+    """VerseStore backed by a memory-mapped kjv.kjvc file.
+
+    Verse text stays in the mapped file and is only decoded when asked for.
+    """
+
+    mapped = True
+    source = "kjvc"
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = None
+        self._view = None
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._open()
+        except ValueError as e:
+            self.close()
+            raise CorpusError(f"{path}: {e}")
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self):
+        mm = self._mm
+        if len(mm) < HEADER.size:
+            raise CorpusError(f"{self.path} is truncated")
+
+        (magic, version, book_count, body_crc, self.source_crc, self.source_size,
+         self.source_mtime_ns, slot_count, span_count, text_size) = HEADER.unpack_from(mm, 0)
+
+        if magic != MAGIC:
+            raise CorpusError(f"{self.path} is not a FetchKJV corpus")
+        if version != FORMAT_VERSION:
+            raise CorpusError(f"{self.path} is format v{version}, expected v{FORMAT_VERSION}")
+        # Checksummed through a view: slicing the map would copy the whole body
+        with memoryview(mm)[HEADER.size:] as body:
+            crc = zlib.crc32(body)
+        if crc != body_crc:
+            raise CorpusError(f"{self.path} failed its checksum")
+
+        books, chapter_verse_counts, pos = unpack_books(mm, HEADER.size, book_count)
+
+        offsets_at = _align(pos)
+        span_index_at = offsets_at + 4 * (slot_count + 1)
+        spans_at = span_index_at + 4 * (slot_count + 1)
+        text_at = _align(spans_at + 4 * span_count)
+        if text_at + text_size != len(mm):
+            raise CorpusError(f"{self.path} is truncated")
+
+        if sys.byteorder == "little":
+            self._view = memoryview(mm)
+            offsets = self._view[offsets_at:span_index_at].cast("I")
+            span_index = self._view[span_index_at:spans_at].cast("I")
+            spans = self._view[spans_at:spans_at + 4 * span_count].cast("H")
+        else:
+            offsets = array.array("I", mm[offsets_at:span_index_at])
+            span_index = array.array("I", mm[span_index_at:spans_at])
+            spans = array.array("H", mm[spans_at:spans_at + 4 * span_count])
+            for table in (offsets, span_index, spans):
+                table.byteswap()
+
+        super().__init__(books, chapter_verse_counts, offsets, mm, span_index, spans, base=text_at)
+
+    def nbytes(self):
+        """Size of the mapped file; the OS pages it in as verses are read."""
+        return len(self._mm) if self._mm is not None else 0
+
+    def close(self):
+        # The tables are views into the map and have to go first
+        for name in ("_offsets", "_span_index", "_spans"):
+            table = getattr(self, name, None)
+            if isinstance(table, memoryview):
+                table.release()
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def is_stale(self, json_path):
+        """True if json_path exists and is not the file this corpus was built from."""
+        return source_is_stale(json_path, self.source_size, self.source_mtime_ns, self.source_crc)
+
+
+def source_is_stale(json_path, size, mtime_ns, crc):
+    """True if json_path exists and isn't the file of that size, mtime and crc32."""
+    try:
+        st = os.stat(json_path)
+    except OSError:
+        return False
+
+    if st.st_size != size:
+        return True
+    if st.st_mtime_ns == mtime_ns:
+        return False
+
+    # Same size, different mtime (copied, or unpacked by PyInstaller):
+    # only the content can tell
+    with open(json_path, "rb") as f:
+        return zlib.crc32(f.read()) != crc
+
+
+# -----------------------------
+# LOADER
+# -----------------------------
+
+def load_json_store(json_path):
+    """Parse kjv.json into an in-memory VerseStore."""
+    if not os.path.exists(json_path):
+        raise FileNotFoundError(f"kjv.json not found at: {json_path}")
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    if "verses" not in data:
+        raise ValueError("kjv.json is missing the 'verses' key")
+
+    return VerseStore(*pack_verses(data["verses"]))
+
+
+def open_corpus(path, cache_bytes=None):
+    """Corpus for a .kjvc file, PackedCorpus for a .kjvz (block-compressed) one."""
+    if path.endswith(".kjvz"):
+        from .packed import DEFAULT_CACHE_BYTES, PackedCorpus
+        return PackedCorpus(path, cache_bytes or DEFAULT_CACHE_BYTES)
+    return Corpus(path)
+
+
+def find_corpus(json_path):
+    """The .kjvc next to json_path, or the .kjvz if only that one exists."""
+    base = os.path.splitext(json_path)[0]
+    if not os.path.exists(base + ".kjvc") and os.path.exists(base + ".kjvz"):
+        return base + ".kjvz"
+    return base + ".kjvc"
+
+
+def load_verse_store(json_path, corpus_path, cache_bytes=None):
+    """Open the corpus file (.kjvc or .kjvz) if it is present and current, otherwise parse kjv.json.
+
+    cache_bytes caps the decompressed text a .kjvz keeps in memory.
+    """
+    if os.path.exists(corpus_path):
+        try:
+            corpus = open_corpus(corpus_path, cache_bytes)
+        except (OSError, CorpusError) as e:
+            print("Ignoring corpus file:", e)
+        else:
+            if not corpus.is_stale(json_path):
+                return corpus
+            print(f"{corpus_path} is out of date, falling back to kjv.json")
+            corpus.close()
+
+    return load_json_store(json_path)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m fetchkjv.corpus kjv.json kjv.kjvc")
+        sys.exit(2)
+    count = build_corpus(sys.argv[1], sys.argv[2])
+    print(f"Wrote {sys.argv[2]} ({count} verses).")
@@ -0,0 +1,131 @@
+"""Modifier tracking and hotkey matching for the keyboard listener.
+
+The listener callback runs on pynput's hook thread for every key pressed
+anywhere on the system, so it has to be cheap. HotkeyMatcher keeps the held
+modifiers as a bitmask and matches hotkeys with one dict lookup on the key
+name, precomputed whenever the hotkeys change.
+
+Modifiers stay held for a short grace period after they are released
+(RELEASE_DELAY), because the hotkey and the release of its modifiers can
+arrive in either order. The grace period is a timestamp compared on the
+next press, not a timer.
+
+Keys are plain names, so the matcher doesn't depend on pynput and can be
+driven by recorded or scripted events (see replay):
+
+    modifiers   ctrl ctrl_l ctrl_r alt alt_l alt_r alt_gr shift shift_l shift_r
+    other keys  pynput's Key names ("f21", "space") or the lower-cased character
+"""
+
+import time
+
+RELEASE_DELAY = 0.02  # seconds a released modifier still counts as held
+
+CTRL = 1
+ALT = 2
+SHIFT = 4
+
+MODIFIER_KEYS = {
+    "ctrl": CTRL, "ctrl_l": CTRL, "ctrl_r": CTRL,
+    "alt": ALT, "alt_l": ALT, "alt_r": ALT, "alt_gr": ALT,
+    "shift": SHIFT, "shift_l": SHIFT, "shift_r": SHIFT,
+}
+
+_MODIFIER_BITS = ((CTRL, "ctrl"), (ALT, "alt"), (SHIFT, "shift"))
+
+
+def hotkey_mask(hk):
+    """Modifier bitmask of a settings.json hotkey dict."""
+    return sum(bit for bit, name in _MODIFIER_BITS if hk.get(name))
+
+
+class HotkeyMatcher:
+    """Turns a stream of key presses and releases into hotkey actions."""
+
+    def __init__(self, hotkeys=(), release_delay=RELEASE_DELAY, clock=time.monotonic):
+        self.release_delay = release_delay
+        self._clock = clock
+        self._down = 0
+        self._lingering = {}  # modifier bit → time its grace period ends
+        self._lookup = {}
+        self.set_hotkeys(hotkeys)
+
+    def set_hotkeys(self, hotkeys):
+        """Set the (action, hotkey dict) pairs to match.
+
+        A hotkey fires when its key is pressed with at least its modifiers
+        held. When several hotkeys share a key, the one needing the most
+        modifiers is tried first, then the order given.
+        """
+        lookup = {}
+        for action, hk in hotkeys:
+            lookup.setdefault(hk["key"].lower(), []).append((hotkey_mask(hk), action))
+        for entries in lookup.values():
+            entries.sort(key=lambda entry: -bin(entry[0]).count("1"))
+        self._lookup = {key: tuple(entries) for key, entries in lookup.items()}
+
+    def held(self, now=None):
+        """Bitmask of the modifiers that count as held."""
+        mask = self._down
+        if self._lingering:
+            if now is None:
+                now = self._clock()
+            for bit, until in list(self._lingering.items()):
+                if now < until:
+                    mask |= bit
+                else:
+                    # held() is also called off the listener thread, which may
+                    # have re-pressed (and so removed) this modifier meanwhile
+                    self._lingering.pop(bit, None)
+        return mask
+
+    def press(self, key, now=None):
+        """Record a key press. Returns the action of the hotkey it completes, or None."""
+        bit = MODIFIER_KEYS.get(key)
+        if bit is not None:
+            self._down |= bit
+            self._lingering.pop(bit, None)
+            return None
+
+        entries = self._lookup.get(key)
+        if entries is None:
+            return None
+
+        held = self.held(now)
+        # The Ctrl+C sent to copy the selection must not trigger anything
+        if key == "c" and held & CTRL:
+            return None
+        for mask, action in entries:
+            if held & mask == mask:
+                return action
+        return None
+
+    def release(self, key, now=None):
+        """Record a key release."""
+        bit = MODIFIER_KEYS.get(key)
+        if bit is not None and self._down & bit:
+            self._down &= ~bit
+            self._lingering[bit] = (self._clock() if now is None else now) + self.release_delay
+
+    def reset(self):
+        """Forget all held modifiers."""
+        self._down = 0
+        self._lingering.clear()
+
+
+def replay(matcher, events):
+    """Feed (time, "press" | "release", key) events to matcher.
+
+    Returns the (time, action) pairs of the hotkeys that fired.
+    """
+    fired = []
+    for at, kind, key in events:
+        if kind == "press":
+            action = matcher.press(key, at)
+            if action is not None:
+                fired.append((at, action))
+        elif kind == "release":
+            matcher.release(key, at)
+        else:
+            raise ValueError(f"unknown key event {kind!r}")
+    return fired
@@ -0,0 +1,142 @@
+"""Hands a second launch's request to the FetchKJV that is already running.
+
+The running instance listens on a per-user channel: a named pipe on Windows
+(\\\\.\\pipe\\FetchKJV-<user>), a Unix socket elsewhere. A second launch
+turns its command line into a small JSON message with launch_message(),
+sends it with forward() and exits as soon as the running instance has
+acknowledged it, a few milliseconds later.
+
+    FetchKJV.exe "John 3:16"        {"command": "lookup", "text": "John 3:16"}
+    FetchKJV.exe --search grace     {"command": "search", "text": "grace"}
+    FetchKJV.exe --settings         {"command": "settings"}
+
+Only the standard library is used (multiprocessing.connection), so this
+works without pywin32.
+"""
+
+import getpass
+import json
+import os
+import sys
+import tempfile
+import threading
+from multiprocessing.connection import Client, Listener
+
+CHANNEL_NAME = "FetchKJV"
+FORWARD_TIMEOUT = 2.0  # seconds to wait for the running instance to acknowledge
+MAX_MESSAGE = 64 * 1024  # bytes
+ACK = b"ok"
+COMMANDS = ("lookup", "search", "settings")
+
+
+def _user():
+    try:
+        return getpass.getuser()
+    except Exception:
+        return str(os.getpid())
+
+
+def channel_address(name=CHANNEL_NAME):
+    """(address, family) of the channel for the current user."""
+    if sys.platform == "win32":
+        return rf"\\.\pipe\{name}-{_user()}", "AF_PIPE"
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"{name}-{_user()}.sock"), "AF_UNIX"
+
+
+def launch_message(argv):
+    """Message for a command line (without the program name), or None when it asks for nothing."""
+    if not argv:
+        return None
+    if argv[0] == "--settings":
+        return {"command": "settings"}
+    if argv[0] == "--search":
+        text = " ".join(argv[1:]).strip()
+        return {"command": "search", "text": text} if text else None
+    text = " ".join(argv).strip()
+    return {"command": "lookup", "text": text} if text else None
+
+
+def forward(message, name=CHANNEL_NAME, timeout=FORWARD_TIMEOUT):
+    """Sends message to the running instance. True once it has been acknowledged."""
+    address, family = channel_address(name)
+    try:
+        conn = Client(address, family)
+    except OSError:
+        return False
+    try:
+        conn.send_bytes(json.dumps(message or {}).encode("utf-8"))
+        return conn.poll(timeout) and conn.recv_bytes(len(ACK)) == ACK
+    except (OSError, EOFError):
+        return False
+    finally:
+        conn.close()
+
+
+class InstanceChannel:
+    """The running instance's end: accepts forwarded messages on a daemon thread."""
+
+    def __init__(self, name=CHANNEL_NAME):
+        self.name = name
+        self.address, self.family = channel_address(name)
+        self._listener = None
+        self._thread = None
+        self._closed = False
+
+    def listen(self):
+        """Claims the channel. False if another live instance already holds it."""
+        try:
+            self._listener = Listener(self.address, self.family)
+        except OSError:
+            if self.family != "AF_UNIX" or forward({}, self.name, timeout=0.5) or self._alive():
+                return False
+            # A socket file left behind by an instance that crashed
+            os.remove(self.address)
+            self._listener = Listener(self.address, self.family)
+        return True
+
+    def _alive(self):
+        try:
+            Client(self.address, self.family).close()
+        except OSError:
+            return False
+        return True
+
+    def start(self, on_message):
+        """Calls on_message(dict) on the channel thread for every valid message received."""
+        self._thread = threading.Thread(target=self._serve, args=(on_message,), name="instance-channel", daemon=True)
+        self._thread.start()
+
+    def _serve(self, on_message):
+        while not self._closed:
+            try:
+                conn = self._listener.accept()
+            except OSError:
+                if self._closed:
+                    return
+                continue
+            try:
+                if not conn.poll(FORWARD_TIMEOUT):
+                    continue
+                message = json.loads(conn.recv_bytes(MAX_MESSAGE))
+                conn.send_bytes(ACK)
+            except EOFError:
+                # Connected and left without a message: a liveness check
+                continue
+            except (OSError, ValueError) as e:
+                print("Ignoring message from another launch:", e)
+                continue
+            finally:
+                conn.close()
+
+            # {} only checks that this instance is alive
+            if isinstance(message, dict) and message.get("command") in COMMANDS:
+                try:
+                    on_message(message)
+                except Exception as e:
+                    print("Error handling message from another launch:", e)
+
+    def close(self):
+        self._closed = True
+        if self._listener is not None:
+            self._listener.close()
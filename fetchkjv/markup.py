@@ -0,0 +1,76 @@
+"""Verse text with its italic spans.
+
+The KJV prints the words its translators supplied in italics; kjv.json marks
+them as [bracketed] text. The corpus builder resolves the brackets once into
+plain text plus (start, end) character spans, so nothing downstream has to
+search for brackets again.
+"""
+
+from collections import namedtuple
+
+
+class StyledText(namedtuple("StyledText", "text spans")):
+    """Plain text and a tuple of (start, end) italic spans, in order."""
+
+    __slots__ = ()
+
+    def runs(self):
+        """Yield (segment, italic) pairs covering the whole text."""
+        pos = 0
+        for start, end in self.spans:
+            if start > pos:
+                yield self.text[pos:start], False
+            yield self.text[start:end], True
+            pos = end
+        if pos < len(self.text):
+            yield self.text[pos:], False
+
+    def __str__(self):
+        return self.text
+
+
+def parse_brackets(text):
+    """StyledText for a verse with [bracketed] supplied words.
+
+    A bracket without a partner is kept as a literal character.
+    """
+    if "[" not in text:
+        return StyledText(text, ())
+
+    out = []
+    spans = []
+    length = 0
+    pos = 0
+    while True:
+        open_at = text.find("[", pos)
+        if open_at < 0:
+            break
+        close_at = text.find("]", open_at + 1)
+        if close_at < 0:
+            break
+        before = text[pos:open_at]
+        inner = text[open_at + 1:close_at]
+        out.append(before)
+        length += len(before)
+        if inner:
+            spans.append((length, length + len(inner)))
+            out.append(inner)
+            length += len(inner)
+        pos = close_at + 1
+
+    out.append(text[pos:])
+    return StyledText("".join(out), tuple(spans))
+
+
+def join_styled(pieces):
+    """Concatenate strings and StyledTexts into one StyledText."""
+    out = []
+    spans = []
+    length = 0
+    for piece in pieces:
+        if isinstance(piece, StyledText):
+            spans.extend((start + length, end + length) for start, end in piece.spans)
+            piece = piece.text
+        out.append(piece)
+        length += len(piece)
+    return StyledText("".join(out), tuple(spans))
@@ -0,0 +1,136 @@
+"""Per-stage latency measurements for the hotkey pipeline.
+
+A lookup carries a Trace from the key press to the popup being on screen;
+each stage calls trace.lap("stage") when it finishes, and the time since the
+previous lap is added to that stage's rolling window of samples. summary()
+reports p50/p95/p99 per stage over the most recent samples, and dump()
+writes it as JSON.
+
+When disabled, Metrics.trace() hands out one shared no-op trace, so the
+instrumented code pays for a method call per stage and nothing else.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+
+DEFAULT_WINDOW = 1000  # samples kept per stage
+
+
+class _NullTrace:
+    """Stands in for a Trace when metrics are off."""
+
+    __slots__ = ()
+
+    def lap(self, stage):
+        pass
+
+    def finish(self, stage="total"):
+        pass
+
+
+NULL_TRACE = _NullTrace()
+
+
+class Trace:
+    """Times consecutive stages of one lookup."""
+
+    __slots__ = ("_metrics", "start", "_last")
+
+    def __init__(self, metrics, start=None):
+        self._metrics = metrics
+        self.start = time.perf_counter() if start is None else start
+        self._last = self.start
+
+    def lap(self, stage):
+        """Records the time since the previous lap (or the start) as stage."""
+        now = time.perf_counter()
+        self._metrics.record(stage, now - self._last)
+        self._last = now
+
+    def finish(self, stage="total"):
+        """Records the time since the start as stage."""
+        self._metrics.record(stage, time.perf_counter() - self.start)
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    rank = max(1, math.ceil(len(ordered) * fraction))
+    return ordered[rank - 1]
+
+
+class Metrics:
+    """Rolling latency samples per stage."""
+
+    def __init__(self, enabled=False, window=DEFAULT_WINDOW):
+        self.enabled = enabled
+        self.window = window
+        self._samples = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def trace(self, start=None):
+        """A Trace starting now (or at a perf_counter() value), or NULL_TRACE when disabled."""
+        if not self.enabled:
+            return NULL_TRACE
+        return Trace(self, start)
+
+    def clock(self):
+        """perf_counter() for record_since, or None when disabled."""
+        return time.perf_counter() if self.enabled else None
+
+    def record_since(self, stage, started):
+        """Records the time since a clock() reading."""
+        if started is not None:
+            self.record(stage, time.perf_counter() - started)
+
+    def record(self, stage, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+
+    def summary(self):
+        """{stage: {count, window, p50_ms, p95_ms, p99_ms, max_ms, mean_ms}}."""
+        with self._lock:
+            snapshot = {stage: sorted(samples) for stage, samples in self._samples.items()}
+            counts = dict(self._counts)
+
+        report = {}
+        for stage, ordered in snapshot.items():
+            report[stage] = {
+                "count": counts[stage],
+                "window": len(ordered),
+                "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+                "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+                "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+                "max_ms": round(ordered[-1] * 1000, 3),
+                "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            }
+        return report
+
+    def dump(self, path, **extra):
+        """Writes the summary (plus any extra fields) to path as JSON."""
+        report = dict(extra)
+        report["written"] = time.strftime("%Y-%m-%d %H:%M:%S")
+        report["stages"] = self.summary()
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        os.replace(tmp_path, path)
+        return report
@@ -0,0 +1,331 @@
+"""Block-compressed KJV corpus (kjv.kjvz) for a small distribution.
+
+kjv.kjvc keeps the verse text uncompressed so it can be read in place; in a
+one-file EXE every byte of it is unpacked to a temp folder on each launch.
+kjv.kjvz compresses the text one block at a time (a chapter or a book) with
+zlib or lzma from the standard library, so it is about a third of the size.
+A lookup only decompresses the blocks it touches, and decompressed blocks
+are kept in an LRU whose total size is capped.
+
+    header      magic, format version, codec, block kind, counts, checksums (HEADER)
+    books       per book: name, chapter count, verse count of every chapter
+    dictionary  zlib preset dictionary shared by all blocks (empty for lzma)
+    block index uint32 first verse ID of every block, plus one trailing entry,
+                then uint32 offset of every compressed block, plus one
+    tables      zlib-compressed uint32 verse offsets, uint32 span index and
+                uint16 italic spans, laid out as in kjv.kjvc
+    blocks      the compressed text of each block, back to back
+
+Verse offsets are into the uncompressed text, exactly as in kjv.kjvc, so
+the two layouts give the same VerseStore.checksum() and share search.kjvi.
+Build it with:
+
+    python -m fetchkjv.packed kjv.json kjv.kjvz [--codec lzma] [--block book]
+"""
+
+import argparse
+import array
+import lzma
+import mmap
+import os
+import struct
+import sys
+import zlib
+from bisect import bisect_right
+
+from .cache import ByteLRUCache
+from .corpus import CorpusError, pack_books, read_source, source_is_stale, unpack_books
+from .store import VerseStore
+
+MAGIC = b"KJVZ"
+FORMAT_VERSION = 1
+
+CODECS = ("zlib", "lzma")
+BLOCK_KINDS = ("chapter", "book")
+DEFAULT_CACHE_BYTES = 1024 * 1024  # decompressed text kept per corpus
+DICTIONARY_SIZE = 32 * 1024  # zlib's window; a longer dictionary is not used
+
+# magic, version, codec, block kind, book count, body crc32, source crc32,
+# source size, source mtime (ns), verse slot count, italic span count,
+# block count, dictionary size, compressed tables size
+HEADER = struct.Struct("<4sHBBHIIQqIIIII")
+
+# A 1 MB window covers the largest block (Psalms); the default 64 MB one
+# would be allocated for every block decompressed
+_LZMA_FILTERS = [{"id": lzma.FILTER_LZMA2, "preset": 9, "dict_size": 1024 * 1024}]
+
+
+# -----------------------------
+# CODECS
+# -----------------------------
+
+def _compress(codec, data, dictionary):
+    if codec == "lzma":
+        return lzma.compress(data, format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS)
+    compressor = zlib.compressobj(9, zdict=dictionary) if dictionary else zlib.compressobj(9)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _decompress(codec, data, dictionary):
+    if codec == "lzma":
+        return lzma.decompress(data, format=lzma.FORMAT_RAW, filters=_LZMA_FILTERS)
+    decompressor = zlib.decompressobj(zdict=dictionary) if dictionary else zlib.decompressobj()
+    return decompressor.decompress(data) + decompressor.flush()
+
+
+def build_dictionary(blocks, size=DICTIONARY_SIZE):
+    """zlib preset dictionary: the start of evenly spaced blocks, up to size bytes.
+
+    Chapters are a few kilobytes each, too short for zlib to find much to
+    refer back to on its own; a dictionary of typical text gives every block
+    the common words and phrases up front.
+    """
+    blocks = [block for block in blocks if block]
+    if not blocks:
+        return b""
+    sample = max(256, size // len(blocks))
+    step = max(1, len(blocks) * sample // size)
+    dictionary = b"".join(block[:sample] for block in blocks[::step])
+    return dictionary[-size:]
+
+
+# -----------------------------
+# BUILD
+# -----------------------------
+
+def block_starts(chapter_verse_counts, block="chapter"):
+    """First verse ID of every block, plus the verse slot count."""
+    starts = [0]
+    for counts in chapter_verse_counts:
+        if block == "book":
+            starts.append(starts[-1] + sum(counts))
+        else:
+            for count in counts:
+                starts.append(starts[-1] + count)
+    return starts
+
+
+def build_packed(json_path, out_path, codec="zlib", block="chapter"):
+    """Convert kjv.json into a kjv.kjvz file. Returns (verse count, file size)."""
+    if codec not in CODECS:
+        raise ValueError(f"codec must be one of {', '.join(CODECS)}")
+    if block not in BLOCK_KINDS:
+        raise ValueError(f"block must be one of {', '.join(BLOCK_KINDS)}")
+
+    raw, (books, chapter_verse_counts, offsets, blob, span_index, spans) = read_source(json_path)
+    starts = block_starts(chapter_verse_counts, block)
+    texts = [blob[offsets[a]:offsets[b]] for a, b in zip(starts, starts[1:])]
+    dictionary = build_dictionary(texts) if codec == "zlib" else b""
+
+    compressed = [_compress(codec, text, dictionary) for text in texts]
+    block_offsets = array.array("I", [0])
+    for data in compressed:
+        block_offsets.append(block_offsets[-1] + len(data))
+    block_index = array.array("I", starts) + block_offsets
+
+    for table in (offsets, span_index, spans, block_index):
+        if sys.byteorder != "little":
+            table.byteswap()
+    tables = zlib.compress(offsets.tobytes() + span_index.tobytes() + spans.tobytes(), 9)
+
+    body = pack_books(books, chapter_verse_counts) + dictionary + block_index.tobytes() + tables + b"".join(compressed)
+
+    st = os.stat(json_path)
+    header = HEADER.pack(
+        MAGIC,
+        FORMAT_VERSION,
+        CODECS.index(codec),
+        BLOCK_KINDS.index(block),
+        len(books),
+        zlib.crc32(body),
+        zlib.crc32(raw),
+        st.st_size,
+        st.st_mtime_ns,
+        len(offsets) - 1,
+        len(spans) // 2,
+        len(texts),
+        len(dictionary),
+        len(tables),
+    )
+
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(body)
+    os.replace(tmp_path, out_path)
+
+    return len(offsets) - 1, HEADER.size + len(body)
+
+
+# -----------------------------
+# READ
+# -----------------------------
+
+class PackedCorpus(VerseStore):
+    """VerseStore backed by a kjv.kjvz file, decompressing blocks on demand.
+
+    cache_bytes caps the decompressed text kept in memory; the block being
+    read is always kept, so a cap below one block still works (slowly).
+    """
+
+    mapped = True
+    source = "kjvz"
+
+    def __init__(self, path, cache_bytes=DEFAULT_CACHE_BYTES):
+        self.path = path
+        self.blocks = ByteLRUCache(cache_bytes)
+        self._file = open(path, "rb")
+        self._mm = None
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._open()
+        except (ValueError, zlib.error, IndexError, struct.error) as e:
+            self.close()
+            raise CorpusError(f"{path}: {e}")
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self):
+        mm = self._mm
+        if len(mm) < HEADER.size:
+            raise CorpusError(f"{self.path} is truncated")
+
+        (magic, version, codec, block, book_count, body_crc, self.source_crc, self.source_size,
+         self.source_mtime_ns, slot_count, span_count, block_count, dictionary_size,
+         tables_size) = HEADER.unpack_from(mm, 0)
+
+        if magic != MAGIC:
+            raise CorpusError(f"{self.path} is not a FetchKJV packed corpus")
+        if version != FORMAT_VERSION:
+            raise CorpusError(f"{self.path} is format v{version}, expected v{FORMAT_VERSION}")
+        # Checksummed through a view: slicing the map would copy the whole body
+        with memoryview(mm)[HEADER.size:] as body:
+            crc = zlib.crc32(body)
+        if crc != body_crc:
+            raise CorpusError(f"{self.path} failed its checksum")
+        self.codec = CODECS[codec]
+        self.block_kind = BLOCK_KINDS[block]
+
+        books, chapter_verse_counts, pos = unpack_books(mm, HEADER.size, book_count)
+        self._dictionary = mm[pos:pos + dictionary_size]
+        pos += dictionary_size
+
+        index = array.array("I", mm[pos:pos + 8 * (block_count + 1)])
+        if sys.byteorder != "little":
+            index.byteswap()
+        self._block_first = index[:block_count + 1]
+        self._block_offsets = index[block_count + 1:]
+        pos += 8 * (block_count + 1)
+
+        raw = zlib.decompress(mm[pos:pos + tables_size])
+        tables = []
+        for typecode, count in (("I", slot_count + 1), ("I", slot_count + 1), ("H", 2 * span_count)):
+            table = array.array(typecode)
+            size = count * table.itemsize
+            table.frombytes(raw[:size])
+            raw = raw[size:]
+            if sys.byteorder != "little":
+                table.byteswap()
+            tables.append(table)
+        offsets, span_index, spans = tables
+        self._blocks_at = pos + tables_size
+
+        if self._blocks_at + self._block_offsets[-1] != len(mm):
+            raise CorpusError(f"{self.path} is truncated")
+        if self._block_first[-1] != slot_count:
+            raise CorpusError(f"{self.path} has a bad block index")
+
+        super().__init__(books, chapter_verse_counts, offsets, b"", span_index, spans)
+
+    # -----------------------------
+    # BLOCKS
+    # -----------------------------
+
+    def _read_block(self, b):
+        start = self._blocks_at + self._block_offsets[b]
+        end = self._blocks_at + self._block_offsets[b + 1]
+        return _decompress(self.codec, self._mm[start:end], self._dictionary)
+
+    def _block(self, b):
+        """Decompressed text of block b, from the LRU when it is there."""
+        data = self.blocks.get(b)
+        if data is None:
+            data = self._read_block(b)
+            self.blocks.put(b, data)
+        return data
+
+    def _block_of(self, vid):
+        return bisect_right(self._block_first, vid) - 1
+
+    # -----------------------------
+    # TEXT
+    # -----------------------------
+
+    def text(self, vid):
+        offsets = self._offsets
+        start = offsets[vid]
+        end = offsets[vid + 1]
+        if start == end:
+            return None
+        b = self._block_of(vid)
+        base = offsets[self._block_first[b]]
+        return self._block(b)[start - base:end - base].decode("utf-8")
+
+    def texts(self, first, last):
+        offsets = self._offsets
+        out = []
+        vid = first
+        while vid <= last:
+            b = self._block_of(vid)
+            data = self._block(b)
+            base = offsets[self._block_first[b]]
+            stop = min(last, self._block_first[b + 1] - 1)
+            for v in range(vid, stop + 1):
+                a = offsets[v] - base
+                z = offsets[v + 1] - base
+                out.append(data[a:z].decode("utf-8") if a != z else None)
+            vid = stop + 1
+        return out
+
+    def checksum(self):
+        # Same value as the other layouts: crc32 of the whole text, then of the offsets.
+        # Blocks are read straight from the file so the LRU isn't flushed.
+        crc = 0
+        for b in range(len(self._block_offsets) - 1):
+            crc = zlib.crc32(self._read_block(b), crc)
+        return zlib.crc32(self._offsets, crc)
+
+    def nbytes(self):
+        """Size of the mapped file plus the decompressed tables and cached blocks."""
+        tables = sum(len(table) * table.itemsize for table in (self._offsets, self._span_index, self._spans))
+        return (len(self._mm) if self._mm is not None else 0) + tables + self.blocks.nbytes
+
+    def close(self):
+        self.blocks.clear()
+        if self._mm is not None:
+            self._dictionary = b""
+            self._mm.close()
+            self._mm = None
+        self._file.close()
+
+    def is_stale(self, json_path):
+        """True if json_path exists and is not the file this corpus was built from."""
+        return source_is_stale(json_path, self.source_size, self.source_mtime_ns, self.source_crc)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m fetchkjv.packed", description="Build a block-compressed kjv.kjvz.")
+    parser.add_argument("kjv_json")
+    parser.add_argument("kjv_kjvz")
+    parser.add_argument("--codec", choices=CODECS, default="zlib")
+    parser.add_argument("--block", choices=BLOCK_KINDS, default="chapter", help="compress each chapter or each book separately")
+    args = parser.parse_args(argv)
+
+    count, size = build_packed(args.kjv_json, args.kjv_kjvz, args.codec, args.block)
+    print(f"Wrote {args.kjv_kjvz} ({count} verses, {size / 1e6:.2f} MB).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,186 @@
+"""Lazy iteration over passages of a VerseStore.
+
+A passage is anything from one verse to a run of books. iter_passage walks
+it chapter by chapter and yields as it goes, so "Psalms 1-150" only costs
+what the caller actually consumes and can be cut short or paged with
+itertools.islice.
+"""
+
+from .markup import join_styled
+
+MISSING_VERSE = "[Verse not found]"
+
+
+def _chapter_spans(store, book, start_chapter=None, start_verse=None,
+                   end_chapter=None, end_verse=None, end_book=None):
+    """Yield (book, chapter, first verse, last verse) for every chapter of a passage."""
+    first_book = store.book_id(book)
+    last_book = store.book_id(end_book) if end_book else first_book
+    if first_book < 0 or last_book < first_book:
+        return
+
+    if start_chapter is None:
+        start_chapter = 1
+    elif end_chapter is None and end_book is None:
+        end_chapter = start_chapter
+    if start_verse is None:
+        start_verse = 1
+
+    for book_id in range(first_book, last_book + 1):
+        name = store.books[book_id]
+        first_chapter = start_chapter if book_id == first_book else 1
+        last_chapter = store.chapter_count(name)
+        if book_id == last_book and end_chapter is not None:
+            last_chapter = min(end_chapter, last_chapter)
+
+        for chapter in range(first_chapter, last_chapter + 1):
+            count = store.verse_count(name, chapter)
+            first_verse = start_verse if (book_id == first_book and chapter == start_chapter) else 1
+            last_verse = count
+            if book_id == last_book and chapter == last_chapter and end_verse is not None:
+                last_verse = min(end_verse, count)
+            if last_verse < first_verse:
+                continue
+            yield name, chapter, first_verse, last_verse
+
+
+def iter_passage(store, book, start_chapter=None, start_verse=None,
+                 end_chapter=None, end_verse=None, end_book=None, styled=False):
+    """Yield ((book, chapter), verse, text) for every verse in a passage.
+
+    Missing ends are open: no start chapter means the whole book, no end
+    chapter means the start chapter (or the last chapter of end_book when
+    the passage runs into another book), no end verse means the end of the
+    end chapter. End verses past the end of a chapter are clamped. text is
+    None for verses the source doesn't have, and a StyledText (text plus
+    italic spans) instead of a str when styled is true.
+    """
+    read = store.styled_texts if styled else store.texts
+
+    spans = _chapter_spans(store, book, start_chapter, start_verse, end_chapter, end_verse, end_book)
+    for name, chapter, first_verse, last_verse in spans:
+        # One slice of the text blob per chapter
+        first_id = store.verse_id(name, chapter, first_verse)
+        texts = read(first_id, first_id + last_verse - first_verse)
+        for offset, text in enumerate(texts):
+            yield (name, chapter), first_verse + offset, text
+
+
+def count_passage(store, book, start_chapter=None, start_verse=None,
+                  end_chapter=None, end_verse=None, end_book=None):
+    """Number of verses iter_passage yields, from the chapter tables alone.
+
+    Verse IDs run on across chapters and books, so only the first and last
+    chapters are looked at, however long the passage.
+    """
+    spans = _chapter_spans(store, book, start_chapter, start_verse, end_chapter, end_verse, end_book)
+    first = next(spans, None)
+    if first is None:
+        return 0
+    first_id = store.verse_id(first[0], first[1], first[2])
+
+    if start_chapter is not None and end_chapter is None and end_book is None:
+        end_chapter = start_chapter
+    last_book = end_book or book
+    last_chapter = store.chapter_count(last_book)
+    if end_chapter is not None:
+        last_chapter = min(end_chapter, last_chapter)
+    last_verse = store.verse_count(last_book, last_chapter)
+    if end_verse is not None:
+        last_verse = min(end_verse, last_verse)
+    last_id = store.verse_id(last_book, last_chapter, last_verse)
+
+    if last_id < first_id:
+        # The last chapter is empty (an end verse of 0): count chapter by chapter
+        return sum(last - first + 1 for _, _, first, last in [first, *spans])
+    return last_id - first_id + 1
+
+
+def iter_reference(store, ref, styled=False):
+    """iter_passage for a pythonbible-style NormalizedReference."""
+    return iter_passage(
+        store,
+        ref.book.title,
+        ref.start_chapter,
+        ref.start_verse,
+        ref.end_chapter,
+        ref.end_verse,
+        ref.end_book.title if getattr(ref, "end_book", None) else None,
+        styled,
+    )
+
+
+def count_reference(store, ref):
+    """count_passage for a pythonbible-style NormalizedReference."""
+    return count_passage(
+        store,
+        ref.book.title,
+        ref.start_chapter,
+        ref.start_verse,
+        ref.end_chapter,
+        ref.end_verse,
+        ref.end_book.title if getattr(ref, "end_book", None) else None,
+    )
+
+
+def label_verses(verses):
+    """Yield (label, text) for iter_passage output, as format_passage numbers them.
+
+    The label is the verse number, or chapter:verse for the first verse of
+    each new chapter, so chapter breaks stay visible in multi-chapter
+    passages.
+    """
+    current_chapter = None
+    for chapter_ref, v, verse_text in verses:
+        label = str(v)
+        if current_chapter is not None and chapter_ref != current_chapter:
+            label = f"{chapter_ref[1]}:{v}"
+        current_chapter = chapter_ref
+        yield label, verse_text
+
+
+def format_passage(verses):
+    """Joins styled iter_passage output into "16 For God… 17 For God…".
+
+    Returns a StyledText, so the italic spans of supplied words survive.
+    Verses are labelled by label_verses.
+    """
+    pieces = []
+
+    for label, verse_text in label_verses(verses):
+        if pieces:
+            pieces.append(" ")
+        pieces.append(f"{label} ")
+        pieces.append(verse_text if verse_text else MISSING_VERSE)
+
+    if not pieces:
+        pieces.append(MISSING_VERSE)
+    return join_styled(pieces)
+
+
+def lookup(store, references, text):
+    """[(reference string, StyledText passage, reference)] for every reference in text.
+
+    references is a ReferenceParser or ReferenceCache.
+    """
+    blocks = []
+    for ref in references.get_references(text):
+        passage = format_passage(iter_reference(store, ref, styled=True))
+        blocks.append((references.format_reference(ref), passage, ref))
+    return blocks
+
+
+def passage_record(ref_str, passage, ref):
+    """A lookup() block as a JSON-ready dict."""
+    end_book = ref.end_book.title if getattr(ref, "end_book", None) else ref.book.title
+    return {
+        "reference": ref_str,
+        "book": ref.book.title,
+        "start_chapter": ref.start_chapter,
+        "start_verse": ref.start_verse,
+        "end_book": end_book,
+        "end_chapter": ref.end_chapter,
+        "end_verse": ref.end_verse,
+        "text": passage.text,
+        "italic": [list(span) for span in passage.spans],
+    }
@@ -0,0 +1,124 @@
+"""Passage popup text, streamed into the Text widget in batches.
+
+Inserting a whole book into a tk.Text at once blocks the Tk thread for
+seconds. PopupText turns the popup's lines into a lazy stream of
+(text, tags) inserts and hands them out in batches of about a given number
+of characters: the popup inserts the first batch (a screenful) straight
+away and the rest from after() callbacks, so the time to first paint
+doesn't depend on the length of the passage and the window stays
+responsive while the rest arrives.
+
+At most verse_limit verses are streamed; the popup then offers to load
+more, and more() lets the next verse_limit through. Lines are
+
+    ("title", str)              the popup heading, with a divider under it
+    ("ref", str)                a reference heading (skipped if it is the title)
+    ("verses", (count, verses)) verses yields (label, StyledText or None) like
+                                passages.label_verses and is only read as the
+                                popup streams it in; count is how many it
+                                yields (passages.count_reference)
+    (tag, str)                  any other text, shown with tag
+"""
+
+from .passages import MISSING_VERSE
+
+DEFAULT_VERSE_LIMIT = 500
+BATCH_CHARS = 20000  # per after() callback once the first screenful is up
+
+DIVIDER = "―" * 60
+
+NO_TAGS = ()
+ITALIC = ("italic",)
+
+_PAUSE = object()  # yielded by the insert stream at the verse limit
+
+
+class PopupText:
+    """Batches of Text.insert arguments for the lines of one popup."""
+
+    def __init__(self, lines, verse_limit=DEFAULT_VERSE_LIMIT):
+        self.total_verses = sum(content[0] for tag, content in lines if tag == "verses")
+        self.verse_limit = verse_limit or self.total_verses
+        self.shown_verses = 0
+        self.paused = False
+        self.done = False
+        self._allowed = self.verse_limit
+        self._verses = [content[1] for tag, content in lines if tag == "verses"]
+        self._inserts = self._iter_inserts(lines)
+
+    @property
+    def remaining_verses(self):
+        return self.total_verses - self.shown_verses
+
+    def _iter_inserts(self, lines):
+        title = lines[0][1].strip() if lines and lines[0][0] == "title" else None
+
+        for tag, content in lines:
+            if tag == "title":
+                yield content + "\n", (tag,)
+                yield DIVIDER + "\n\n", ("divider",)
+            elif tag == "ref":
+                if content.strip() == title:
+                    continue
+                yield content + "\n", (tag,)
+            elif tag == "verses":
+                count, verses = content
+                if not count:
+                    yield MISSING_VERSE, NO_TAGS
+                for i, (label, verse_text) in enumerate(verses):
+                    if self.shown_verses >= self._allowed:
+                        yield _PAUSE
+                    self.shown_verses += 1
+                    yield f" {label} " if i else f"{label} ", NO_TAGS
+                    if not verse_text:
+                        yield MISSING_VERSE, NO_TAGS
+                        continue
+                    # Supplied words are shown in italics, as printed in the KJV
+                    for segment, italic in verse_text.runs():
+                        yield segment, ITALIC if italic else NO_TAGS
+                yield "\n\n", NO_TAGS
+            else:
+                yield content + "\n\n", (tag,)
+
+    def next_batch(self, max_chars=BATCH_CHARS):
+        """[(text, tags)] of at least one insert and about max_chars characters.
+
+        Empty once the stream is done, or paused at the verse limit.
+        """
+        batch = []
+        if self.done or self.paused:
+            return batch
+        size = 0
+        for item in self._inserts:
+            if item is _PAUSE:
+                self.paused = True
+                return batch
+            batch.append(item)
+            size += len(item[0])
+            if size >= max_chars:
+                return batch
+        self.done = True
+        return batch
+
+    def more(self):
+        """Lets the next verse_limit verses through after a pause."""
+        self._allowed = self.shown_verses + self.verse_limit
+        self.paused = False
+
+    def close(self):
+        """Ends the stream early, closing the verse generators not yet read to the end."""
+        self.done = True
+        self._inserts.close()
+        for verses in self._verses:
+            close = getattr(verses, "close", None)
+            if close is not None:
+                close()
+
+
+def insert_args(batch):
+    """A batch as the arguments of one Text.insert call: text, tags, text, tags, ..."""
+    args = []
+    for text, tags in batch:
+        args.append(text)
+        args.append(tags)
+    return args
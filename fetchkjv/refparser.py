@@ -0,0 +1,492 @@
+"""Fast reference parser for the hotkey path, with pythonbible as a fallback.
+
+pythonbible finds references by running very large alternation regexes over
+the whole selection, and importing it is slow. Nearly everything people
+select is one of a few simple shapes:
+
+    John 3:16        John 3:16-18      1 Cor 13:4–7      II Kings 2
+    Ps 23            Psalms 1-3        Rom 8:28, 31-39   Gen 1:1-2:3
+    Jude 3           John 3:16; 4:1    John 3:16, 1 John 4:8
+
+ReferenceParser tokenizes the selection once, matches book names by walking
+a trie of their words (BookTrie, which also holds the user's own aliases)
+and reads the chapter/verse spec with a small state machine. Anything
+it can't resolve with confidence (an unknown book followed by a chapter:verse,
+a chapter or verse that doesn't exist) goes to pythonbible instead, so the
+fallback only costs time on unusual input.
+"""
+
+import re
+from collections import namedtuple
+
+# Same fields and conventions as pythonbible.NormalizedReference: end_book is
+# always set, and whole chapters have start_verse/end_verse of None
+Reference = namedtuple("Reference", "book start_chapter start_verse end_chapter end_verse end_book")
+BookName = namedtuple("BookName", "title")
+
+# Canonical titles (as used by pythonbible and kjv.json) and the other names
+# and abbreviations people write for them. Short abbreviations that are also
+# common English words ("Is", "So", "Am", "Ex") are left out on purpose: in
+# front of a chapter:verse they still reach pythonbible through the fallback,
+# and elsewhere they would turn ordinary prose into references.
+BOOK_NAMES = [
+    ("Genesis", ["Gen", "Gn"]),
+    ("Exodus", ["Exod", "Exo"]),
+    ("Leviticus", ["Lev", "Lv"]),
+    ("Numbers", ["Num", "Nm", "Nb"]),
+    ("Deuteronomy", ["Deut", "Dt"]),
+    ("Joshua", ["Josh", "Jos", "Jsh"]),
+    ("Judges", ["Judg", "Jdg", "Jg", "Jdgs"]),
+    ("Ruth", ["Rth"]),
+    ("1 Samuel", ["1 Sam", "1 Sa", "1 Sm"]),
+    ("2 Samuel", ["2 Sam", "2 Sa", "2 Sm"]),
+    ("1 Kings", ["1 Kgs", "1 Ki", "1 Kin", "1 Kg"]),
+    ("2 Kings", ["2 Kgs", "2 Ki", "2 Kin", "2 Kg"]),
+    ("1 Chronicles", ["1 Chron", "1 Chr", "1 Ch"]),
+    ("2 Chronicles", ["2 Chron", "2 Chr", "2 Ch"]),
+    ("Ezra", ["Ezr", "Ez"]),
+    ("Nehemiah", ["Neh", "Ne"]),
+    ("Esther", ["Esth", "Est"]),
+    ("Job", ["Jb"]),
+    ("Psalms", ["Psalm", "Pslm", "Psa", "Psm", "Pss", "Ps"]),
+    ("Proverbs", ["Prov", "Prv"]),
+    ("Ecclesiastes", ["Eccles", "Eccle", "Eccl", "Ecc", "Qoh"]),
+    ("Song of Songs", ["Song of Solomon", "Song of Sol", "Song", "Canticles", "Cant", "SOS"]),
+    ("Isaiah", ["Isa"]),
+    ("Jeremiah", ["Jer", "Jr"]),
+    ("Lamentations", ["Lam"]),
+    ("Ezekiel", ["Ezek", "Eze", "Ezk"]),
+    ("Daniel", ["Dan", "Dn"]),
+    ("Hosea", ["Hos"]),
+    ("Joel", ["Jl"]),
+    ("Amos", []),
+    ("Obadiah", ["Obad"]),
+    ("Jonah", ["Jnh"]),
+    ("Micah", ["Mic", "Mc"]),
+    ("Nahum", ["Nah"]),
+    ("Habakkuk", ["Hab", "Hb"]),
+    ("Zephaniah", ["Zeph", "Zep", "Zp"]),
+    ("Haggai", ["Hag", "Hg"]),
+    ("Zechariah", ["Zech", "Zec", "Zc"]),
+    ("Malachi", ["Mal", "Ml"]),
+    ("Matthew", ["Matt", "Mt"]),
+    ("Mark", ["Mrk", "Mk"]),
+    ("Luke", ["Luk", "Lk"]),
+    ("John", ["Jhn", "Joh", "Jn"]),
+    ("Acts", []),
+    ("Romans", ["Rom", "Rm"]),
+    ("1 Corinthians", ["1 Cor", "1 Co"]),
+    ("2 Corinthians", ["2 Cor", "2 Co"]),
+    ("Galatians", ["Gal"]),
+    ("Ephesians", ["Eph", "Ephes"]),
+    ("Philippians", ["Phil", "Php"]),
+    ("Colossians", ["Col"]),
+    ("1 Thessalonians", ["1 Thess", "1 Thes", "1 Th"]),
+    ("2 Thessalonians", ["2 Thess", "2 Thes", "2 Th"]),
+    ("1 Timothy", ["1 Tim", "1 Ti"]),
+    ("2 Timothy", ["2 Tim", "2 Ti"]),
+    ("Titus", ["Tit"]),
+    ("Philemon", ["Philem", "Phm"]),
+    ("Hebrews", ["Heb"]),
+    ("James", ["Jas"]),
+    ("1 Peter", ["1 Pet", "1 Pe", "1 Pt"]),
+    ("2 Peter", ["2 Pet", "2 Pe", "2 Pt"]),
+    ("1 John", ["1 Jhn", "1 Jn", "1 Jo"]),
+    ("2 John", ["2 Jhn", "2 Jn", "2 Jo"]),
+    ("3 John", ["3 Jhn", "3 Jn", "3 Jo"]),
+    ("Jude", ["Jud"]),
+    ("Revelation", ["Revelations", "Rev", "Rv", "The Revelation"]),
+]
+
+# Numbered-book prefixes, normalised to a digit
+_PREFIXES = {
+    "1": "1", "i": "1", "1st": "1", "first": "1",
+    "2": "2", "ii": "2", "2nd": "2", "second": "2",
+    "3": "3", "iii": "3", "3rd": "3", "third": "3",
+}
+
+_TOKEN = re.compile(r"\d+(?:st|nd|rd)?|[^\W\d_]+\.?|[:;,\-‐-―]")
+_DASHES = frozenset("-‐‑‒–—―")
+_TITLE = ""  # key of the title in a trie node that ends a name; no word is empty
+
+
+def _name_words(name):
+    """Trie path of a book name: 'I Cor.' -> ['1', 'cor']. None if it isn't words."""
+    if not isinstance(name, str):
+        return None
+    tokens = _TOKEN.findall(name)
+    words = []
+    if len(tokens) > 1 and tokens[0].lower() in _PREFIXES:
+        words.append(_PREFIXES[tokens.pop(0).lower()])
+    for token in tokens:
+        if not token[0].isalpha():
+            return None
+        words.append(token.rstrip(".").lower())
+    return words or None
+
+
+class BookTrie:
+    """Book names and abbreviations as a trie of words, with user aliases on top.
+
+    Each node is a dict from the next word (lower case, without a trailing
+    period) to the node after it; a node that ends a name also holds its
+    title under _TITLE. Matching a name costs one dict lookup per word
+    however many names and aliases there are. Numbered books start with
+    their digit: "1 Cor" is the path ['1', 'cor'].
+    """
+
+    def __init__(self, book_names=BOOK_NAMES):
+        self.root = {}
+        self.aliases = {}  # {word tuple: title}
+        self._builtin = {}
+        self._resolved = {}  # {alias: (book, word tuple, title)} as last set
+        for title, abbreviations in book_names:
+            for name in [title] + abbreviations:
+                words = tuple(_name_words(name))
+                self._builtin[words] = title
+                self._insert(words, title)
+
+    def _insert(self, words, title):
+        node = self.root
+        for word in words:
+            node = node.setdefault(word, {})
+        node[_TITLE] = title
+
+    def _remove(self, words):
+        path = [self.root]
+        for word in words:
+            path.append(path[-1][word])
+        del path[-1][_TITLE]
+        # Drop the nodes no other name runs through
+        for depth in range(len(words), 0, -1):
+            if path[depth]:
+                break
+            del path[depth - 1][words[depth - 1]]
+
+    def set_aliases(self, aliases):
+        """Replaces the user aliases ({alias: book name or abbreviation}).
+
+        Only the aliases that were added, removed or changed touch the trie,
+        and removing one that shadowed a built-in name brings that name
+        back. Returns the aliases skipped because the alias isn't words or
+        the book isn't one of the built-in names.
+        """
+        wanted = {}
+        skipped = []
+        resolved = {}
+        for alias, book in aliases.items():
+            # Entries left as they were aren't normalised again
+            entry = self._resolved.get(alias)
+            if entry is None or entry[0] != book:
+                words = _name_words(alias)
+                entry = (book, words and tuple(words), self._builtin.get(tuple(_name_words(book) or ())))
+            resolved[alias] = entry
+            _, words, title = entry
+            if words is None or title is None:
+                skipped.append(alias)
+            else:
+                wanted[words] = title
+
+        for words in self.aliases.keys() - wanted.keys():
+            if words in self._builtin:
+                self._insert(words, self._builtin[words])
+            else:
+                self._remove(words)
+        for words, title in wanted.items():
+            if self.aliases.get(words) != title:
+                self._insert(words, title)
+        self.aliases = wanted
+        self._resolved = resolved
+        return skipped
+
+
+def _pythonbible():
+    import pythonbible
+    return pythonbible
+
+
+def preload_fallback():
+    """Imports pythonbible ahead of the first fallback. False if it isn't installed.
+
+    The import builds pythonbible's regular expressions and takes 100 ms or
+    more, so the tray app does it on a background thread rather than on the
+    first hotkey press that needs it.
+    """
+    try:
+        _pythonbible()
+    except ImportError:
+        return False
+    return True
+
+
+class _Unresolved(Exception):
+    """The selection looks like it has a reference this parser can't handle."""
+
+
+class ReferenceParser:
+    """Parses references against the books and chapter sizes of a VerseStore."""
+
+    def __init__(self, store, fallback=True, aliases=None):
+        self.store = store
+        self.fallback = fallback
+        self.names = BookTrie()
+        if aliases:
+            self.names.set_aliases(aliases)
+        self._books = {title: BookName(title) for title in store.books}
+        self.fallback_count = 0
+
+    # -----------------------------
+    # PUBLIC API
+    # -----------------------------
+
+    def get_references(self, text):
+        """References in text, like pythonbible.get_references."""
+        try:
+            refs = self.parse(text)
+        except _Unresolved:
+            refs = None
+
+        if not refs and self.fallback:
+            self.fallback_count += 1
+            return _pythonbible().get_references(text)
+        return refs or []
+
+    def set_aliases(self, aliases):
+        """Replaces the user's book aliases; see BookTrie.set_aliases."""
+        return self.names.set_aliases(aliases)
+
+    def parse(self, text):
+        """References found by the fast path. Raises _Unresolved for input it can't handle."""
+        tokens = _TOKEN.findall(text)
+        refs = []
+        i = 0
+        while i < len(tokens):
+            match = self._match_book(tokens, i)
+            if match is None:
+                if self._looks_like_reference(tokens, i):
+                    raise _Unresolved(tokens[i])
+                i += 1
+                continue
+
+            title, i = match
+            if i < len(tokens) and tokens[i].isdigit():
+                i = self._parse_spec(tokens, i, title, refs)
+
+        return refs
+
+    def find(self, text):
+        """[(start, end, references)] for every citation in text, by character offset.
+
+        For scanning documents: a citation the fast path can't resolve is
+        skipped rather than sent to pythonbible, which can't say where in the
+        text it found anything.
+        """
+        matches = list(_TOKEN.finditer(text))
+        tokens = [m.group() for m in matches]
+        n = len(tokens)
+        # Only words that can begin a book name (or its number) are worth a look
+        root = self.names.root
+        candidates = [j for j, token in enumerate(tokens)
+                      if token.rstrip(".").lower() in root or token.lower() in _PREFIXES]
+
+        found = []
+        i = 0
+        for j in candidates:
+            if j < i:
+                continue
+            match = self._match_book(tokens, j)
+            if match is None:
+                continue
+
+            title, after = match
+            if after < n and tokens[after].isdigit():
+                refs = []
+                try:
+                    end = self._parse_spec(tokens, after, title, refs)
+                except _Unresolved:
+                    i = after
+                    continue
+                found.append((matches[j].start(), matches[end - 1].end(), refs))
+                i = end
+            else:
+                i = after
+
+        return found
+
+    def verse_reference(self, vid):
+        """Reference for the single verse with ID vid."""
+        title, chapter, verse = self.store.reference(vid)
+        book = self._books[title]
+        return Reference(book, chapter, verse, chapter, verse, book)
+
+    def format_reference(self, ref):
+        """Reference as text, exactly like pythonbible.format_single_reference."""
+        if not isinstance(ref, Reference):
+            return _pythonbible().format_single_reference(ref)
+
+        store = self.store
+        book = ref.book.title
+        end_book = ref.end_book.title if ref.end_book and ref.end_book != ref.book else ""
+        whole_start = self._is_whole_start_book(ref)
+
+        start_chapter = ""
+        if not whole_start and store.chapter_count(book) != 1:
+            start_chapter = f"{ref.start_chapter or 1}:"
+        start_verse = "" if whole_start else f"{ref.start_verse or 1}"
+
+        end_chapter = end_verse = ""
+        if end_book:
+            if not self._is_whole_end_book(ref):
+                last_chapter = ref.end_chapter or store.chapter_count(end_book)
+                if store.chapter_count(end_book) != 1:
+                    end_chapter = f"{last_chapter}:"
+                end_verse = f"{ref.end_verse or store.verse_count(end_book, last_chapter)}"
+        elif not whole_start:
+            last_chapter = ref.end_chapter or store.chapter_count(book)
+            last_verse = ref.end_verse or store.verse_count(book, last_chapter)
+            if store.chapter_count(book) != 1 and ref.start_chapter != ref.end_chapter:
+                end_chapter = f"{last_chapter}:"
+            if (ref.start_verse or 1) != last_verse or (ref.start_chapter or 1) != last_chapter:
+                end_verse = f"{last_verse}"
+
+        start_separator = " " if start_chapter or start_verse else ""
+        end_separator = " " if end_book and (end_chapter or end_verse) else ""
+        if end_book:
+            range_separator = " - "
+        elif end_chapter or end_verse:
+            range_separator = "-"
+        else:
+            range_separator = ""
+
+        return "".join([
+            book, start_separator, start_chapter, start_verse,
+            range_separator, end_book, end_separator, end_chapter, end_verse,
+        ])
+
+    def _is_whole_start_book(self, ref):
+        if ref.start_chapter is None and ref.end_chapter is None:
+            return True
+        if ref.start_chapter != 1 or ref.start_verse != 1:
+            return False
+        if ref.end_book and ref.end_book != ref.book:
+            return True
+        last_chapter = self.store.chapter_count(ref.book.title)
+        return ref.end_chapter == last_chapter and ref.end_verse == self.store.verse_count(ref.book.title, last_chapter)
+
+    def _is_whole_end_book(self, ref):
+        if ref.start_chapter is None and ref.end_chapter is None:
+            return True
+        end_book = (ref.end_book or ref.book).title
+        last_chapter = self.store.chapter_count(end_book)
+        return ref.end_chapter == last_chapter and ref.end_verse == self.store.verse_count(end_book, last_chapter)
+
+    # -----------------------------
+    # TOKEN MATCHING
+    # -----------------------------
+
+    def _match_book(self, tokens, i):
+        """(title, index after the name) for the longest book name starting at i, or None."""
+        node = self.names.root
+        start = i
+        prefix = tokens[i].lower()
+        if prefix in _PREFIXES and i + 1 < len(tokens) and tokens[i + 1][0].isalpha():
+            node = node.get(_PREFIXES[prefix])
+            if node is None:
+                return None
+            start = i + 1
+
+        # A name is a run of words; numbers and punctuation end it
+        match = None
+        for end in range(start, len(tokens)):
+            token = tokens[end]
+            if not token[0].isalpha():
+                break
+            node = node.get(token.rstrip(".").lower())
+            if node is None:
+                break
+            title = node.get(_TITLE)
+            if title is not None and title in self._books:
+                match = (title, end + 1)
+        return match
+
+    def _looks_like_reference(self, tokens, i):
+        """True for an unknown word directly followed by chapter:verse."""
+        return (
+            tokens[i][0].isalpha()
+            and i + 3 < len(tokens)
+            and tokens[i + 1].isdigit()
+            and tokens[i + 2] == ":"
+            and tokens[i + 3].isdigit()
+        )
+
+    def _parse_spec(self, tokens, i, title, refs):
+        """Read the chapter/verse list after a book name into refs. Returns the next index."""
+        store = self.store
+        single_chapter = store.chapter_count(title) == 1
+        n = len(tokens)
+
+        def num(j):
+            return int(tokens[j]) if j < n and tokens[j].isdigit() else None
+
+        def is_dash(j):
+            return j < n and tokens[j] in _DASHES
+
+        chapter = None  # set while a comma continues a verse list
+        while True:
+            first = num(i)
+
+            if num(i + 2) is not None and i + 1 < n and tokens[i + 1] == ":":
+                # C:V, C:V-V2 or C:V-C2:V2
+                sc, sv = first, num(i + 2)
+                ec, ev = sc, sv
+                i += 3
+                if is_dash(i) and num(i + 1) is not None:
+                    if i + 2 < n and tokens[i + 2] == ":" and num(i + 3) is not None:
+                        ec, ev = num(i + 1), num(i + 3)
+                        i += 4
+                    else:
+                        ev = num(i + 1)
+                        i += 2
+                chapter = ec
+            elif chapter is not None or single_chapter:
+                # Verse (range) in the current chapter: "Rom 8:28, 31-39", "Jude 3"
+                sc = ec = chapter if chapter is not None else 1
+                sv = ev = first
+                i += 1
+                if is_dash(i) and num(i + 1) is not None:
+                    ev = num(i + 1)
+                    i += 2
+            else:
+                # Whole chapter or chapter range: "Ps 23", "Psalms 1-3".
+                # Like pythonbible, whole chapters leave the verses as None.
+                sc = ec = first
+                sv = ev = None
+                i += 1
+                if is_dash(i) and num(i + 1) is not None:
+                    ec = num(i + 1)
+                    i += 2
+                if ec != sc and i + 1 < n and tokens[i] == ":" and num(i + 1) is not None:
+                    # "John 3-4:5" runs to a verse of the last chapter
+                    ev = num(i + 1)
+                    i += 2
+
+            refs.append(self._reference(title, sc, sv, ec, ev))
+
+            # "," and ";" continue the list unless the next item starts another book
+            if i + 1 < n and tokens[i] in (",", ";") and num(i + 1) is not None:
+                if self._match_book(tokens, i + 1) is not None:
+                    return i + 1
+                if tokens[i] == ";":
+                    chapter = None
+                i += 1
+                continue
+            return i
+
+    def _reference(self, title, sc, sv, ec, ev):
+        store = self.store
+        start = store.verse_id(title, sc, sv or 1)
+        end = store.verse_id(title, ec, ev or store.verse_count(title, ec))
+        if start < 0 or end < start:
+            raise _Unresolved(f"{title} {sc}:{sv}-{ec}:{ev}")
+        book = self._books[title]
+        return Reference(book, sc, sv, ec, ev, book)
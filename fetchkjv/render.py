@@ -0,0 +1,116 @@
+"""Plain-text and RTF rendering of passages for the clipboard.
+
+Passages arrive as StyledText: plain text plus the italic spans of the KJV's
+supplied words, resolved when the corpus was built. encode_payload walks the
+blocks of a lookup once and writes all four clipboard variants (plain and
+RTF, with and without reference lines) as it goes.
+
+The RTF is pure 7-bit ASCII: \\, { and } are escaped, newlines become \\par
+and every non-ASCII character is written as a \\uN? escape (with a surrogate
+pair above U+FFFF), so Word reads it the same whatever the ANSI code page.
+"""
+
+from collections import namedtuple
+
+RTF_HEADER = r"{\rtf1\ansi\ansicpg1252\uc1 "
+RTF_FOOTER = "}"
+
+
+class _RTFEscapes(dict):
+    """str.translate table for RTF text; non-ASCII entries are filled in on first use."""
+
+    def __missing__(self, codepoint):
+        if codepoint > 0xFFFF:
+            codepoint -= 0x10000
+            high = 0xD800 + (codepoint >> 10)
+            low = 0xDC00 + (codepoint & 0x3FF)
+            value = f"\\u{high - 0x10000}?\\u{low - 0x10000}?"
+        else:
+            # \uN takes a signed 16-bit value
+            value = f"\\u{codepoint if codepoint < 0x8000 else codepoint - 0x10000}?"
+        self[codepoint] = value
+        return value
+
+
+_RTF_ESCAPES = _RTFEscapes({c: c for c in range(32, 128)})
+_RTF_ESCAPES.update({
+    ord("\\"): "\\\\",
+    ord("{"): "\\{",
+    ord("}"): "\\}",
+    ord("\n"): "\\par\n",
+    ord("\t"): "\\tab ",
+})
+_RTF_ESCAPES.update({c: None for c in range(32) if c not in (9, 10)})
+
+
+def rtf_escape(text):
+    """Text escaped for an RTF body."""
+    return text.translate(_RTF_ESCAPES)
+
+
+def rtf_styled(passage):
+    """RTF body for a StyledText, with its italic spans in {\\i …} groups."""
+    parts = []
+    for segment, italic in passage.runs():
+        escaped = rtf_escape(segment)
+        parts.append("{\\i " + escaped + "}" if italic else escaped)
+    return "".join(parts)
+
+
+def build_rtf_document(rtf_body):
+    """Wraps RTF body into a valid RTF document."""
+    return RTF_HEADER + rtf_body + RTF_FOOTER
+
+
+class ClipboardPayload(namedtuple("ClipboardPayload", "plain_with_refs rtf_with_refs plain_without_refs rtf_without_refs")):
+    """Everything the clipboard can be given for one passage, built once.
+
+    RTF is kept as the encoded bytes handed to the clipboard.
+    """
+
+    __slots__ = ()
+
+    def select(self, include_refs):
+        """(rtf bytes, plain text) with or without reference lines."""
+        if include_refs:
+            return self.rtf_with_refs, self.plain_with_refs
+        return self.rtf_without_refs, self.plain_without_refs
+
+
+def encode_payload(blocks):
+    """ClipboardPayload for the (ref_str, StyledText passage) blocks of a lookup.
+
+    One pass over the blocks; every piece of text is escaped once and
+    appended to the buffers that need it.
+    """
+    plain_with = []
+    plain_without = []
+    rtf_with = [RTF_HEADER]
+    rtf_without = [RTF_HEADER]
+
+    for i, (ref_str, passage) in enumerate(blocks):
+        if i:
+            plain_with.append("\n\n")
+            plain_without.append("\n\n")
+            rtf_with.append("\\par\n\\par\n")
+            rtf_without.append("\\par\n\\par\n")
+
+        plain_with.append(ref_str + "\n")
+        rtf_with.append(rtf_escape(ref_str) + "\\par\n")
+
+        plain_with.append(passage.text)
+        plain_without.append(passage.text)
+
+        body = rtf_styled(passage)
+        rtf_with.append(body)
+        rtf_without.append(body)
+
+    rtf_with.append(RTF_FOOTER)
+    rtf_without.append(RTF_FOOTER)
+
+    return ClipboardPayload(
+        "".join(plain_with),
+        "".join(rtf_with).encode("ascii"),
+        "".join(plain_without),
+        "".join(rtf_without).encode("ascii"),
+    )
@@ -0,0 +1,175 @@
+"""Finds every reference in a long document and writes it out annotated.
+
+The document is read as a stream of chunks. Each chunk is scanned together
+with CONTEXT characters on either side and owns the citations that start
+inside it, so a citation cut in two by a chunk boundary is still seen whole
+by the chunk it starts in, and never twice. Each citation's passage is
+inserted right after it:
+
+    ...as in John 3:16 [John 3:16: 16 For God so loved the world, ...] we...
+
+Chunks are independent, so they can be scanned in a process pool; results
+are written back in document order. Only a bounded number of chunks is in
+flight at a time, so memory use doesn't depend on the size of the input.
+Citations longer than CONTEXT characters (very long verse lists) are the
+one thing chunking can split.
+"""
+
+import os
+from collections import deque
+from itertools import islice
+
+from . import cache, corpus, passages, refparser
+
+CHUNK_SIZE = 64 * 1024  # characters per work unit
+CONTEXT = 1024  # characters read on each side of a chunk
+MAX_VERSES = 100  # verses inserted per reference; 0 for no limit
+POOL_THRESHOLD = 1024 * 1024  # bytes; smaller files are scanned in-process
+IN_FLIGHT_PER_WORKER = 2  # chunks queued per worker process
+
+
+# -----------------------------
+# CHUNKS
+# -----------------------------
+
+def iter_windows(stream, chunk_size=CHUNK_SIZE, context=CONTEXT):
+    """Yield (window, start, end) where window[start:end] is the next chunk of stream.
+
+    The window adds up to context characters before and after the chunk.
+    """
+    if chunk_size < context:
+        raise ValueError("chunk_size must be at least context")
+
+    before = ""
+    current = stream.read(chunk_size)
+    while current:
+        following = stream.read(chunk_size)
+        yield before + current + following[:context], len(before), len(before) + len(current)
+        before = (before + current)[-context:]
+        current = following
+
+
+# -----------------------------
+# ANNOTATION
+# -----------------------------
+
+class Annotator:
+    """Turns the citations of one window into (offset, text) insertions."""
+
+    def __init__(self, store, max_verses=MAX_VERSES, cache_size=256, aliases=None):
+        self.store = store
+        self.parser = refparser.ReferenceParser(store, fallback=False, aliases=aliases)
+        self.max_verses = max_verses
+        self._passages = cache.LRUCache(cache_size)  # sermons cite the same verses again and again
+
+    def passage(self, ref):
+        """"Romans 8:28: 28 And we know…" for one reference."""
+        return self._passages.get_or_compute(cache.reference_key(ref), lambda: self._passage(ref))
+
+    def _passage(self, ref):
+        verses = passages.iter_reference(self.store, ref, styled=True)
+        truncated = False
+        if self.max_verses:
+            verses = list(islice(verses, self.max_verses + 1))
+            truncated = len(verses) > self.max_verses
+            verses = verses[:self.max_verses]
+        text = passages.format_passage(verses).text
+        if truncated:
+            text += " …"
+        return f"{self.parser.format_reference(ref)}: {text}"
+
+    def insertions(self, window, start, end):
+        """[(offset in window, text)] for the citations starting in window[start:end]."""
+        found = []
+        for cite_start, cite_end, refs in self.parser.find(window):
+            if start <= cite_start < end:
+                found.append((cite_end, " [" + " | ".join(self.passage(ref) for ref in refs) + "]"))
+        return found
+
+
+# One Annotator per worker process, opened by _init_worker
+_annotator = None
+
+
+def _init_worker(json_path, corpus_path, max_verses, aliases=None):
+    global _annotator
+    store = corpus.load_verse_store(json_path, corpus_path)
+    _annotator = Annotator(store, max_verses, aliases=aliases)
+
+
+def _scan_window(window, start, end):
+    """Insertions relative to the start of the chunk."""
+    return [(offset - start, text) for offset, text in _annotator.insertions(window, start, end)]
+
+
+def _write_chunk(out, chunk, insertions, pending):
+    """Writes chunk with its insertions; ones that fall past its end (a citation
+    running into the next chunk) are returned, shifted to the next chunk."""
+    pending.extend(insertions)
+    pos = 0
+    carry = []
+    for offset, text in pending:
+        if offset > len(chunk):
+            carry.append((offset - len(chunk), text))
+            continue
+        out.write(chunk[pos:offset])
+        out.write(text)
+        pos = offset
+    out.write(chunk[pos:])
+    return carry
+
+
+def annotate_stream(stream, out, json_path, corpus_path="", workers=1, max_verses=MAX_VERSES,
+                    chunk_size=CHUNK_SIZE, context=CONTEXT, aliases=None):
+    """Copies stream to out with every citation's passage inserted after it.
+
+    workers > 1 scans chunks in that many processes. aliases are the user's
+    book aliases ({alias: book}, see refparser.BookTrie). Returns the number
+    of citations found.
+    """
+    count = 0
+    pending = []
+
+    if workers <= 1:
+        _init_worker(json_path, corpus_path, max_verses, aliases)
+        try:
+            for window, start, end in iter_windows(stream, chunk_size, context):
+                insertions = _scan_window(window, start, end)
+                count += len(insertions)
+                pending = _write_chunk(out, window[start:end], insertions, pending)
+        finally:
+            _annotator.store.close()
+        return count
+
+    # Only imported for a parallel scan: it pulls in multiprocessing, which
+    # would slow down every python -m fetchkjv command
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(json_path, corpus_path, max_verses, aliases)) as pool:
+        in_flight = deque()  # (chunk, future), in document order
+
+        def write_oldest():
+            nonlocal count, pending
+            chunk, future = in_flight.popleft()
+            insertions = future.result()
+            count += len(insertions)
+            pending = _write_chunk(out, chunk, insertions, pending)
+
+        for window, start, end in iter_windows(stream, chunk_size, context):
+            if len(in_flight) >= workers * IN_FLIGHT_PER_WORKER:
+                write_oldest()
+            in_flight.append((window[start:end], pool.submit(_scan_window, window, start, end)))
+        while in_flight:
+            write_oldest()
+
+    return count
+
+
+def default_workers(path):
+    """One process per CPU for files over POOL_THRESHOLD, otherwise 1."""
+    try:
+        size = os.path.getsize(path)
+    except (OSError, TypeError):
+        return 1
+    return (os.cpu_count() or 1) if size > POOL_THRESHOLD else 1
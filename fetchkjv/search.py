@@ -0,0 +1,357 @@
+"""Full-text search over a VerseStore.
+
+Every word of every verse goes into an inverted index with positional
+postings. A posting is one uint32, ``verse_id << shift | position``, so the
+postings of a term sorted as integers are also sorted by verse and then by
+position, and all of a term's occurrences in one verse are a single bisect
+away. All terms share one postings array; a term is a (lo, hi) range of it.
+
+Queries:
+
+    shepherd want           both words in the verse (AND is implied;
+                            the word AND itself is also accepted)
+    "in the beginning"      the words next to each other, in order
+    faith NEAR/3 works      within 3 words of each other, either order
+
+Operands of NEAR can be phrases, and NEARs can be chained
+(``a NEAR/2 b NEAR/5 c``). Matching ignores case and punctuation.
+
+Building the index for the whole KJV takes over half a second, so it is
+saved to disk (search.kjvi) and reused until the verse text changes:
+
+    header      magic, format version, position bits, store checksum,
+                counts, body crc32 (HEADER)
+    terms       every term as UTF-8, sorted, separated by newlines
+    term index  uint32 start of every term's postings, plus one trailing end
+    postings    uint32 verse_id << shift | position
+"""
+
+import array
+import os
+import re
+import struct
+import sys
+import zlib
+from bisect import bisect_left
+
+MAGIC = b"KJVI"
+FORMAT_VERSION = 1
+
+# magic, version, position bits, store checksum, verse slot count,
+# term count, size of the terms block, posting count, body crc32
+HEADER = struct.Struct("<4sHHIIIIII")
+
+_WORD = re.compile(r"[^\W_]+(?:['’][^\W_]+)*")
+_QUERY_TOKEN = re.compile(r'"([^"]*)"?|(NEAR/\d+)|(\S+)')
+
+
+class SearchError(ValueError):
+    """Raised for queries that can't be understood."""
+
+
+class IndexFileError(ValueError):
+    """Raised when a saved index is truncated, corrupt or from another version."""
+
+
+def tokenize(text):
+    """Lower-cased words of text, in order."""
+    return _WORD.findall(text.lower())
+
+
+def _align(n, size=4):
+    return (n + size - 1) // size * size
+
+
+# -----------------------------
+# INDEX
+# -----------------------------
+
+class SearchIndex:
+    """Positional inverted index over the verses of a store."""
+
+    def __init__(self, terms, term_offsets, postings, shift, checksum, verse_count):
+        self.shift = shift
+        self.checksum = checksum
+        self.verse_count = verse_count
+        self._mask = (1 << shift) - 1
+        self._postings = postings
+        self._ranges = {
+            term: (term_offsets[i], term_offsets[i + 1]) for i, term in enumerate(terms)
+        }
+
+    @classmethod
+    def build(cls, store):
+        """Index every verse of store."""
+        verse_count = len(store)
+        by_term = {}
+        longest = 1
+        for vid, text in enumerate(store.texts(0, verse_count - 1)):
+            if text is None:
+                continue
+            words = tokenize(text)
+            longest = max(longest, len(words))
+            for position, word in enumerate(words):
+                by_term.setdefault(word, []).append((vid, position))
+
+        shift = longest.bit_length()
+        if (verse_count << shift) >> 32:
+            raise ValueError("too many verses or words per verse for 32-bit postings")
+
+        terms = sorted(by_term)
+        term_offsets = array.array("I", [0])
+        postings = array.array("I")
+        for term in terms:
+            # Appended in verse order, then position order: already sorted
+            postings.extend(vid << shift | position for vid, position in by_term[term])
+            term_offsets.append(len(postings))
+
+        return cls(terms, term_offsets, postings, shift, store.checksum(), verse_count)
+
+    def matches_store(self, store):
+        return self.verse_count == len(store) and self.checksum == store.checksum()
+
+    def __len__(self):
+        return len(self._ranges)
+
+    # -----------------------------
+    # POSTINGS
+    # -----------------------------
+
+    def _range(self, term):
+        return self._ranges.get(term, (0, 0))
+
+    def frequency(self, term):
+        """Number of times term occurs in the whole text."""
+        lo, hi = self._range(term)
+        return hi - lo
+
+    def _has(self, term_range, posting):
+        lo, hi = term_range
+        i = bisect_left(self._postings, posting, lo, hi)
+        return i < hi and self._postings[i] == posting
+
+    def _occurrences(self, operand):
+        """Sorted postings of where a word or phrase starts.
+
+        A phrase is a positional join: walk the occurrences of its rarest
+        word and bisect for the other words at the neighbouring positions.
+        """
+        ranges = [self._range(term) for term in operand]
+        if len(operand) == 1:
+            lo, hi = ranges[0]
+            return self._postings[lo:hi]
+
+        order = sorted(range(len(operand)), key=lambda i: ranges[i][1] - ranges[i][0])
+        first = order[0]
+        lo, hi = ranges[first]
+        mask = self._mask
+        starts = [p - first for p in self._postings[lo:hi] if p & mask >= first]
+        for i in order[1:]:
+            if not starts:
+                break
+            term_range = ranges[i]
+            starts = [s for s in starts if self._has(term_range, s + i)]
+        starts.sort()
+        return starts
+
+    # -----------------------------
+    # QUERIES
+    # -----------------------------
+
+    def search(self, query, limit=None):
+        """Verse IDs matching query, in canonical order (at most limit of them)."""
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+
+        terms = {term for clause in clauses for operand in clause[::2] for term in operand}
+        if any(term not in self._ranges for term in terms):
+            return []
+
+        # Cheapest clauses first, so later ones only filter a small set
+        def cost(clause):
+            return min(self.frequency(term) for operand in clause[::2] for term in operand)
+
+        verses = None
+        for clause in sorted(clauses, key=cost):
+            found = self._clause_verses(clause, verses)
+            verses = found if verses is None else verses & found
+            if not verses:
+                return []
+
+        results = sorted(verses)
+        return results if limit is None else results[:limit]
+
+    def _clause_verses(self, clause, candidates):
+        """Set of verse IDs where a clause matches (restricted to candidates if given)."""
+        shift = self.shift
+        occurrences = [self._occurrences(operand) for operand in clause[::2]]
+
+        if len(clause) == 1:
+            verses = {p >> shift for p in occurrences[0]}
+            return verses if candidates is None else verses & candidates
+
+        # NEAR: only verses holding every operand need their positions compared
+        verses = candidates
+        for occ in sorted(occurrences, key=len):
+            found = {p >> shift for p in occ}
+            verses = found if verses is None else verses & found
+
+        mask = self._mask
+        by_verse = []
+        for operand, occ in zip(clause[::2], occurrences):
+            spans = {}
+            width = len(operand) - 1
+            for p in occ:
+                vid = p >> shift
+                if vid in verses:
+                    spans.setdefault(vid, []).append((p & mask, (p & mask) + width))
+            by_verse.append(spans)
+
+        matched = set()
+        for vid in verses:
+            found = by_verse[0][vid]
+            for i, distance in enumerate(clause[1::2], 1):
+                right = by_verse[i][vid]
+                found = [
+                    (min(a[0], b[0]), max(a[1], b[1]))
+                    for a in found
+                    for b in right
+                    if max(b[0] - a[1], a[0] - b[1]) <= distance
+                ]
+                if not found:
+                    break
+            else:
+                matched.add(vid)
+        return matched
+
+    # -----------------------------
+    # DISK CACHE
+    # -----------------------------
+
+    def save(self, path):
+        """Write the index to path (atomically)."""
+        terms = sorted(self._ranges, key=lambda term: self._ranges[term][0])
+        term_offsets = array.array("I", [self._ranges[term][0] for term in terms])
+        term_offsets.append(len(self._postings))
+        postings = array.array("I", self._postings)
+        if sys.byteorder != "little":
+            term_offsets.byteswap()
+            postings.byteswap()
+
+        term_block = "\n".join(terms).encode("utf-8")
+        body = bytearray(term_block)
+        body += b"\0" * (_align(HEADER.size + len(body)) - HEADER.size - len(body))
+        body += term_offsets.tobytes() + postings.tobytes()
+
+        header = HEADER.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            self.shift,
+            self.checksum,
+            self.verse_count,
+            len(terms),
+            len(term_block),
+            len(self._postings),
+            zlib.crc32(body),
+        )
+
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(body)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read an index written by save()."""
+        with open(path, "rb") as f:
+            raw = f.read()
+
+        if len(raw) < HEADER.size:
+            raise IndexFileError(f"{path} is truncated")
+        (magic, version, shift, checksum, verse_count, term_count,
+         terms_size, posting_count, body_crc) = HEADER.unpack_from(raw, 0)
+        if magic != MAGIC:
+            raise IndexFileError(f"{path} is not a FetchKJV search index")
+        if version != FORMAT_VERSION:
+            raise IndexFileError(f"{path} is format v{version}, expected v{FORMAT_VERSION}")
+
+        offsets_at = _align(HEADER.size + terms_size)
+        postings_at = offsets_at + 4 * (term_count + 1)
+        if postings_at + 4 * posting_count != len(raw):
+            raise IndexFileError(f"{path} is truncated")
+        if zlib.crc32(memoryview(raw)[HEADER.size:]) != body_crc:
+            raise IndexFileError(f"{path} failed its checksum")
+
+        terms = raw[HEADER.size:HEADER.size + terms_size].decode("utf-8").split("\n") if term_count else []
+        term_offsets = array.array("I", raw[offsets_at:postings_at])
+        postings = array.array("I", raw[postings_at:])
+        if sys.byteorder != "little":
+            term_offsets.byteswap()
+            postings.byteswap()
+
+        return cls(terms, term_offsets, postings, shift, checksum, verse_count)
+
+
+def load_search_index(store, path):
+    """Saved index for store from path, rebuilt (and re-saved) if missing or out of date."""
+    if os.path.exists(path):
+        try:
+            index = SearchIndex.load(path)
+        except (OSError, IndexFileError) as e:
+            print("Ignoring search index:", e)
+        else:
+            if index.matches_store(store):
+                return index
+            print(f"{path} is out of date, rebuilding")
+
+    index = SearchIndex.build(store)
+    try:
+        index.save(path)
+    except OSError as e:
+        print("Could not save search index:", e)
+    return index
+
+
+# -----------------------------
+# QUERY PARSER
+# -----------------------------
+
+def parse_query(query):
+    """Clauses of a query; every clause has to match.
+
+    A clause is [operand, distance, operand, distance, ...]: operands are
+    tuples of terms (one term for a word, several for a phrase) joined by
+    NEAR distances.
+    """
+    items = []
+    for match in _QUERY_TOKEN.finditer(query):
+        phrase, near, word = match.groups()
+        if near:
+            items.append(int(near[5:]))
+        elif word == "AND":
+            continue
+        else:
+            # A bare token can hold several words too ("Beer-sheba"); it is
+            # matched as a phrase, the same as when it was quoted
+            terms = tuple(tokenize(word if phrase is None else phrase))
+            if terms:
+                items.append(terms)
+
+    clauses = []
+    pending_near = None
+    for item in items:
+        if isinstance(item, int):
+            if not clauses or pending_near is not None:
+                raise SearchError("NEAR needs a word or phrase on both sides")
+            pending_near = item
+        elif pending_near is not None:
+            clauses[-1].extend((pending_near, item))
+            pending_near = None
+        else:
+            clauses.append([item])
+
+    if pending_near is not None:
+        raise SearchError("NEAR needs a word or phrase on both sides")
+    return clauses
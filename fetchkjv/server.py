@@ -0,0 +1,287 @@
+"""Local query server: other tools look verses up in an already-loaded Bible.
+
+A client connects to 127.0.0.1:DEFAULT_PORT (or a Unix socket) and sends
+one JSON object per line; each gets one JSON line back, in the order the
+requests were sent. Clients may send any number of requests without waiting
+for the answers (pipelining).
+
+    {"id": 1, "op": "resolve", "text": "Rom 8:28; Ps 23"}
+    {"id": 1, "ok": true, "references": [{"reference": "Romans 8:28", "text": "28 And we know…", …}, …]}
+
+    {"id": 2, "op": "search", "query": "\\"living water\\"", "limit": 10}
+    {"id": 2, "ok": true, "total": 3, "verses": [{"reference": "John 4:10", "book": "John", …}, …]}
+
+    {"id": 3, "op": "batch", "requests": [{"op": "resolve", "text": "Jn 3:16"}, …]}
+    {"id": 3, "ok": true, "results": [{"ok": true, "references": […]}, …]}
+
+    {"id": 4, "op": "ping"}
+    {"id": 4, "ok": true}
+
+"id" is optional and copied into the answer. Errors come back as
+{"id": …, "ok": false, "error": "…"} and don't close the connection.
+
+Lookups are answered on the event loop: they take microseconds. Searches
+(and batches, which may contain them) run on a worker thread so one slow
+query doesn't hold up other clients.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from . import passages, search
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 47017
+MAX_LINE = 1024 * 1024  # bytes per request line
+MAX_BATCH = 1000  # requests per batch
+DEFAULT_SEARCH_LIMIT = 50
+
+
+class RequestError(ValueError):
+    """A request the server can't answer; reported back to the client."""
+
+
+class QueryHandler:
+    """Answers decoded requests from one VerseStore.
+
+    references is the ReferenceParser or ReferenceCache used for "resolve";
+    parser is the ReferenceParser used to name search results. search_index
+    may be a SearchIndex, None, or a callable returning either (the tray app
+    builds its index after the Bible has loaded).
+    """
+
+    def __init__(self, store, parser, references=None, search_index=None, search_limit=DEFAULT_SEARCH_LIMIT):
+        self.store = store
+        self.parser = parser
+        self.references = references or parser
+        self._search_index = search_index
+        self.search_limit = search_limit
+
+    def search_index(self):
+        index = self._search_index
+        return index() if callable(index) else index
+
+    # -----------------------------
+    # OPERATIONS
+    # -----------------------------
+
+    def handle(self, request):
+        """Answer dict (without the id) for one request dict."""
+        if not isinstance(request, dict):
+            raise RequestError("a request must be a JSON object")
+        op = request.get("op")
+
+        if op == "resolve":
+            return self.resolve(request)
+        if op == "search":
+            return self.search(request)
+        if op == "batch":
+            requests = request.get("requests")
+            if not isinstance(requests, list):
+                raise RequestError('"requests" must be a list')
+            if len(requests) > MAX_BATCH:
+                raise RequestError(f"at most {MAX_BATCH} requests per batch")
+            return {"ok": True, "results": [self.answer(item) for item in requests]}
+        if op == "ping":
+            return {"ok": True}
+        raise RequestError(f"unknown op: {op!r}")
+
+    def answer(self, request):
+        """handle(), with errors turned into an error answer."""
+        try:
+            return self.handle(request)
+        except (RequestError, search.SearchError) as e:
+            return {"ok": False, "error": str(e)}
+        except Exception as e:
+            print("Error answering query:")
+            print(traceback.format_exc())
+            return {"ok": False, "error": f"internal error: {e}"}
+
+    def resolve(self, request):
+        text = request.get("text")
+        if not isinstance(text, str):
+            raise RequestError('"text" must be a string')
+        blocks = passages.lookup(self.store, self.references, text)
+        return {"ok": True, "references": [passages.passage_record(*block) for block in blocks]}
+
+    def search(self, request):
+        query = request.get("query")
+        if not isinstance(query, str):
+            raise RequestError('"query" must be a string')
+        limit = request.get("limit", self.search_limit)
+        if not isinstance(limit, int) or limit < 0:
+            raise RequestError('"limit" must be a non-negative integer')
+
+        index = self.search_index()
+        if index is None:
+            raise RequestError("search is not available yet")
+
+        matches = index.search(" ".join(query.split()))
+        verses = []
+        for vid in matches[:limit]:
+            ref = self.parser.verse_reference(vid)
+            verses.append({
+                "reference": self.parser.format_reference(ref),
+                "book": ref.book.title,
+                "chapter": ref.start_chapter,
+                "verse": ref.start_verse,
+                "text": self.store.text(vid),
+            })
+        return {"ok": True, "total": len(matches), "verses": verses}
+
+    # -----------------------------
+    # WIRE FORMAT
+    # -----------------------------
+
+    def respond(self, line):
+        """Encoded answer line for one raw request line."""
+        return self.reply(*decode(line))
+
+    def reply(self, request, error=None):
+        """Encoded answer line for a decoded request, or for a decoding error."""
+        answer = {"ok": False, "error": error} if error is not None else self.answer(request)
+        if isinstance(request, dict) and "id" in request:
+            answer = {"id": request["id"], **answer}
+        return (json.dumps(answer, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def decode(line):
+    """(request, None), or (None, error message) for a line that isn't JSON."""
+    try:
+        return json.loads(line), None
+    except (ValueError, UnicodeDecodeError) as e:
+        return None, f"invalid JSON: {e}"
+
+
+def _is_slow(request):
+    return isinstance(request, dict) and request.get("op") in ("search", "batch")
+
+
+# -----------------------------
+# SERVER
+# -----------------------------
+
+class QueryServer:
+    """asyncio server for a QueryHandler, on TCP or a Unix socket."""
+
+    def __init__(self, handler, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.path = path
+        self._server = None
+        self._writers = set()  # open client connections
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="query-search")
+
+    async def start(self):
+        """Start listening. Returns the address: (host, port) or the socket path."""
+        if self.path:
+            if os.path.exists(self.path):
+                os.remove(self.path)  # left over from a previous run
+            self._server = await asyncio.start_unix_server(self._serve, self.path, limit=MAX_LINE)
+            return self.path
+
+        self._server = await asyncio.start_server(self._serve, self.host, self.port, limit=MAX_LINE)
+        self.port = self._server.sockets[0].getsockname()[1]  # the real one when port was 0
+        return self.host, self.port
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    @property
+    def connections(self):
+        return len(self._writers)
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        self._executor.shutdown(wait=False)
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    async def _serve(self, reader, writer):
+        """One client: answer each line in order as soon as it arrives."""
+        loop = asyncio.get_running_loop()
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Longer than MAX_LINE: nothing sensible left to read
+                    writer.write(b'{"ok": false, "error": "request too long"}\n')
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                request, error = decode(line)
+                if error is None and _is_slow(request):
+                    answer = await loop.run_in_executor(self._executor, self.handler.reply, request)
+                else:
+                    answer = self.handler.reply(request, error)
+                writer.write(answer)
+                # Only waits when the client isn't reading its answers
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+class ServerThread:
+    """Runs a QueryServer on its own event loop in a daemon thread (for the tray app)."""
+
+    def __init__(self, server):
+        self.server = server
+        self.address = None
+        self.error = None
+        self._loop = None
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="query-server", daemon=True)
+
+    def start(self, timeout=5):
+        """Start the thread and wait until the server is listening. Returns its address."""
+        self._thread.start()
+        self._started.wait(timeout)
+        if self.error is not None:
+            raise self.error
+        return self.address
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self.address = self._loop.run_until_complete(self.server.start())
+        except OSError as e:
+            self.error = e
+            self._started.set()
+            self._loop.close()
+            return
+        self._started.set()
+        try:
+            self._loop.run_until_complete(self.server.serve_forever())
+        except asyncio.CancelledError:
+            pass
+        finally:
+            # Let the closed connections' handlers finish before the loop goes
+            pending = asyncio.all_tasks(self._loop)
+            for task in pending:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self._loop.close()
+
+    def stop(self):
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.server.close)
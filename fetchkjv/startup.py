@@ -0,0 +1,201 @@
+"""Startup timing: wall time per phase, and optionally per imported module.
+
+FetchKJV marks each phase of its startup as it finishes ("single_instance",
+"imports", "tk_root", "settings", "ready"), and work that runs in the
+background ("tray_icon", "bible", "pythonbible", "search_index") records
+its own duration. Time to ready is the time from the first line of
+FetchKJV.py until the hotkey listener is running.
+
+When started with --startup-report, an ImportTimer also times every module
+as it is imported, like python -X importtime, and the whole report is
+written to JSON.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+
+REPORT_FLAG = "--startup-report"
+DEFAULT_BUDGET_MS = 500  # time to ready
+
+
+# -----------------------------
+# IMPORTS
+# -----------------------------
+
+class _TimedLoader:
+    """Wraps a module's loader for the duration of its exec_module."""
+
+    def __init__(self, loader, timer, name):
+        self._loader = loader
+        self._timer = timer
+        self._name = name
+
+    def create_module(self, spec):
+        create = getattr(self._loader, "create_module", None)
+        return create(spec) if create is not None else None
+
+    def exec_module(self, module):
+        # Put the real loader back before the module's code can look at it
+        module.__loader__ = self._loader
+        if module.__spec__ is not None:
+            module.__spec__.loader = self._loader
+        self._timer._enter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._timer._exit(self._name)
+
+    def __getattr__(self, attr):
+        return getattr(self._loader, attr)
+
+
+class ImportTimer:
+    """Meta path hook recording how long each newly imported module takes to run.
+
+    records holds (name, depth, self seconds, cumulative seconds, thread name)
+    in completion order; cumulative includes the modules it imported.
+    """
+
+    def __init__(self):
+        self.records = []
+        self._local = threading.local()
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, name, path, target=None):
+        local = self._local
+        if getattr(local, "finding", False):
+            return None
+        local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            local.finding = False
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self, name)
+        return spec
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _enter(self):
+        # [start, seconds spent in nested imports]
+        self._stack().append([time.perf_counter(), 0.0])
+
+    def _exit(self, name):
+        stack = self._stack()
+        start, nested = stack.pop()
+        cumulative = time.perf_counter() - start
+        if stack:
+            stack[-1][1] += cumulative
+        self.records.append((name, len(stack), cumulative - nested, cumulative, threading.current_thread().name))
+
+    def table(self, limit=None):
+        """-X importtime style lines, slowest cumulative first when limit is given."""
+        records = self.records
+        if limit is not None:
+            records = sorted(records, key=lambda r: r[3], reverse=True)[:limit]
+        lines = ["import time:      self [us] |  cumulative | imported package"]
+        for name, depth, own, cumulative, _ in records:
+            lines.append(f"import time: {own * 1e6:>12.0f} | {cumulative * 1e6:>11.0f} | {'  ' * depth}{name}")
+        return "\n".join(lines)
+
+
+# -----------------------------
+# PHASES
+# -----------------------------
+
+class StartupReport:
+    """Phase timings of one start, measured from started (a perf_counter() value)."""
+
+    def __init__(self, started, trace_imports=False):
+        self.started = started
+        self.phases = []  # (phase, seconds, ends at seconds since start, background)
+        self._last = started
+        self._lock = threading.Lock()
+        self.ready_seconds = None
+        self.imports = None
+        if trace_imports:
+            self.imports = ImportTimer()
+            self.imports.install()
+
+    def mark(self, phase):
+        """Ends a main-thread phase: the time since the previous mark."""
+        now = time.perf_counter()
+        with self._lock:
+            self.phases.append((phase, now - self._last, now - self.started, False))
+            self._last = now
+
+    def record(self, phase, seconds):
+        """Records a background phase that took seconds and has just ended."""
+        with self._lock:
+            self.phases.append((phase, seconds, time.perf_counter() - self.started, True))
+
+    def ready(self):
+        """Marks the app ready. Returns the time to ready in seconds."""
+        self.mark("ready")
+        self.ready_seconds = self._last - self.started
+        return self.ready_seconds
+
+    def as_dict(self, budget_ms=DEFAULT_BUDGET_MS):
+        with self._lock:
+            phases = list(self.phases)
+        ready_ms = None if self.ready_seconds is None else round(self.ready_seconds * 1000, 1)
+        report = {
+            "written": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "time_to_ready_ms": ready_ms,
+            "budget_ms": budget_ms,
+            "over_budget": ready_ms is not None and ready_ms > budget_ms,
+            "phases": [
+                {"phase": phase, "ms": round(seconds * 1000, 1), "at_ms": round(at * 1000, 1), "background": background}
+                for phase, seconds, at, background in phases
+            ],
+        }
+        if self.imports is not None:
+            report["imports"] = [
+                {"module": name, "depth": depth, "self_us": round(own * 1e6), "cumulative_us": round(cumulative * 1e6), "thread": thread}
+                for name, depth, own, cumulative, thread in self.imports.records
+            ]
+        return report
+
+    def format(self, budget_ms=DEFAULT_BUDGET_MS):
+        """Phase table as text."""
+        lines = [f"{'phase':<24}{'ms':>9}{'at ms':>9}"]
+        with self._lock:
+            phases = list(self.phases)
+        for phase, seconds, at, background in phases:
+            lines.append(f"{phase + (' (bg)' if background else ''):<24}{seconds * 1000:>9.1f}{at * 1000:>9.1f}")
+        if self.ready_seconds is not None:
+            verdict = "over" if self.ready_seconds * 1000 > budget_ms else "within"
+            lines.append(f"time to ready {self.ready_seconds * 1000:.1f} ms, {verdict} the {budget_ms} ms budget")
+        return "\n".join(lines)
+
+    def dump(self, path, budget_ms=DEFAULT_BUDGET_MS, **extra):
+        """Writes the report (plus any extra fields) to path as JSON."""
+        report = dict(extra)
+        report.update(self.as_dict(budget_ms))
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=4)
+        os.replace(tmp_path, path)
+        return report
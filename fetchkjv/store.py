@@ -0,0 +1,264 @@
+"""Array-backed verse store addressed by dense integer verse IDs.
+
+Every verse slot in canonical order (Genesis 1:1 = 0, Genesis 1:2 = 1, ...)
+gets an integer ID. A reference is turned into an ID with two cumulative
+tables instead of hashing a (book, chapter, verse) tuple:
+
+    book_first_chapter[b]     global chapter index of chapter 1 of book b
+    chapter_first_verse[c]    verse ID of verse 1 of global chapter c
+
+Both tables carry one trailing entry, so "how many chapters/verses" is a
+subtraction and "does this exist" is a bounds check. Verse text lives in one
+UTF-8 blob with a uint32 offset table, which means any run of consecutive
+verses is a single slice of the blob.
+
+The text is stored without the [brackets] that mark supplied words. Their
+positions are kept as italic spans: span_index[vid]..span_index[vid + 1]
+selects a verse's (start, end) pairs from the flat uint16 spans array.
+
+The book list and the two cumulative tables only depend on the
+versification, so stores of translations with the same books and chapter
+sizes share one Shape.
+"""
+
+import array
+import threading
+import weakref
+import zlib
+from bisect import bisect_right
+
+from .markup import StyledText, parse_brackets
+
+
+class Shape:
+    """Book names and cumulative chapter tables, shared by stores with the same versification."""
+
+    _shared = weakref.WeakValueDictionary()
+    _lock = threading.Lock()
+
+    def __init__(self, books, chapter_verse_counts):
+        self.books = list(books)
+        self.book_ids = {name: i for i, name in enumerate(self.books)}
+        self.book_first_chapter = array.array("I", [0])
+        self.chapter_first_verse = array.array("I", [0])
+        for counts in chapter_verse_counts:
+            for count in counts:
+                self.chapter_first_verse.append(self.chapter_first_verse[-1] + count)
+            self.book_first_chapter.append(len(self.chapter_first_verse) - 1)
+
+        if len(self.book_first_chapter) != len(self.books) + 1:
+            raise ValueError("chapter_verse_counts must have one entry per book")
+
+    @classmethod
+    def shared(cls, books, chapter_verse_counts):
+        """The Shape for these books and chapter sizes, reusing one that is still alive."""
+        key = (tuple(books), tuple(tuple(counts) for counts in chapter_verse_counts))
+        with cls._lock:
+            shape = cls._shared.get(key)
+            if shape is None:
+                shape = cls._shared[key] = cls(books, chapter_verse_counts)
+            return shape
+
+    def nbytes(self):
+        return (len(self.book_first_chapter) + len(self.chapter_first_verse)) * 4
+
+
+class VerseStore:
+    """Verse text and chapter tables for one translation.
+
+    ``blob`` may be anything that slices to bytes (bytes, mmap) and
+    ``offsets``, ``span_index`` and ``spans`` anything indexable (array,
+    memoryview); verse ID ``i`` is ``blob[base + offsets[i]:base +
+    offsets[i + 1]]``. Empty slots are verses missing from the source and
+    read as None. ``books`` is shared with other stores of the same
+    versification and must not be modified.
+    """
+
+    mapped = False  # True when the text is read from a memory-mapped file
+    source = "json"  # file format the store was read from
+
+    def __init__(self, books, chapter_verse_counts, offsets, blob, span_index, spans, base=0):
+        self.shape = Shape.shared(books, chapter_verse_counts)
+        self.books = self.shape.books
+        self._book_ids = self.shape.book_ids
+        self._book_first_chapter = self.shape.book_first_chapter
+        self._chapter_first_verse = self.shape.chapter_first_verse
+        self._offsets = offsets
+        self._blob = blob
+        self._span_index = span_index
+        self._spans = spans
+        self._base = base
+
+        if len(offsets) != self._chapter_first_verse[-1] + 1 or len(span_index) != len(offsets):
+            raise ValueError("offsets and span_index must have one entry per verse slot plus one")
+
+    # -----------------------------
+    # SHAPE QUERIES
+    # -----------------------------
+
+    def book_id(self, book):
+        """Ordinal of a book name, or -1."""
+        return self._book_ids.get(book, -1)
+
+    def chapter_count(self, book):
+        b = self._book_ids.get(book)
+        if b is None:
+            return 0
+        return self._book_first_chapter[b + 1] - self._book_first_chapter[b]
+
+    def _chapter_index(self, book, chapter):
+        b = self._book_ids.get(book)
+        if b is None or chapter < 1:
+            return -1
+        index = self._book_first_chapter[b] + chapter - 1
+        if index >= self._book_first_chapter[b + 1]:
+            return -1
+        return index
+
+    def verse_count(self, book, chapter):
+        """Number of verses in a chapter (0 if the chapter doesn't exist)."""
+        c = self._chapter_index(book, chapter)
+        if c < 0:
+            return 0
+        return self._chapter_first_verse[c + 1] - self._chapter_first_verse[c]
+
+    def has_chapter(self, book, chapter):
+        return self._chapter_index(book, chapter) >= 0
+
+    def has_verse(self, book, chapter, verse):
+        vid = self.verse_id(book, chapter, verse)
+        return vid >= 0 and self._offsets[vid] != self._offsets[vid + 1]
+
+    # -----------------------------
+    # ID CONVERSION
+    # -----------------------------
+
+    def verse_id(self, book, chapter, verse):
+        """Dense ID of book chapter:verse, or -1 if there is no such slot."""
+        c = self._chapter_index(book, chapter)
+        if c < 0 or verse < 1:
+            return -1
+        vid = self._chapter_first_verse[c] + verse - 1
+        if vid >= self._chapter_first_verse[c + 1]:
+            return -1
+        return vid
+
+    def reference(self, vid):
+        """(book, chapter, verse) of a verse ID."""
+        if not 0 <= vid < len(self):
+            raise IndexError(vid)
+        c = bisect_right(self._chapter_first_verse, vid) - 1
+        b = bisect_right(self._book_first_chapter, c) - 1
+        return (
+            self.books[b],
+            c - self._book_first_chapter[b] + 1,
+            vid - self._chapter_first_verse[c] + 1,
+        )
+
+    # -----------------------------
+    # TEXT
+    # -----------------------------
+
+    def text(self, vid):
+        """Text of one verse ID, or None if the verse is missing."""
+        start = self._offsets[vid]
+        end = self._offsets[vid + 1]
+        if start == end:
+            return None
+        return self._blob[self._base + start:self._base + end].decode("utf-8")
+
+    def texts(self, first, last):
+        """Texts of verse IDs first..last inclusive, read with one slice of the blob."""
+        offsets = self._offsets
+        start = offsets[first]
+        raw = self._blob[self._base + start:self._base + offsets[last + 1]]
+        out = []
+        for vid in range(first, last + 1):
+            a = offsets[vid] - start
+            b = offsets[vid + 1] - start
+            out.append(raw[a:b].decode("utf-8") if a != b else None)
+        return out
+
+    def spans(self, vid):
+        """Italic (start, end) character spans of one verse ID."""
+        flat = self._spans[2 * self._span_index[vid]:2 * self._span_index[vid + 1]]
+        return tuple(zip(flat[::2], flat[1::2]))
+
+    def styled_texts(self, first, last):
+        """StyledTexts (or None) of verse IDs first..last inclusive."""
+        return [
+            StyledText(text, self.spans(vid)) if text is not None else None
+            for vid, text in enumerate(self.texts(first, last), first)
+        ]
+
+    def nbytes(self):
+        """Bytes of verse text and tables held by this store (not counting the shared Shape)."""
+        tables = sum(len(table) * table.itemsize for table in (self._offsets, self._span_index, self._spans))
+        return len(self._blob) + tables
+
+    def close(self):
+        """Releases the file behind the store, if any."""
+
+    def checksum(self):
+        """crc32 of the verse text and offsets, for keying files derived from them."""
+        offsets = self._offsets
+        crc = zlib.crc32(self._blob[self._base + offsets[0]:self._base + offsets[len(offsets) - 1]])
+        return zlib.crc32(offsets, crc)
+
+    # Mapping-style access, so code written against the old
+    # {(book, chapter, verse): text} dict keeps working
+
+    def get(self, key, default=None):
+        vid = self.verse_id(*key)
+        if vid < 0:
+            return default
+        text = self.text(vid)
+        return default if text is None else text
+
+    def __getitem__(self, key):
+        text = self.get(key)
+        if text is None:
+            raise KeyError(key)
+        return text
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def __len__(self):
+        return self._chapter_first_verse[-1]
+
+
+def pack_verses(entries):
+    """Pack kjv.json verse entries into VerseStore arguments.
+
+    Returns (books, chapter_verse_counts, offsets, blob, span_index, spans),
+    keeping the book order of the source. Gaps in the verse numbering get
+    empty slots so verse numbers always map straight to IDs.
+    """
+    books = {}
+    for entry in entries:
+        chapters = books.setdefault(entry["book_name"], {})
+        chapters.setdefault(int(entry["chapter"]), {})[int(entry["verse"])] = entry["text"]
+
+    chapter_verse_counts = []
+    blob = bytearray()
+    offsets = array.array("I", [0])
+    span_index = array.array("I", [0])
+    spans = array.array("H")
+
+    for chapters in books.values():
+        counts = []
+        for chapter in range(1, max(chapters) + 1):
+            verses = chapters.get(chapter, {})
+            counts.append(max(verses) if verses else 0)
+            for verse in range(1, counts[-1] + 1):
+                styled = parse_brackets(verses.get(verse, ""))
+                blob += styled.text.encode("utf-8")
+                offsets.append(len(blob))
+                for start, end in styled.spans:
+                    spans.append(start)
+                    spans.append(end)
+                span_index.append(len(spans) // 2)
+        chapter_verse_counts.append(counts)
+
+    return list(books), chapter_verse_counts, offsets, bytes(blob), span_index, spans
@@ -0,0 +1,273 @@
+"""Registry of the translations FetchKJV can show, each opened on first use.
+
+A translation is a Bible in the kjv.json format (<code>.json, e.g. asv.json)
+and optionally its compiled corpus (<code>.kjvc, built with
+python -m fetchkjv.corpus, or the block-compressed <code>.kjvz built with
+python -m fetchkjv.packed). Registering one costs nothing: the file is only
+opened by the first lookup that asks for it. Stores of translations with
+the same versification share their book and chapter tables (store.Shape).
+
+At most max_open translations stay open. Opening another evicts the least
+recently used one, and any translation unused for idle_seconds is evicted
+on the next lookup. The default translation is never evicted. A store
+being read (see TranslationRegistry.reading) is only closed once its last
+reader is done with it, so eviction never pulls a corpus out from under a
+lookup on another thread.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from . import corpus
+
+DEFAULT_TRANSLATION = "KJV"
+DEFAULT_MAX_OPEN = 2
+DEFAULT_IDLE_SECONDS = 600
+
+# Public-domain translations looked for by discover()
+KNOWN_TRANSLATIONS = {
+    "KJV": "King James Version",
+    "ASV": "American Standard Version",
+    "WEB": "World English Bible",
+    "YLT": "Young's Literal Translation",
+}
+
+
+class TranslationError(LookupError):
+    """Raised for a translation that isn't registered."""
+
+
+class Translation:
+    """One registered translation and, while it is open, its VerseStore."""
+
+    def __init__(self, code, name, json_path, corpus_path=None, cache_bytes=None):
+        self.code = code
+        self.name = name
+        self.json_path = json_path
+        self.corpus_path = corpus_path
+        self.cache_bytes = cache_bytes
+        self.store = None
+        self.last_used = 0.0
+        self.open_seconds = None  # of the most recent open
+        self.opens = 0
+
+    @property
+    def is_open(self):
+        return self.store is not None
+
+    def open(self):
+        start = time.perf_counter()
+        if self.corpus_path:
+            self.store = corpus.load_verse_store(self.json_path, self.corpus_path, self.cache_bytes)
+        else:
+            self.store = corpus.load_json_store(self.json_path)
+        self.open_seconds = time.perf_counter() - start
+        self.opens += 1
+        return self.store
+
+    def detach(self):
+        """Forgets the open store and returns it (or None) without closing it."""
+        store, self.store = self.store, None
+        return store
+
+    def close(self):
+        store = self.detach()
+        if store is not None:
+            store.close()
+
+    def stats(self):
+        store = self.store
+        return {
+            "code": self.code,
+            "name": self.name,
+            "open": store is not None,
+            "source": None if store is None else store.source,
+            "bytes": None if store is None else store.nbytes(),
+            "open_ms": None if self.open_seconds is None else round(self.open_seconds * 1000, 1),
+            "opens": self.opens,
+        }
+
+
+class TranslationRegistry:
+    """Translations by code ("KJV", "ASV", ...), opened lazily and evicted when unused.
+
+    Thread-safe. A store handed out by store() must not be used after its
+    translation has been evicted (a kjvc corpus is unmapped), so a lookup
+    that may race an eviction on another thread reads through reading() or
+    acquire()/release() instead: an evicted store with readers is set aside
+    and closed when the last of them releases it. cache_bytes caps the
+    decompressed text each open .kjvz keeps.
+    """
+
+    def __init__(self, default=DEFAULT_TRANSLATION, max_open=DEFAULT_MAX_OPEN,
+                 idle_seconds=DEFAULT_IDLE_SECONDS, cache_bytes=None, clock=time.monotonic):
+        self.default = default
+        self.cache_bytes = cache_bytes
+        self.max_open = max(1, max_open)
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._translations = {}
+        self._lock = threading.RLock()
+        self._readers = {}  # id(store): acquire() calls not yet released
+        self._retired = {}  # id(store): evicted store, closed on its last release()
+        self.on_open = None  # called with the Translation after each open
+
+    def register(self, code, json_path, corpus_path=None, name=None):
+        """Adds (or replaces) a translation. Nothing is read until it is used."""
+        code = code.upper()
+        with self._lock:
+            old = self._translations.get(code)
+            if old is not None:
+                self._retire(old)
+            self._translations[code] = Translation(
+                code, name or KNOWN_TRANSLATIONS.get(code, code), json_path, corpus_path, self.cache_bytes
+            )
+
+    def discover(self, directories, known=KNOWN_TRANSLATIONS):
+        """Registers every known translation with a <code>.json, .kjvc or .kjvz in directories.
+
+        The first directory that has a translation wins. Returns the codes found.
+        """
+        found = []
+        for code in known:
+            if code in self._translations:
+                continue
+            for directory in directories:
+                json_path = os.path.join(directory, code.lower() + ".json")
+                corpus_path = corpus.find_corpus(json_path)
+                if os.path.exists(json_path) or os.path.exists(corpus_path):
+                    self.register(code, json_path, corpus_path)
+                    found.append(code)
+                    break
+        return found
+
+    @property
+    def codes(self):
+        """Registered codes, in registration order."""
+        return list(self._translations)
+
+    def __contains__(self, code):
+        return code.upper() in self._translations
+
+    def __len__(self):
+        return len(self._translations)
+
+    def name(self, code):
+        return self._get(code).name
+
+    def _get(self, code):
+        translation = self._translations.get((code or self.default).upper())
+        if translation is None:
+            raise TranslationError(f"unknown translation: {code}")
+        return translation
+
+    # -----------------------------
+    # OPEN AND EVICT
+    # -----------------------------
+
+    def store(self, code=None):
+        """VerseStore of a translation (default: the default one), opening it if needed."""
+        return self._store(code, reader=False)
+
+    def acquire(self, code=None):
+        """Like store(), but the store stays open until release(store), even if evicted."""
+        return self._store(code, reader=True)
+
+    def release(self, store):
+        """Ends one acquire() of store, closing it if it was evicted meanwhile."""
+        with self._lock:
+            key = id(store)
+            readers = self._readers.get(key, 0) - 1
+            if readers > 0:
+                self._readers[key] = readers
+                return
+            self._readers.pop(key, None)
+            retired = self._retired.pop(key, None)
+        if retired is not None:
+            retired.close()
+
+    @contextmanager
+    def reading(self, code=None):
+        """with registry.reading("ASV") as store: the store stays open for the block."""
+        store = self.acquire(code)
+        try:
+            yield store
+        finally:
+            self.release(store)
+
+    def _store(self, code, reader):
+        on_open = None
+        with self._lock:
+            translation = self._get(code)
+            translation.last_used = self._clock()
+            self.evict_idle()
+            store = translation.store
+            if store is None:
+                store = translation.open()
+                self._evict_over_limit(keep=translation)
+                on_open = self.on_open
+            if reader:
+                self._readers[id(store)] = self._readers.get(id(store), 0) + 1
+        if on_open is not None:
+            on_open(translation)
+        return store
+
+    def is_open(self, code=None):
+        return self._get(code).is_open
+
+    def evict(self, code):
+        """Closes a translation. False if it wasn't open."""
+        with self._lock:
+            translation = self._get(code)
+            if translation.store is None:
+                return False
+            self._retire(translation)
+            return True
+
+    def evict_idle(self):
+        """Closes the translations unused for idle_seconds. Returns their codes."""
+        if self.idle_seconds is None:
+            return []
+        with self._lock:
+            cutoff = self._clock() - self.idle_seconds
+            idle = [t.code for t in self._evictable() if t.last_used < cutoff]
+            for code in idle:
+                self._retire(self._translations[code])
+            return idle
+
+    def _evictable(self):
+        return [t for t in self._translations.values() if t.is_open and t.code != self.default]
+
+    def _evict_over_limit(self, keep):
+        open_count = sum(t.is_open for t in self._translations.values())
+        for translation in sorted(self._evictable(), key=lambda t: t.last_used):
+            if open_count <= self.max_open:
+                break
+            if translation is not keep:
+                self._retire(translation)
+                open_count -= 1
+
+    def _retire(self, translation):
+        """Closes a translation's store now, or on its last release() if it is being read."""
+        store = translation.detach()
+        if store is None:
+            return
+        if self._readers.get(id(store)):
+            self._retired[id(store)] = store
+        else:
+            store.close()
+
+    def close(self):
+        with self._lock:
+            for translation in self._translations.values():
+                translation.close()
+            for store in self._retired.values():
+                store.close()
+            self._retired.clear()
+
+    def stats(self):
+        """Per translation: whether it is open, from which file, its size and how long it took to open."""
+        with self._lock:
+            return [t.stats() for t in self._translations.values()]